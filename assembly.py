@@ -1,33 +1,170 @@
+from typing import TextIO
 from loader import Loader
 from graph import *
+from superpath import SuperpathEngine, CHECKPOINT_INTERVAL
+from snapshot import save_graph, load_graph
+from spectrum import SpectrumCache, SpectrumAnalysis, CANDIDATE_KS, SAMPLE_LENGTH
+from normalize import NormalizedReads, NORMALIZE_MEMORY
+from writer import FastaWriter, LINE_WIDTH
+from instrument import Instrumentation
 
 
 class Assembler(object):
-    def __init__(self, filename: str, k: int, error_correct: bool=False) -> None:
+    def __init__(self, filename: str, k: int, error_correct: bool=False, threshold: int=2, workers: int=1, engine: str="python", unitigs: bool=False,
+                 prefilter: bool=False, error_rate: float=0.01, capacity: int=0, canonical: bool=False,
+                 instrument: Optional[Instrumentation]=None, cache: Optional[SpectrumCache]=None, reads: Optional[Iterable[str]]=None,
+                 counting_memory: int=0, normalize: int=0, normalize_memory: int=NORMALIZE_MEMORY) -> None:
         """Khởi tạo Assembler
 
         Args:
             filename (str): File chứa các read
             k (int): Độ dài một k-mer
             error_correct (bool, optional): Có sửa lỗi hay không. Defaults to False.
+            threshold (int, optional): Ngưỡng để một k-mer được gọi là "đặc" khi sửa lỗi. Defaults to 2.
+            workers (int, optional): Số tiến trình dùng để đếm k-mer. Defaults to 1.
+            engine (str, optional): Cách sửa lỗi, "python" hoặc "numpy". Defaults to "python".
+            unitigs (bool, optional): Gộp các đường không rẽ nhánh thành unitig ngay sau khi tạo đồ thị. Tắt mặc định vì
+                chưa chứng minh được kết quả luôn giống khi chỉ dùng superpath. Defaults to False.
+            prefilter (bool, optional): Chỉ giữ các k-mer gặp ít nhất hai lần trong bảng tần số khi sửa lỗi. Defaults to False.
+            error_rate (float, optional): Xác suất sai của bộ lọc Bloom khi prefilter. Defaults to 0.01.
+            capacity (int, optional): Số k-mer khác nhau dự kiến của bộ lọc Bloom, 0 để tự tính. Defaults to 0.
+            canonical (bool, optional): Coi một k-mer và chuỗi bổ sung ngược của nó là một khi đếm và khi tạo đồ thị. Defaults to False.
+            instrument (Optional[Instrumentation], optional): Nơi ghi thời gian các bước và các bộ đếm, None để không đo. Defaults to None.
+            cache (Optional[SpectrumCache], optional): Cache trên đĩa của bảng tần số khi sửa lỗi, các lần chạy lại
+                trên cùng file read với cùng k không phải đếm k-mer. Defaults to None.
+            reads (Optional[Iterable[str]], optional): Các read đã có trong bộ nhớ (list), dùng thay cho việc đọc filename.
+                Cache không được dùng vì các read có thể khác nội dung file. Defaults to None.
+            counting_memory (int, optional): Giới hạn bộ nhớ (byte) để đếm k-mer ngoài bộ nhớ khi sửa lỗi, 0 để đếm trong bộ nhớ. Defaults to 0.
+            normalize (int, optional): Độ phủ mục tiêu khi chuẩn hóa độ phủ các read trước khi tạo đồ thị, 0 để giữ mọi read.
+                Cache không được dùng vì bảng tần số được đếm trên các read còn lại. Defaults to 0.
+            normalize_memory (int, optional): Bộ nhớ (byte) của bảng đếm khi chuẩn hóa độ phủ. Defaults to NORMALIZE_MEMORY.
         """
         
-        # Load file
-        reads: Loader = Loader.load(filename=filename)
+        self.instrument: Instrumentation = instrument or Instrumentation() # Đo các bước, mặc định tắt
         
-        # Khởi tạo đồ thị
-        self.graph: Graph = Graph(seqs=reads, k=k, threshold=error_correct)
+        # Đọc lần lượt các read từ file nếu chưa có sẵn
+        source: Optional[str] = filename if reads is None else None
+        if reads is None:
+            reads = Loader.stream(filename=filename)
+        # Bỏ các read thừa ở những vùng đã đủ độ phủ, đồ thị và bảng tần số chỉ thấy các read còn lại
+        normalized: Optional[NormalizedReads] = None
+        if normalize:
+            normalized = NormalizedReads(reads=reads, coverage=normalize, memory=normalize_memory, canonical=canonical)
+            reads = normalized
+            source = None
+        
+        # Khởi tạo đồ thị, thời gian sửa lỗi (nếu có) nằm trong bước này vì các read được sửa lỗi lần lượt khi tạo đồ thị
+        with self.instrument.stage(name="Graph.__init__"):
+            self.graph: Graph = Graph(seqs=reads, k=k, threshold=threshold, error_correct=error_correct, workers=workers, engine=engine,
+                                      prefilter=prefilter, error_rate=error_rate, capacity=capacity, canonical=canonical,
+                                      instrument=self.instrument, cache=cache, source=source, counting_memory=counting_memory)
+        if normalized is not None:
+            self.instrument.count(name="normalized_kept", value=normalized.kept)
+            self.instrument.count(name="normalized_dropped", value=normalized.dropped)
         self.k: int = k
+        # Superpath chỉ còn phải xét các cạnh ở những đỉnh rẽ nhánh
+        with self.instrument.stage(name="compact_unitigs"):
+            self.unitigs: int = self.graph.compact_unitigs() if unitigs else 0 # Số unitig được tạo ra
+        self.instrument.count(name="unitigs", value=self.unitigs)
+        self.superpath: Optional[SuperpathEngine] = None # Lần tạo superpath gần nhất, chứa số lần gộp và thời gian chạy
+        self.spectrum: Optional[SpectrumAnalysis] = None # Phân tích phổ k-mer nếu k được chọn bởi Assembler.auto
+        
+    
+    @staticmethod
+    def auto(filename: str, candidates: Optional[List[int]]=None, sample: int=SAMPLE_LENGTH, **options) -> "Assembler":
+        """
+        Chọn k và ngưỡng sửa lỗi từ phổ k-mer (một lần đọc các read, chỉ đếm một phần nhỏ các k-mer) rồi tạo Assembler
+
+        Args:
+            filename (str): File chứa các read
+            candidates (Optional[List[int]], optional): Các giá trị k được xét, None để dùng CANDIDATE_KS. Defaults to None.
+            sample (int, optional): Độ dài tiền tố lấy mẫu k-mer, 0 để đếm mọi k-mer. Defaults to SAMPLE_LENGTH.
+            **options: Các tham số khác của Assembler, trừ k và threshold
+
+        Returns:
+            Assembler: Assembler với k và ngưỡng đã chọn, kết quả phân tích nằm trong spectrum
+        """
+        
+        instrument: Instrumentation = options.pop("instrument", None) or Instrumentation()
+        with instrument.stage(name="analyze_spectrum"):
+            spectrum: SpectrumAnalysis = SpectrumAnalysis(reads=Loader.stream(filename=filename), ks=candidates or CANDIDATE_KS, sample=sample,
+                                                          canonical=options.get("canonical", False))
+        
+        assembly: Assembler = Assembler(filename=filename, k=spectrum.k, threshold=spectrum.threshold, instrument=instrument, **options)
+        assembly.spectrum = spectrum
+        
+        return assembly
+        
+    
+    def make_superpath(self, checkpoint: Optional[str]=None, interval: float=CHECKPOINT_INTERVAL) -> int:
+        """
+        Tạo các superpath bằng hàng đợi các bộ ba cạnh, cho cùng kết quả với việc lặp superpath_consider.
+        Nếu Assembler được đọc từ một checkpoint ghi giữa chừng, việc gộp được chạy tiếp từ hàng đợi đã ghi
+
+        Args:
+            checkpoint (Optional[str], optional): File snapshot được ghi định kỳ trong khi gộp, None để không ghi. Defaults to None.
+            interval (float, optional): Số giây tối thiểu giữa hai lần ghi checkpoint. Defaults to CHECKPOINT_INTERVAL.
+
+        Returns:
+            int: Số lần gộp cạnh
+        """
+        if self.superpath is None or self.superpath.finished:
+            self.superpath = SuperpathEngine(graph=self.graph)
+        self.superpath.checkpoint = checkpoint
+        self.superpath.interval = interval
+        self.superpath.context = {"unitigs": self.unitigs}
+        
+        checks: int = self.superpath.checks
+        with self.instrument.stage(name="make_superpath"):
+            merges: int = self.superpath.run()
+        self.instrument.count(name="triples_checked", value=self.superpath.checks - checks)
+        
+        return merges
+    
+    
+    def save(self, filename: str) -> None:
+        """
+        Ghi đồ thị hiện tại ra một file snapshot nhị phân, đọc lại bằng Assembler.load mà không cần tạo lại đồ thị từ các read
+
+        Args:
+            filename (str): File snapshot
+        """
         
+        if self.superpath is not None and not self.superpath.finished:
+            # Đang tạo superpath dở dang thì ghi cả hàng đợi để có thể chạy tiếp
+            self.superpath.context = {"unitigs": self.unitigs}
+            self.superpath.save(filename=filename)
+        else:
+            save_graph(graph=self.graph, filename=filename, state={"unitigs": self.unitigs})
+    
     
-    def make_superpath(self) -> None:
+    @staticmethod
+    def load(filename: str, instrument: Optional[Instrumentation]=None) -> "Assembler":
         """
-        Tạo các superpath bằng cách lặp
+        Đọc một Assembler từ file snapshot được ghi bởi save hoặc bởi checkpoint của make_superpath
+
+        Args:
+            filename (str): File snapshot
+            instrument (Optional[Instrumentation], optional): Nơi ghi thời gian các bước và các bộ đếm. Defaults to None.
+
+        Returns:
+            Assembler: Assembler với đồ thị đã đọc, gọi make_superpath sẽ chạy tiếp nếu snapshot là một checkpoint
         """
-        while self.superpath_consider():
-            self.graph.clean()
         
-        self.graph.clean()
+        assembly: Assembler = Assembler.__new__(Assembler)
+        assembly.instrument = instrument or Instrumentation()
+        with assembly.instrument.stage(name="Assembler.load"):
+            graph, state, queue = load_graph(filename=filename, instrument=assembly.instrument)
+        assembly.graph = graph
+        assembly.k = graph.k
+        assembly.unitigs = state.get("unitigs", 0)
+        assembly.superpath = None
+        assembly.spectrum = None
+        if queue is not None:
+            assembly.superpath = SuperpathEngine(graph=graph)
+            assembly.superpath.restore(state=state["superpath"], queue=queue)
+        
+        return assembly
         
         
     def superpath_consider(self) -> bool:
@@ -36,22 +173,25 @@ class Assembler(object):
         Returns:
             bool: Có thể gộp được hai cạnh nào đó không
         """
-        for read in self.graph.read_list:
-            for i in range(len(read.edges)-1):
-                # Lấy cạnh phía trước nếu có
-                if i > 0:
-                    p: Edge = read.edges[i-1]
-                else:
-                    p = None
-                # Lấy hai cạnh x và y kề nhau
-                x: Edge = read.edges[i]
-                y: Edge = read.edges[i+1]
-                # Kiểm tra xem các cạnh có gộp được không
-                if self.graph.is_mergeable(p=p, x=x, y=y):
-                    if self.graph.merge(x=x, y=y):
-                        return True
+        with self.instrument.stage(name="superpath_consider"):
+            for read in self.graph.read_list:
+                # Đường đi của read, bỏ qua các vị trí đã bị gộp
+                edges: List[Edge] = read.path()
+                for i in range(len(edges)-1):
+                    # Lấy cạnh phía trước nếu có
+                    if i > 0:
+                        p: Edge = edges[i-1]
+                    else:
+                        p = None
+                    # Lấy hai cạnh x và y kề nhau
+                    x: Edge = edges[i]
+                    y: Edge = edges[i+1]
+                    # Kiểm tra xem các cạnh có gộp được không
+                    if self.graph.is_mergeable(p=p, x=x, y=y):
+                        if self.graph.merge(x=x, y=y):
+                            return True
                     
-        return False
+            return False
     
     
     def is_eulerian(self) -> bool:
@@ -97,38 +237,54 @@ class Assembler(object):
             print("Quá nhiều đỉnh không cân bằng {}. Đồ thị không phải là đồ thị Euler".format(len(semis)))
             return False
         if len(semis[0].in_edges) > len(semis[0].out_edges):
-            self.graph.new_edge(in_vertex=semis[0], out_vertex=semis[1], sequence=semis[0].sequence)
+            self.graph.new_edge(in_vertex=semis[0], out_vertex=semis[1], code=semis[0].code, length=semis[0].length)
         else:
-            self.graph.new_edge(in_vertex=semis[1], out_vertex=semis[0], sequence=semis[1].sequence)
+            self.graph.new_edge(in_vertex=semis[1], out_vertex=semis[0], code=semis[1].code, length=semis[1].length)
             
         return True
     
     
-    def find_eulerian_path(self) -> str:
+    def find_start(self, component: List[Vertex]) -> Optional[Vertex]:
         """
-        Xây dựng đường đi Euler trên đồ thị sử dụng thuật toán Heirholzer
+        Tìm đỉnh bắt đầu đường đi Euler trong một thành phần liên thông, dừng ở đỉnh phù hợp đầu tiên
+
+        Args:
+            component (List[Vertex]): Các đỉnh của thành phần
 
         Returns:
-            str: Đường đi Euler kết quả
+            Optional[Vertex]: Đỉnh bán cân bằng đầu tiên có số cạnh vào nhỏ hơn số cạnh ra,
+                nếu không có thì đỉnh đầu tiên có cạnh ra, None nếu không có cạnh nào
+        """
+        
+        first: Optional[Vertex] = None
+        for vertex in component:
+            if vertex.out_degree - vertex.in_degree == 1:
+                return vertex
+            if first is None and vertex.out_degree > 0:
+                first = vertex
+                
+        return first
+    
+    
+    def find_trail(self, start: Vertex) -> List[Edge]:
+        """
+        Xây dựng đường đi Euler bắt đầu từ một đỉnh sử dụng thuật toán Heirholzer.
+        Mỗi cạnh được đưa vào và lấy ra khỏi ngăn xếp một lần, get_unvisited không duyệt lại các cạnh đã đi qua nên tốn O(E)
+
+        Args:
+            start (Vertex): Đỉnh bắt đầu
+
+        Returns:
+            List[Edge]: Các cạnh theo thứ tự trên đường đi
         """
         
         # Khởi tạo
         current_path: List[Edge] = []
         final_path: List[Edge] = []
         
-        # Bắt đầu với đỉnh bán cân bẳng với số cạnh vào nhỏ hơn số cạnh ra
-        edge: Edge = None
-        for vertex in self.graph.vertex_list:
-            diff = abs(len(vertex.out_edges) - len(vertex.in_edges))
-            if diff == 1 and len(vertex.in_edges) < len(vertex.out_edges):
-                edge = self.graph.get_unvisited(vertex=vertex)
-        
-        # Nếu không có đỉnh nào như vậy thì chọn cạnh ra của đỉnh đầu tiên
-        if not edge:
-            edge = self.graph.get_unvisited(self.graph.vertex_list[0])
-        
         # Thêm các cạnh vào ngăn xếp
-        while edge != None:
+        edge: Optional[Edge] = self.graph.get_unvisited(vertex=start)
+        while edge is not None:
             edge.visited = True
             current_path.append(edge)
             edge = self.graph.get_unvisited(edge.out_vertex)
@@ -141,20 +297,87 @@ class Assembler(object):
             edge = self.graph.get_unvisited(edge.in_vertex)
             
             # Lặp tất cả các cạnh chưa được đi qua
-            while edge != None:
+            while edge is not None:
                 edge.visited = True
                 current_path.append(edge)
                 edge = self.graph.get_unvisited(edge.out_vertex)
-                
-        # In kết quả bằng cách thêm vào phía trước danh sách
-        sequence: str = ""
-        while len(final_path) > 0:
-            edge = final_path.pop()
-            if len(final_path) == 0: # Cạnh cuối cùng
-                sequence += edge.sequence
+        
+        # Các cạnh được lấy ra theo thứ tự ngược
+        final_path.reverse()
+        
+        return final_path
+    
+    
+    def find_eulerian_paths(self) -> Iterator[List[Edge]]:
+        """
+        Xây dựng một đường đi Euler cho mỗi thành phần liên thông yếu của đồ thị,
+        đường đi của thành phần sau chỉ được tạo khi cần
+
+        Returns:
+            Iterator[List[Edge]]: Các cạnh của từng đường đi, theo thứ tự các thành phần
+        """
+        
+        for component in self.graph.components():
+            start: Optional[Vertex] = self.find_start(component=component)
+            if start is not None:
+                yield self.find_trail(start=start)
+    
+    
+    def contig_chunks(self, path: List[Edge]) -> Iterator[str]:
+        """
+        Lần lượt trả về các đoạn chuỗi của một đường đi: mỗi cạnh bỏ k-1 ký tự cuối (trùng với cạnh sau), trừ cạnh cuối cùng.
+        Mỗi lần chỉ giải mã một cạnh
+
+        Args:
+            path (List[Edge]): Các cạnh của đường đi
+
+        Returns:
+            Iterator[str]: Các đoạn chuỗi theo thứ tự
+        """
+        
+        for i, edge in enumerate(path):
+            sequence: str = edge.sequence
+            if i == len(path) - 1: # Cạnh cuối cùng
+                yield sequence
             else:
-                s_len: int = len(edge.sequence)
-                sequence += edge.sequence[:s_len-self.k+1] # Chỉ lấy các ký tự đầu
-                
-        return sequence
-               
\ No newline at end of file
+                yield sequence[:len(sequence)-self.k+1] # Chỉ lấy các ký tự đầu
+    
+    
+    def find_eulerian_path(self) -> List[str]:
+        """
+        Xây dựng đường đi Euler trên từng thành phần liên thông yếu của đồ thị.
+        Mỗi chuỗi được ghép một lần từ các đoạn, với contig lớn nên dùng write_contigs để không giữ cả chuỗi trong bộ nhớ
+
+        Returns:
+            List[str]: Chuỗi của đường đi Euler trên từng thành phần
+        """
+        
+        with self.instrument.stage(name="find_eulerian_path"):
+            contigs: List[str] = ["".join(self.contig_chunks(path=path)) for path in self.find_eulerian_paths()]
+        self.instrument.count(name="contigs", value=len(contigs))
+        
+        return contigs
+    
+    
+    def write_contigs(self, handle: TextIO, width: int = LINE_WIDTH) -> int:
+        """
+        Ghi đường đi Euler của từng thành phần liên thông yếu thành một bản ghi FASTA, theo từng đoạn với bộ đệm
+
+        Args:
+            handle (TextIO): File (hoặc sys.stdout) để ghi
+            width (int, optional): Số ký tự trên mỗi dòng. Defaults to LINE_WIDTH.
+
+        Returns:
+            int: Số contig đã ghi
+        """
+        
+        writer: FastaWriter = FastaWriter(handle=handle, width=width)
+        contigs: int = 0
+        with self.instrument.stage(name="write_contigs"):
+            for path in self.find_eulerian_paths():
+                contigs += 1
+                writer.write_record(name="contig_{}".format(contigs), chunks=self.contig_chunks(path=path))
+            writer.flush()
+        self.instrument.count(name="contigs", value=contigs)
+        
+        return contigs
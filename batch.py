@@ -0,0 +1,271 @@
+import os
+import sys
+import glob
+import time
+import signal
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, List, Dict, Iterable, Iterator, Tuple, Optional
+
+# resource chỉ có trên các hệ Unix, không có thì không giới hạn được bộ nhớ của mỗi mẫu
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from assembly import Assembler
+from multik import MultiKAssembler
+
+
+FASTA_SUFFIX: str = ".fasta" # Đuôi file contig của mỗi mẫu
+READ_SUFFIXES: List[str] = [".gz", ".fastq", ".fq", ".fasta", ".fa"] # Các đuôi được bỏ đi khi đặt tên mẫu theo tên file
+
+
+class TimeLimitExceeded(Exception):
+    """
+    Một mẫu chạy quá thời gian cho phép
+    """
+
+
+class Job(object):
+    """
+    Một mẫu cần lắp ráp: tên mẫu, file read và file contig
+    """
+
+    def __init__(self, sample: str, filename: str, output: str) -> None:
+        """
+
+        Args:
+            sample (str): Tên mẫu
+            filename (str): File chứa các read
+            output (str): File FASTA để ghi các contig
+        """
+
+        self.sample: str = sample
+        self.filename: str = filename
+        self.output: str = output
+
+
+class JobResult(object):
+    """
+    Kết quả lắp ráp một mẫu
+    """
+
+    def __init__(self, sample: str, ok: bool, contigs: int = 0, merges: int = 0, seconds: float = 0.0, error: str = "", k: int = 0) -> None:
+        """
+
+        Args:
+            sample (str): Tên mẫu
+            ok (bool): Lắp ráp thành công hay không
+            contigs (int, optional): Số contig đã ghi. Defaults to 0.
+            merges (int, optional): Số lần gộp cạnh khi tạo superpath. Defaults to 0.
+            seconds (float, optional): Thời gian chạy. Defaults to 0.0.
+            error (str, optional): Thông báo lỗi khi không thành công. Defaults to "".
+            k (int, optional): Giá trị k đã dùng (k của vòng cuối khi lắp ráp nhiều k). Defaults to 0.
+        """
+
+        self.sample: str = sample
+        self.ok: bool = ok
+        self.contigs: int = contigs
+        self.merges: int = merges
+        self.seconds: float = seconds
+        self.error: str = error
+        self.k: int = k
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: Kết quả dạng dict để ghi ra JSON
+        """
+
+        return {"sample": self.sample, "ok": self.ok, "k": self.k, "contigs": self.contigs, "merges": self.merges, "seconds": self.seconds,
+                "error": self.error}
+
+
+def sample_name(filename: str) -> str:
+    """Tên mẫu theo tên file, bỏ thư mục và các đuôi của file read
+
+    Args:
+        filename (str): File chứa các read
+
+    Returns:
+        str: Tên mẫu, ví dụ "reads/s1.fastq.gz" thành "s1"
+    """
+
+    name: str = os.path.basename(filename)
+    stripped: bool = True
+    while stripped:
+        stripped = False
+        for suffix in READ_SUFFIXES:
+            if name.lower().endswith(suffix) and len(name) > len(suffix):
+                name = name[:-len(suffix)]
+                stripped = True
+
+    return name
+
+
+def read_manifest(filename: str) -> List[Tuple[str, str]]:
+    """Đọc file danh sách mẫu. Mỗi dòng là "tên mẫu<TAB>file read" hoặc chỉ "file read",
+    bỏ qua dòng trống và dòng bắt đầu bằng "#". Đường dẫn tương đối được tính từ thư mục chứa file danh sách
+
+    Args:
+        filename (str): File danh sách mẫu
+
+    Returns:
+        List[Tuple[str, str]]: Tên mẫu và file read của từng mẫu
+    """
+
+    directory: str = os.path.dirname(os.path.abspath(filename))
+    samples: List[Tuple[str, str]] = []
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            fields: List[str] = line.split("\t")
+            path: str = os.path.join(directory, fields[-1].strip())
+            samples.append((fields[0].strip() if len(fields) > 1 else sample_name(filename=path), path))
+
+    return samples
+
+
+def collect_jobs(patterns: Iterable[str], manifest: Optional[str], output_dir: str) -> List[Job]:
+    """Tạo danh sách mẫu từ các mẫu glob và file danh sách
+
+    Args:
+        patterns (Iterable[str]): Các file hoặc mẫu glob của file read
+        manifest (Optional[str]): File danh sách mẫu, None nếu không có
+        output_dir (str): Thư mục ghi các file contig
+
+    Returns:
+        List[Job]: Các mẫu theo thứ tự, mỗi tên mẫu chỉ xuất hiện một lần
+    """
+
+    samples: List[Tuple[str, str]] = read_manifest(filename=manifest) if manifest else []
+    for pattern in patterns:
+        # Mẫu không khớp file nào được giữ nguyên để lỗi "không tồn tại" được báo cho đúng mẫu đó
+        paths: List[str] = sorted(glob.glob(pattern)) or [pattern]
+        samples.extend((sample_name(filename=path), path) for path in paths)
+
+    jobs: List[Job] = []
+    seen: Dict[str, str] = {}
+    for sample, path in samples:
+        if sample in seen:
+            raise ValueError("Tên mẫu {} bị trùng giữa {} và {}".format(sample, seen[sample], path))
+        seen[sample] = path
+        jobs.append(Job(sample=sample, filename=path, output=os.path.join(output_dir, sample + FASTA_SUFFIX)))
+
+    return jobs
+
+
+def on_alarm(signum: int, frame: Any) -> None:
+    """Xử lý tín hiệu SIGALRM khi một mẫu chạy quá thời gian
+    """
+
+    raise TimeLimitExceeded()
+
+
+def run_job(args: Tuple[Job, Dict[str, Any], int, int]) -> JobResult:
+    """Lắp ráp một mẫu trong một tiến trình của pool. Mọi lỗi đều được trả về trong kết quả thay vì làm dừng cả lô.
+    Contig được ghi ra file tạm rồi mới đổi tên, mẫu bị lỗi không để lại file contig dở dang
+
+    Args:
+        args (Tuple[Job, Dict[str, Any], int, int]): Mẫu, các tham số của Assembler (của MultiKAssembler nếu có "ks",
+            của Assembler.auto nếu có "candidates"),
+            giới hạn bộ nhớ (byte) và thời gian (giây), 0 là không giới hạn
+
+    Returns:
+        JobResult: Kết quả của mẫu
+    """
+
+    job, options, memory_limit, time_limit = args
+    start: float = time.perf_counter()
+    temporary: str = job.output + ".part"
+
+    # Mỗi tiến trình chỉ chạy một mẫu nên các giới hạn không ảnh hưởng tới mẫu khác
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+    if time_limit and hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, on_alarm)
+        signal.alarm(time_limit)
+
+    try:
+        if "ks" in options:
+            assembly: MultiKAssembler = MultiKAssembler(filename=job.filename, **options)
+            merges: int = assembly.run()
+        else:
+            assembly = Assembler.auto(filename=job.filename, **options) if "candidates" in options else Assembler(filename=job.filename, **options)
+            merges = assembly.make_superpath()
+        k: int = assembly.ks[-1] if "ks" in options else assembly.k
+        with open(temporary, "w") as f:
+            contigs: int = assembly.write_contigs(handle=f)
+        os.replace(temporary, job.output)
+        result: JobResult = JobResult(sample=job.sample, ok=True, contigs=contigs, merges=merges, k=k)
+    except TimeLimitExceeded:
+        result = JobResult(sample=job.sample, ok=False, error="quá thời gian {} giây".format(time_limit))
+    except MemoryError:
+        result = JobResult(sample=job.sample, ok=False, error="vượt giới hạn bộ nhớ {} byte".format(memory_limit))
+    except Exception as e:
+        result = JobResult(sample=job.sample, ok=False, error="{}: {}".format(type(e).__name__, e))
+        traceback.print_exc(file=sys.stderr)
+    finally:
+        if time_limit and hasattr(signal, "SIGALRM"):
+            signal.alarm(0)
+
+    if not result.ok and os.path.exists(temporary):
+        os.remove(temporary)
+    result.seconds = time.perf_counter() - start
+
+    return result
+
+
+def run_batch(jobs: List[Job], options: Dict[str, Any], workers: int = 1, memory_limit: int = 0, time_limit: int = 0) -> Iterator[JobResult]:
+    """Lắp ráp các mẫu song song, mỗi mẫu trong một tiến trình riêng, trả về kết quả theo thứ tự hoàn thành
+
+    Args:
+        jobs (List[Job]): Các mẫu
+        options (Dict[str, Any]): Các tham số của Assembler (trừ filename), của MultiKAssembler nếu có "ks"
+            hoặc của Assembler.auto nếu có "candidates"
+        workers (int, optional): Số tiến trình. Defaults to 1.
+        memory_limit (int, optional): Giới hạn bộ nhớ ảo của mỗi mẫu (byte), 0 là không giới hạn. Defaults to 0.
+        time_limit (int, optional): Giới hạn thời gian của mỗi mẫu (giây), 0 là không giới hạn. Defaults to 0.
+
+    Returns:
+        Iterator[JobResult]: Kết quả của từng mẫu
+    """
+
+    for job in jobs:
+        directory: str = os.path.dirname(job.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # Mỗi mẫu chạy trong một pool một tiến trình riêng: giới hạn tài nguyên và bộ nhớ bị phân mảnh không chuyển sang mẫu sau,
+    # và khi tiến trình bị hệ điều hành dừng hẳn (OOM killer, SIGKILL, segfault) thì chỉ mẫu đó bị báo lỗi
+    pending: List[Job] = list(reversed(jobs))
+    running: Dict[Future, Tuple[Job, ProcessPoolExecutor, float]] = {} # Mẫu, pool và thời điểm bắt đầu của từng mẫu đang chạy
+    try:
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                job: Job = pending.pop()
+                executor: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=1)
+                running[executor.submit(run_job, (job, options, memory_limit, time_limit))] = (job, executor, time.perf_counter())
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, executor, start = running.pop(future)
+                executor.shutdown(wait=True)
+                try:
+                    result: JobResult = future.result()
+                except BrokenProcessPool:
+                    result = JobResult(sample=job.sample, ok=False, seconds=time.perf_counter() - start,
+                                       error="tiến trình lắp ráp bị dừng đột ngột (có thể do hết bộ nhớ)")
+                    if os.path.exists(job.output + ".part"):
+                        os.remove(job.output + ".part")
+                yield result
+    finally:
+        for _, executor, _ in running.values():
+            executor.shutdown(wait=False, cancel_futures=True)
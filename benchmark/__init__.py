@@ -0,0 +1,4 @@
+from benchmark.simulate import random_genome, repeat_genome, simulate_reads, write_fastq
+from benchmark.profiler import StageResult, measure
+from benchmark.scaling import fit_exponent
+from benchmark.suite import BenchmarkSuite, STAGES, GENOMES
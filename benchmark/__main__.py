@@ -0,0 +1,44 @@
+import sys
+import json
+import argparse
+from typing import Any, Dict
+
+from benchmark.suite import BenchmarkSuite, STAGES, GENOMES
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(prog="python -m benchmark",
+                                                              description="Đo thời gian và bộ nhớ của các bước lắp ráp trên bộ gen tổng hợp")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 4000, 8000, 16000], help="Các độ dài bộ gen")
+    parser.add_argument("--genome", choices=GENOMES, default="random", help="Loại bộ gen")
+    parser.add_argument("-k", type=int, default=31, help="Độ dài một k-mer")
+    parser.add_argument("--read-length", type=int, default=100, help="Độ dài mỗi read")
+    parser.add_argument("--coverage", type=float, default=20.0, help="Độ phủ trung bình")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Xác suất đọc sai mỗi ký tự")
+    parser.add_argument("--both-strands", action="store_true", help="Lấy read trên cả hai mạch")
+    parser.add_argument("--threshold", type=int, default=2, help="Ngưỡng sửa lỗi")
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python", help="Cách sửa lỗi")
+    parser.add_argument("--no-correction", action="store_true", help="Bỏ qua bước sửa lỗi")
+    parser.add_argument("--no-memory", action="store_true", help="Không đo bộ nhớ đỉnh, lần chạy với tracemalloc chậm hơn nhiều lần")
+    parser.add_argument("--seed", type=int, default=0, help="Hạt giống ngẫu nhiên")
+    parser.add_argument("--output", default="-", help="File JSON để ghi kết quả, \"-\" để ghi ra stdout")
+    args: argparse.Namespace = parser.parse_args()
+
+    suite: BenchmarkSuite = BenchmarkSuite(sizes=args.sizes, k=args.k, genome=args.genome, read_length=args.read_length, coverage=args.coverage,
+                                           error_rate=args.error_rate, both_strands=args.both_strands, threshold=args.threshold,
+                                           engine=args.engine, correction=not args.no_correction, memory=not args.no_memory, seed=args.seed)
+    report: Dict[str, Any] = suite.run()
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    # Tóm tắt số mũ cho người đọc, tách khỏi JSON trên stdout
+    for stage in STAGES:
+        if stage in report["scaling"]:
+            exponents: Dict[str, Any] = report["scaling"][stage]
+            sys.stderr.write("{:<20} thời gian ~ n^{}, bộ nhớ ~ n^{}\n".format(
+                stage, *["{:.2f}".format(value) if value is not None else "?" for value in (exponents["seconds"], exponents["peak_bytes"])]))
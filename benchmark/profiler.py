@@ -0,0 +1,67 @@
+import gc
+import time
+import tracemalloc
+from typing import Any, Dict, Callable, Tuple
+
+
+class StageResult(object):
+    """
+    Thời gian chạy và bộ nhớ đỉnh của một bước ở một kích thước đầu vào
+    """
+
+    def __init__(self, stage: str, size: int, seconds: float = 0.0, peak_bytes: int = 0) -> None:
+        """
+
+        Args:
+            stage (str): Tên bước
+            size (int): Kích thước đầu vào (độ dài bộ gen)
+            seconds (float, optional): Thời gian chạy (giây). Defaults to 0.0.
+            peak_bytes (int, optional): Bộ nhớ Python cấp phát thêm nhiều nhất trong khi chạy. Defaults to 0.
+        """
+
+        self.stage: str = stage
+        self.size: int = size
+        self.seconds: float = seconds
+        self.peak_bytes: int = peak_bytes
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: Kết quả dạng dict để ghi ra JSON
+        """
+
+        return {"stage": self.stage, "size": self.size, "seconds": self.seconds, "peak_bytes": self.peak_bytes}
+
+
+def measure(func: Callable[[], Any], trace: bool = False) -> Tuple[Any, float, int]:
+    """Chạy một hàm và đo thời gian chạy, cùng bộ nhớ đỉnh nếu trace.
+    tracemalloc làm chậm chương trình nhiều lần nên thời gian và bộ nhớ nên được đo ở hai lần chạy khác nhau
+
+    Args:
+        func (Callable[[], Any]): Hàm cần đo
+        trace (bool, optional): Đo bộ nhớ đỉnh bằng tracemalloc. Defaults to False.
+
+    Returns:
+        Tuple[Any, float, int]: Kết quả của hàm, thời gian chạy (giây) và bộ nhớ đỉnh (byte, bằng 0 nếu không trace)
+    """
+
+    # Dọn rác trước để bộ nhớ của bước trước không bị tính vào bước này
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+
+    start: float = time.perf_counter()
+    result: Any = func()
+    seconds: float = time.perf_counter() - start
+
+    peak_bytes: int = 0
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_bytes = peak - base
+
+    return result, seconds, peak_bytes
@@ -0,0 +1,27 @@
+import math
+from typing import List, Optional
+
+
+def fit_exponent(sizes: List[float], values: List[float]) -> Optional[float]:
+    """Ước lượng số mũ b trong values ~ a * sizes^b bằng bình phương tối thiểu trên thang log-log.
+    b gần 1 là tuyến tính, gần 2 là bình phương
+
+    Args:
+        sizes (List[float]): Các kích thước đầu vào
+        values (List[float]): Giá trị đo được (thời gian hoặc bộ nhớ) ở từng kích thước
+
+    Returns:
+        Optional[float]: Số mũ, None nếu có ít hơn hai điểm dương với kích thước khác nhau
+    """
+
+    points: List[List[float]] = [[math.log(x), math.log(y)] for x, y in zip(sizes, values) if x > 0 and y > 0]
+    if len(points) < 2:
+        return None
+
+    mean_x: float = sum(x for x, _ in points) / len(points)
+    mean_y: float = sum(y for _, y in points) / len(points)
+    variance: float = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
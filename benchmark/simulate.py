@@ -0,0 +1,130 @@
+import random
+from typing import List, Iterator, Tuple, TextIO
+
+import kmer
+
+
+def random_genome(length: int, seed: int = 0) -> str:
+    """Tạo một bộ gen ngẫu nhiên, mỗi ký tự được chọn đều trong A, C, G, T
+
+    Args:
+        length (int): Độ dài bộ gen
+        seed (int, optional): Hạt giống ngẫu nhiên. Defaults to 0.
+
+    Returns:
+        str: Bộ gen
+    """
+
+    rng: random.Random = random.Random(seed)
+
+    return "".join(rng.choices(kmer.BASES, k=length))
+
+
+def mutate(sequence: str, rate: float, rng: random.Random) -> str:
+    """Thay ngẫu nhiên các ký tự của chuỗi bằng một ký tự khác
+
+    Args:
+        sequence (str): Chuỗi ban đầu
+        rate (float): Xác suất mỗi ký tự bị thay
+        rng (random.Random): Nguồn ngẫu nhiên
+
+    Returns:
+        str: Chuỗi sau khi thay
+    """
+
+    if rate <= 0:
+        return sequence
+
+    bases: List[str] = list(sequence)
+    for i, base in enumerate(bases):
+        if rng.random() < rate:
+            bases[i] = rng.choice([b for b in kmer.BASES if b != base])
+
+    return "".join(bases)
+
+
+def repeat_genome(length: int, repeat_length: int = 500, repeat_fraction: float = 0.3, divergence: float = 0.01, families: int = 4, seed: int = 0) -> str:
+    """Tạo một bộ gen có nhiều đoạn lặp: các bản sao (có sai khác nhỏ) của một vài đoạn lặp gốc
+    được chèn xen kẽ với các đoạn ngẫu nhiên
+
+    Args:
+        length (int): Độ dài bộ gen
+        repeat_length (int, optional): Độ dài mỗi đoạn lặp. Defaults to 500.
+        repeat_fraction (float, optional): Tỉ lệ bộ gen nằm trong các đoạn lặp. Defaults to 0.3.
+        divergence (float, optional): Xác suất mỗi ký tự của một bản sao khác với đoạn lặp gốc. Defaults to 0.01.
+        families (int, optional): Số đoạn lặp gốc. Defaults to 4.
+        seed (int, optional): Hạt giống ngẫu nhiên. Defaults to 0.
+
+    Returns:
+        str: Bộ gen
+    """
+
+    if not 0 <= repeat_fraction < 1:
+        raise ValueError("Tỉ lệ đoạn lặp phải nằm trong khoảng [0, 1)")
+
+    rng: random.Random = random.Random(seed)
+    repeats: List[str] = ["".join(rng.choices(kmer.BASES, k=repeat_length)) for _ in range(families)]
+
+    # Độ dài trung bình của đoạn ngẫu nhiên giữa hai bản sao để các đoạn lặp chiếm khoảng repeat_fraction bộ gen
+    gap: int = max(1, round(repeat_length * (1 - repeat_fraction) / max(repeat_fraction, 1e-9)))
+    parts: List[str] = []
+    total: int = 0
+    while total < length:
+        unique: str = "".join(rng.choices(kmer.BASES, k=rng.randint(gap // 2 + 1, gap + gap // 2 + 1)))
+        copy: str = mutate(sequence=rng.choice(repeats), rate=divergence, rng=rng) if repeat_fraction > 0 else ""
+        parts.append(unique)
+        parts.append(copy)
+        total += len(unique) + len(copy)
+
+    return "".join(parts)[:length]
+
+
+def simulate_reads(genome: str, read_length: int, coverage: float, error_rate: float = 0.0, both_strands: bool = False,
+                   seed: int = 0) -> Iterator[Tuple[str, str]]:
+    """Lấy ngẫu nhiên các read từ bộ gen với lỗi thay thế ký tự
+
+    Args:
+        genome (str): Bộ gen
+        read_length (int): Độ dài mỗi read
+        coverage (float): Độ phủ trung bình, số read bằng coverage * len(genome) / read_length
+        error_rate (float, optional): Xác suất mỗi ký tự của read bị đọc sai. Defaults to 0.0.
+        both_strands (bool, optional): Mỗi read có một nửa khả năng được lấy trên mạch bổ sung ngược. Defaults to False.
+        seed (int, optional): Hạt giống ngẫu nhiên. Defaults to 0.
+
+    Returns:
+        Iterator[Tuple[str, str]]: Chuỗi và chuỗi chất lượng (Phred+33) của từng read, ký tự bị đọc sai có chất lượng thấp
+    """
+
+    if read_length > len(genome):
+        raise ValueError("Read dài hơn bộ gen")
+
+    rng: random.Random = random.Random(seed)
+    reads: int = round(coverage * len(genome) / read_length)
+    for _ in range(reads):
+        start: int = rng.randrange(len(genome) - read_length + 1)
+        read: str = genome[start:start+read_length]
+        if both_strands and rng.random() < 0.5:
+            read = kmer.reverse_complement(read)
+
+        sequence: str = mutate(sequence=read, rate=error_rate, rng=rng)
+        quality: str = "".join(["I" if a == b else "#" for a, b in zip(read, sequence)])
+        yield sequence, quality
+
+
+def write_fastq(handle: TextIO, reads: Iterator[Tuple[str, str]]) -> int:
+    """Ghi các read ra file FASTQ
+
+    Args:
+        handle (TextIO): File để ghi
+        reads (Iterator[Tuple[str, str]]): Chuỗi và chuỗi chất lượng của từng read
+
+    Returns:
+        int: Số read đã ghi
+    """
+
+    count: int = 0
+    for sequence, quality in reads:
+        count += 1
+        handle.write("@read_{}\n{}\n+\n{}\n".format(count, sequence, quality))
+
+    return count
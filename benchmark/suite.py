@@ -0,0 +1,188 @@
+import os
+import tempfile
+from typing import Any, List, Dict, Optional
+
+from assembly import Assembler
+from graph import Graph
+from loader import Loader
+
+from benchmark.profiler import StageResult, measure
+from benchmark.scaling import fit_exponent
+from benchmark.simulate import random_genome, repeat_genome, simulate_reads, write_fastq
+
+
+STAGES: List[str] = ["Loader.load", "Graph.__init__", "error_correction", "make_superpath", "find_eulerian_path"] # Các bước được đo theo thứ tự
+GENOMES: List[str] = ["random", "repeat"] # Các loại bộ gen tổng hợp
+
+
+class BenchmarkSuite(object):
+    """
+    Đo thời gian và bộ nhớ của từng bước lắp ráp trên các bộ gen tổng hợp có kích thước tăng dần,
+    rồi ước lượng số mũ tăng trưởng của từng bước theo kích thước bộ gen
+    """
+
+    def __init__(self, sizes: List[int], k: int = 31, genome: str = "random", read_length: int = 100, coverage: float = 20.0,
+                 error_rate: float = 0.0, both_strands: bool = False, threshold: int = 2, engine: str = "python",
+                 correction: bool = True, memory: bool = True, seed: int = 0) -> None:
+        """
+
+        Args:
+            sizes (List[int]): Các độ dài bộ gen
+            k (int, optional): Độ dài một k-mer. Defaults to 31.
+            genome (str, optional): Loại bộ gen, "random" hoặc "repeat". Defaults to "random".
+            read_length (int, optional): Độ dài mỗi read. Defaults to 100.
+            coverage (float, optional): Độ phủ trung bình. Defaults to 20.0.
+            error_rate (float, optional): Xác suất đọc sai mỗi ký tự. Defaults to 0.0.
+            both_strands (bool, optional): Lấy read trên cả hai mạch. Defaults to False.
+            threshold (int, optional): Ngưỡng sửa lỗi. Defaults to 2.
+            engine (str, optional): Cách sửa lỗi, "python" hoặc "numpy". Defaults to "python".
+            correction (bool, optional): Có đo bước sửa lỗi không (bước chậm nhất). Defaults to True.
+            memory (bool, optional): Chạy thêm một lần với tracemalloc để đo bộ nhớ đỉnh. Defaults to True.
+            seed (int, optional): Hạt giống ngẫu nhiên. Defaults to 0.
+        """
+
+        if genome not in GENOMES:
+            raise ValueError("Không hỗ trợ loại bộ gen {}, hãy sử dụng \"random\" hoặc \"repeat\"".format(genome))
+
+        self.sizes: List[int] = sorted(sizes)
+        self.k: int = k
+        self.genome: str = genome
+        self.read_length: int = read_length
+        self.coverage: float = coverage
+        self.error_rate: float = error_rate
+        self.both_strands: bool = both_strands
+        self.threshold: int = threshold
+        self.engine: str = engine
+        self.correction: bool = correction
+        self.memory: bool = memory
+        self.seed: int = seed
+        self.results: List[StageResult] = [] # Kết quả của các bước ở mọi kích thước
+
+
+    def make_reads(self, size: int, filename: str) -> int:
+        """Tạo bộ gen và ghi các read mô phỏng ra file FASTQ
+
+        Args:
+            size (int): Độ dài bộ gen
+            filename (str): File FASTQ để ghi
+
+        Returns:
+            int: Số read đã ghi
+        """
+
+        if self.genome == "repeat":
+            reference: str = repeat_genome(length=size, seed=self.seed)
+        else:
+            reference: str = random_genome(length=size, seed=self.seed)
+
+        with open(filename, "w") as f:
+            return write_fastq(handle=f, reads=simulate_reads(genome=reference, read_length=self.read_length, coverage=self.coverage,
+                                                              error_rate=self.error_rate, both_strands=self.both_strands, seed=self.seed))
+
+
+    def run_stages(self, filename: str, trace: bool) -> Dict[str, List[Any]]:
+        """Chạy lần lượt các bước trên một file read
+
+        Args:
+            filename (str): File FASTQ
+            trace (bool): Đo bộ nhớ đỉnh bằng tracemalloc
+
+        Returns:
+            Dict[str, List[Any]]: Thời gian chạy và bộ nhớ đỉnh của từng bước
+        """
+
+        measured: Dict[str, List[Any]] = {}
+
+        _, seconds, peak = measure(func=lambda: Loader.load(filename=filename), trace=trace)
+        measured["Loader.load"] = [seconds, peak]
+
+        _, seconds, peak = measure(func=lambda: Graph(seqs=Loader.stream(filename=filename), k=self.k, threshold=self.threshold), trace=trace)
+        measured["Graph.__init__"] = [seconds, peak]
+
+        if self.correction:
+            # Đồ thị rỗng chỉ để gọi error_correction, các read được đọc lại từ file
+            graph: Graph = Graph(seqs=[], k=self.k, threshold=self.threshold, engine=self.engine)
+            graph.seqs = Loader.stream(filename=filename)
+            _, seconds, peak = measure(func=lambda: sum(1 for _ in graph.error_correction(threshold=self.threshold)), trace=trace)
+            measured["error_correction"] = [seconds, peak]
+
+        # Superpath và đường đi Euler chạy trên cùng một đồ thị, việc tạo đồ thị không được tính vào hai bước này
+        assembler: Assembler = Assembler(filename=filename, k=self.k)
+        _, seconds, peak = measure(func=assembler.make_superpath, trace=trace)
+        measured["make_superpath"] = [seconds, peak]
+
+        _, seconds, peak = measure(func=assembler.find_eulerian_path, trace=trace)
+        measured["find_eulerian_path"] = [seconds, peak]
+
+        return measured
+
+
+    def run_size(self, size: int) -> List[StageResult]:
+        """Đo các bước ở một kích thước bộ gen
+
+        Args:
+            size (int): Độ dài bộ gen
+
+        Returns:
+            List[StageResult]: Kết quả của các bước đã đo
+        """
+
+        with tempfile.TemporaryDirectory(prefix="benchmark-") as directory:
+            filename: str = os.path.join(directory, "reads.fastq")
+            self.make_reads(size=size, filename=filename)
+
+            # Thời gian được đo ở lần chạy không có tracemalloc
+            timings: Dict[str, List[Any]] = self.run_stages(filename=filename, trace=False)
+            peaks: Optional[Dict[str, List[Any]]] = self.run_stages(filename=filename, trace=True) if self.memory else None
+
+        results: List[StageResult] = []
+        for stage in STAGES:
+            if stage not in timings:
+                continue
+            results.append(StageResult(stage=stage, size=size, seconds=timings[stage][0], peak_bytes=peaks[stage][1] if peaks else 0))
+        self.results.extend(results)
+
+        return results
+
+
+    def scaling(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Số mũ tăng trưởng của thời gian và bộ nhớ theo kích thước bộ gen cho từng bước
+
+        Returns:
+            Dict[str, Dict[str, Optional[float]]]: Số mũ "seconds" và "peak_bytes" của từng bước
+        """
+
+        exponents: Dict[str, Dict[str, Optional[float]]] = {}
+        for stage in STAGES:
+            results: List[StageResult] = [result for result in self.results if result.stage == stage]
+            if not results:
+                continue
+            sizes: List[float] = [result.size for result in results]
+            exponents[stage] = {
+                "seconds": fit_exponent(sizes=sizes, values=[result.seconds for result in results]),
+                "peak_bytes": fit_exponent(sizes=sizes, values=[result.peak_bytes for result in results]) if self.memory else None,
+            }
+
+        return exponents
+
+
+    def run(self) -> Dict[str, Any]:
+        """Đo các bước ở mọi kích thước
+
+        Returns:
+            Dict[str, Any]: Cấu hình, kết quả từng bước và số mũ tăng trưởng, ghi được ra JSON
+        """
+
+        self.results = []
+        for size in self.sizes:
+            self.run_size(size=size)
+
+        return {
+            "config": {
+                "sizes": self.sizes, "k": self.k, "genome": self.genome, "read_length": self.read_length, "coverage": self.coverage,
+                "error_rate": self.error_rate, "both_strands": self.both_strands, "threshold": self.threshold, "engine": self.engine,
+                "seed": self.seed,
+            },
+            "results": [result.to_dict() for result in self.results],
+            "scaling": self.scaling(),
+        }
@@ -0,0 +1,593 @@
+import math
+from typing import List, Dict, Iterable, Iterator, Tuple, Union
+
+import numpy as np
+
+import kmer
+from counting import chunk_reads
+
+
+DENSE_MAX_K: int = 12 # Với k không quá giá trị này, bảng tần số là một mảng 4^k phần tử (64 MiB khi k = 12)
+EXTRA_MAX: int = 4096 # Bảng phụ lớn hơn giá trị này (và 1/64 bảng chính) thì được gộp vào bảng chính để việc tra cứu không chậm đi
+CORRECTION_CHUNK_SIZE: int = 256 # Số read được mã hóa và tra bảng tần số cùng lúc khi sửa lỗi
+HASH_MULTIPLIER: np.uint64 = np.uint64(0x9E3779B97F4A7C15) # Hằng số băm nhân Fibonacci
+COLLIDED: np.int64 = np.int64(1 << 62) # Cờ của ô băm có nhiều khóa
+EXTRA: np.int64 = np.int64(1 << 61) # Cờ của ô băm có k-mer trong bảng phụ
+POSITION_MASK: np.int64 = EXTRA - np.int64(1) # Phần còn lại của ô băm là vị trí khóa trong bảng chính
+LETTERS: bytes = kmer.BASES.encode("ascii").ljust(256, b"N") # Bảng bytes.translate từ mã 2 bit sang ký tự
+
+class KmerTable(object):
+    """
+    Bảng tần số k-mer dạng mảng đã sắp xếp. Tra cứu theo lô qua một bảng băm trỏ vào mảng khóa:
+    mỗi mã chỉ cần đọc một ô băm và một hàng (khóa, số lần xuất hiện), chỉ các mã rơi vào ô bị trùng
+    mới cần tìm kiếm nhị phân. Các k-mer mới sinh ra khi sửa lỗi được lưu trong một bảng phụ nhỏ cũng được sắp xếp
+    """
+
+    def __init__(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """
+
+        Args:
+            keys (np.ndarray): Mã 2 bit của các k-mer, đã sắp xếp tăng dần
+            counts (np.ndarray): Số lần xuất hiện của từng k-mer
+        """
+
+        self.extra_keys: np.ndarray = np.empty(0, dtype=np.uint64) # Các k-mer mới sinh ra khi sửa lỗi
+        self.extra_counts: np.ndarray = np.empty(0, dtype=np.int64)
+        self.build(keys=keys, counts=counts.astype(np.int64))
+
+
+    def build(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """Tạo bảng chính và bảng băm có khoảng 4 ô cho mỗi khóa, mỗi ô trỏ tới khóa đầu tiên được băm vào ô đó
+
+        Args:
+            keys (np.ndarray): Mã 2 bit của các k-mer, đã sắp xếp tăng dần
+            counts (np.ndarray): Số lần xuất hiện của từng k-mer
+        """
+
+        self.keys: np.ndarray = keys # Dùng cho tìm kiếm nhị phân
+        # Khóa và số lần xuất hiện nằm cạnh nhau để một lần đọc bộ nhớ lấy được cả hai
+        self.entries: np.ndarray = np.empty((len(keys), 2), dtype=np.uint64)
+        self.entries[:, 0] = keys
+        self.counts: np.ndarray = self.entries[:, 1].view(np.int64)
+        self.counts[:] = counts
+
+        bits: int = max(len(keys) - 1, 1).bit_length() + 2
+        self.hash_shift: np.uint64 = np.uint64(64 - bits)
+        hashes: np.ndarray = self.hash(codes=keys)
+
+        # Ô trống trỏ tới khóa cuối cùng, phép so sánh khóa sẽ cho kết quả không tìm thấy
+        self.slots: np.ndarray = np.full(1 << bits, max(len(keys) - 1, 0), dtype=np.int64)
+        slots, first, sizes = np.unique(hashes, return_index=True, return_counts=True)
+        self.slots[slots] = first
+        # Các ô có nhiều khóa cần tìm kiếm nhị phân khi mã không trùng với khóa được trỏ tới
+        self.slots[slots[sizes > 1]] |= COLLIDED
+
+
+    def hash(self, codes: np.ndarray) -> np.ndarray:
+        """Tính ô trong bảng băm của các mã
+
+        Args:
+            codes (np.ndarray): Mã 2 bit của các k-mer
+
+        Returns:
+            np.ndarray: Chỉ số ô của từng mã
+        """
+
+        return (codes * HASH_MULTIPLIER) >> self.hash_shift
+
+
+    def find(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Tìm vị trí của các mã trong bảng chính
+
+        Args:
+            codes (np.ndarray): Các mã cần tìm
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Vị trí của từng mã, mặt nạ các mã tìm thấy,
+            số lần xuất hiện (tùy ý với mã không tìm thấy) và ô băm của từng mã kèm các cờ
+        """
+
+        # take nhanh hơn nhiều so với chỉ mục mảng với các mảng nhỏ
+        info: np.ndarray = self.slots.take(self.hash(codes=codes))
+        if len(self.keys) == 0:
+            return np.zeros(codes.shape, dtype=np.int64), np.zeros(codes.shape, dtype=bool), np.zeros(codes.shape, dtype=np.int64), info
+
+        positions: np.ndarray = info & POSITION_MASK
+        rows: np.ndarray = self.entries.take(positions, axis=0)
+        found: np.ndarray = rows[..., 0] == codes
+        counts: np.ndarray = rows[..., 1].view(np.int64)
+
+        # Cờ COLLIDED là bit cao nhất được dùng nên so sánh là đủ
+        missed: np.ndarray = info >= COLLIDED
+        missed &= ~found
+        if missed.any():
+            missed_positions, missed_found = self.search(keys=self.keys, codes=codes[missed])
+            positions[missed] = missed_positions
+            found[missed] = missed_found
+            counts[missed] = self.counts[missed_positions]
+
+        return positions, found, counts, info
+
+
+    @staticmethod
+    def search(keys: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Tìm vị trí của các mã trong một mảng đã sắp xếp
+
+        Args:
+            keys (np.ndarray): Mảng đã sắp xếp
+            codes (np.ndarray): Các mã cần tìm
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Vị trí của từng mã và mặt nạ các mã tìm thấy
+        """
+
+        if len(keys) == 0:
+            return np.zeros(codes.shape, dtype=np.intp), np.zeros(codes.shape, dtype=bool)
+
+        # Tìm trên keys bỏ phần tử cuối để vị trí luôn hợp lệ, mã lớn hơn mọi khóa rơi vào phần tử cuối
+        positions: np.ndarray = np.searchsorted(keys[:-1], codes)
+
+        return positions, keys[positions] == codes
+
+
+    def lookup(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Tra số lần xuất hiện của nhiều k-mer cùng lúc
+
+        Args:
+            codes (np.ndarray): Mã 2 bit của các k-mer
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Số lần xuất hiện (0 nếu không có) và mặt nạ các k-mer có trong bảng
+        """
+
+        _, found, counts, info = self.find(codes=codes)
+        counts[~found] = 0
+
+        # Chỉ tìm trong bảng phụ các mã rơi vào ô băm của một k-mer trong bảng phụ
+        if len(self.extra_keys) > 0:
+            candidates: np.ndarray = (info & EXTRA) != 0
+            if candidates.any():
+                extra_positions, extra_found = self.search(keys=self.extra_keys, codes=codes[candidates])
+                counts[candidates] = np.where(extra_found, self.extra_counts[extra_positions], counts[candidates])
+                found[candidates] |= extra_found
+
+        return counts, found
+
+
+    def add(self, codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Cộng values vào số lần xuất hiện của các k-mer, thêm các k-mer vào bảng nếu chưa có
+
+        Args:
+            codes (np.ndarray): Mã 2 bit của các k-mer, một k-mer có thể xuất hiện nhiều lần
+            values (np.ndarray): Giá trị được cộng thêm cho từng lần xuất hiện
+
+        Returns:
+            np.ndarray: Số lần xuất hiện mới của từng k-mer
+        """
+
+        result: np.ndarray = np.empty(len(codes), dtype=np.int64)
+        positions, found, _, _ = self.find(codes=codes)
+        positions = positions[found]
+        np.add.at(self.counts, positions, values[found])
+        result[found] = self.counts[positions]
+        if found.all():
+            return result
+
+        missing: np.ndarray = ~found
+        codes, values = codes[missing], values[missing]
+        positions, found = self.search(keys=self.extra_keys, codes=codes)
+        np.add.at(self.extra_counts, positions[found], values[found])
+        if not found.all():
+            new_codes, inverse = np.unique(codes[~found], return_inverse=True)
+            positions = np.searchsorted(self.extra_keys, new_codes)
+            self.extra_keys = np.insert(self.extra_keys, positions, new_codes)
+            self.extra_counts = np.insert(self.extra_counts, positions, np.bincount(inverse.ravel(), weights=values[~found]).astype(np.int64))
+            self.slots[self.hash(codes=new_codes)] |= EXTRA
+        result[missing] = self.extra_counts[self.search(keys=self.extra_keys, codes=codes)[0]]
+
+        if len(self.extra_keys) > max(EXTRA_MAX, len(self.keys) >> 6):
+            # Các k-mer trong bảng phụ không có trong bảng chính nên chỉ cần chèn vào đúng vị trí
+            positions = np.searchsorted(self.keys, self.extra_keys)
+            self.build(keys=np.insert(self.keys, positions, self.extra_keys), counts=np.insert(self.counts, positions, self.extra_counts))
+            self.extra_keys = np.empty(0, dtype=np.uint64)
+            self.extra_counts = np.empty(0, dtype=np.int64)
+
+        return result
+
+
+class DenseKmerTable(object):
+    """
+    Bảng tần số k-mer đánh địa chỉ trực tiếp bằng mã 2 bit, dùng khi k nhỏ (4^k phần tử).
+    Giá trị -1 đánh dấu k-mer không có trong bảng
+    """
+
+    def __init__(self, keys: np.ndarray, counts: np.ndarray, k: int) -> None:
+        """
+
+        Args:
+            keys (np.ndarray): Mã 2 bit của các k-mer
+            counts (np.ndarray): Số lần xuất hiện của từng k-mer
+            k (int): Độ dài một k-mer
+        """
+
+        self.counts: np.ndarray = np.full(4 ** k, -1, dtype=np.int32)
+        self.counts[keys] = counts
+
+
+    def lookup(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Tra số lần xuất hiện của nhiều k-mer cùng lúc
+
+        Args:
+            codes (np.ndarray): Mã 2 bit của các k-mer
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Số lần xuất hiện (0 nếu không có) và mặt nạ các k-mer có trong bảng
+        """
+
+        counts: np.ndarray = self.counts.take(codes).astype(np.int64)
+        found: np.ndarray = counts >= 0
+
+        return np.maximum(counts, 0), found
+
+
+    def add(self, codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Cộng values vào số lần xuất hiện của các k-mer, thêm các k-mer vào bảng nếu chưa có
+
+        Args:
+            codes (np.ndarray): Mã 2 bit của các k-mer, một k-mer có thể xuất hiện nhiều lần
+            values (np.ndarray): Giá trị được cộng thêm cho từng lần xuất hiện
+
+        Returns:
+            np.ndarray: Số lần xuất hiện mới của từng k-mer
+        """
+
+        absent: np.ndarray = self.counts.take(codes) < 0
+        if absent.any():
+            self.counts[codes[absent]] = 0
+        np.add.at(self.counts, codes, values)
+
+        return self.counts.take(codes).astype(np.int64)
+
+
+class NumpyCorrector(object):
+    """
+    Sửa lỗi các read giống như Graph.error_correction nhưng các read được mã hóa thành mảng NumPy
+    và tất cả các phương án thay thế ký tự của một vùng yếu được tính điểm trong một lô
+    """
+
+    def __init__(self, reads: Iterable[str], k: int) -> None:
+        """
+
+        Args:
+            reads (Iterable[str]): Các read dùng để đếm k-mer
+            k (int): Độ dài một k-mer, tối đa 32 để mã 2 bit nằm trong một số nguyên 64 bit
+        """
+
+        if k > 32:
+            raise ValueError("Độ dài k-mer {} quá lớn, tối đa là 32".format(k))
+
+        self.k: int = k
+        self.half: int = int(math.ceil(k/2.0)) # Số vị trí ký tự được xét thay thế
+
+        # Các cặp (x, y) giống vòng lặp trong Graph.error_correction: vị trí thứ x tính từ cuối k-mer thứ i,
+        # k-mer thứ i+y, ký tự bị thay thế nằm ở bit 2*(x+y) của k-mer đó
+        # Các cặp được tính sẵn theo số k-mer còn lại từ i đến cuối read (tối đa k)
+        self.letters: np.ndarray = np.arange(4, dtype=np.uint64)
+        self.pairs: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = [None] + [self.make_pairs(remaining=m) for m in range(1, k+1)]
+        self.positions: np.ndarray = np.arange(k, dtype=np.intp) # Vị trí ký tự bị thay thế tính từ cuối k-mer
+        shifts: np.ndarray = (2 * self.positions).astype(np.uint64)
+        self.clears: np.ndarray = ~(np.uint64(3) << shifts) # Mặt nạ xóa ký tự thứ q tính từ cuối k-mer
+        self.placed: List[np.ndarray] = [letter << shifts for letter in self.letters] # Mã ký tự đã dịch tới vị trí thứ q
+        # Thay đổi số lần xuất hiện của m k-mer mới và m k-mer cũ
+        self.signs: List[np.ndarray] = [np.repeat(np.array([1, -1], dtype=np.int64), m) for m in range(k+1)]
+        self.touched: Dict[int, int] = {} # Số lần xuất hiện mới của các k-mer bị thay đổi trong nhóm read đang sửa
+
+        self.table: Union[KmerTable, DenseKmerTable] = self.count(reads=reads)
+
+
+    def make_pairs(self, remaining: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Tạo các cặp (x, y) khi chỉ còn remaining k-mer tính từ k-mer yếu đến cuối read
+
+        Args:
+            remaining (int): Số k-mer còn lại
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Các giá trị y (dạng cột), mặt nạ xóa ký tự bị thay thế,
+            mã của 4 ký tự thay thế đã dịch đúng vị trí và vị trí bắt đầu của từng nhóm x
+        """
+
+        pairs: List[Tuple[int, int]] = [(x, y) for x in range(self.half) for y in range(self.k-x) if y < remaining]
+        x: np.ndarray = np.array([x for x, _ in pairs], dtype=np.intp)
+        y: np.ndarray = np.array([y for _, y in pairs], dtype=np.intp)
+        shift: np.ndarray = (2 * (x + y)).astype(np.uint64)
+        clear: np.ndarray = (~(np.uint64(3) << shift))[:, None]
+        letters: np.ndarray = self.letters[None, :] << shift[:, None]
+        # Các cặp cùng x nằm liền nhau, y = 0 luôn có nên không có nhóm rỗng
+        starts: np.ndarray = np.flatnonzero(y == 0)
+
+        return y[:, None], clear, letters, starts
+
+
+    def encode(self, reads: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Mã hóa các k-mer của nhiều read cùng lúc trên chuỗi nối của các read
+
+        Args:
+            reads (List[str]): Các read cần mã hóa
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Mã 2 bit của các k-mer liên tiếp trong từng read (nối lại)
+            và vị trí bắt đầu k-mer của từng read (len(reads) + 1 phần tử)
+        """
+
+        lengths: np.ndarray = np.array([len(read) for read in reads], dtype=np.intp)
+        n_kmers: np.ndarray = np.maximum(lengths - self.k + 1, 0)
+        offsets: np.ndarray = np.zeros(len(reads) + 1, dtype=np.intp)
+        np.cumsum(n_kmers, out=offsets[1:])
+
+        bases: np.ndarray = np.frombuffer(kmer.encode_bases("".join(reads)), dtype=np.uint8).astype(np.uint64)
+        n: int = len(bases) - self.k + 1
+        if n <= 0 or offsets[-1] == 0:
+            return np.empty(0, dtype=np.uint64), offsets
+
+        # Mã của k-mer bắt đầu ở mọi vị trí trên chuỗi nối, kể cả các k-mer nằm vắt qua hai read
+        codes: np.ndarray = np.zeros(n, dtype=np.uint64)
+        for j in range(self.k):
+            codes = (codes << np.uint64(2)) | bases[j:j+n]
+
+        # Chỉ giữ các k-mer nằm trọn trong một read
+        starts: np.ndarray = np.zeros(len(reads), dtype=np.intp)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        index: np.ndarray = np.arange(offsets[-1], dtype=np.intp) + np.repeat(starts - offsets[:-1], n_kmers)
+
+        return codes[index], offsets
+
+
+    def count(self, reads: Iterable[str]) -> Union[KmerTable, DenseKmerTable]:
+        """Đếm các k-mer của tất cả các read
+
+        Args:
+            reads (Iterable[str]): Các read
+
+        Returns:
+            Union[KmerTable, DenseKmerTable]: Bảng tần số các k-mer
+        """
+
+        codes: np.ndarray = np.concatenate([np.empty(0, dtype=np.uint64)] + [self.encode(reads=chunk)[0] for chunk in chunk_reads(reads=reads)])
+        keys, counts = np.unique(codes, return_counts=True)
+
+        if self.k <= DENSE_MAX_K:
+            return DenseKmerTable(keys=keys, counts=counts, k=self.k)
+
+        return KmerTable(keys=keys, counts=counts)
+
+
+    def decode(self, codes: np.ndarray) -> str:
+        """Ghép các k-mer thành read: k-mer đầu tiên và ký tự cuối của các k-mer tiếp theo
+
+        Args:
+            codes (np.ndarray): Mã 2 bit của các k-mer
+
+        Returns:
+            str: Read được ghép lại
+        """
+
+        if len(codes) == 0:
+            return ""
+
+        return kmer.decode(code=int(codes[0]), length=self.k) + (codes[1:] & np.uint64(3)).astype(np.uint8).tobytes().translate(LETTERS).decode("ascii")
+
+
+    def score(self, codes: np.ndarray, counts: np.ndarray, i: int) -> Tuple[int, int, int]:
+        """Tính điểm tất cả các phương án thay thế của vùng yếu bắt đầu ở k-mer thứ i
+
+        Args:
+            codes (np.ndarray): Mã các k-mer của read
+            counts (np.ndarray): Số lần xuất hiện hiện tại của các k-mer trong read
+            i (int): Vị trí k-mer yếu
+
+        Returns:
+            Tuple[int, int, int]: Điểm tốt nhất, vị trí x và ký tự được chọn
+        """
+
+        # Bỏ đi các k-mer vượt quá cuối read
+        y, clear, letters, starts = self.pairs[min(len(codes) - i, self.k)]
+        index: np.ndarray = i + y
+
+        # Các k-mer thay thế, mỗi hàng ứng với một cặp (x, y), mỗi cột ứng với một ký tự A, C, G, T
+        options: np.ndarray = (codes.take(index) & clear) | letters
+
+        # Giữ nguyên ký tự cũ cho chênh lệch 0 vì k-mer gốc luôn có trong bảng với đúng số lần xuất hiện hiện tại
+        option_counts, found = self.table.lookup(codes=options)
+        gains: np.ndarray = option_counts - counts.take(index)
+        gains[~found] = -10
+
+        # Cộng điểm theo từng x
+        scores: np.ndarray = np.add.reduceat(gains, starts, axis=0)
+
+        # Giống thứ tự duyệt của vòng lặp gốc: lấy phương án đầu tiên đạt điểm cao nhất
+        best: int = int(scores.argmax())
+
+        return scores.item(best), best // 4, best % 4
+
+
+    def apply(self, codes: np.ndarray, start: int, letter: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Thay ký tự trong k k-mer bắt đầu từ k-mer start và cập nhật bảng tần số
+
+        Args:
+            codes (np.ndarray): Mã các k-mer của read
+            start (int): k-mer đầu tiên cần thay đổi, có thể âm giống chỉ mục list của vòng lặp gốc
+            letter (int): Mã của ký tự mới
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Các k-mer bị thay đổi số lần xuất hiện (đã sắp xếp, có thể lặp lại) và số lần xuất hiện mới của chúng
+        """
+
+        n: int = len(codes)
+        if start >= 0 or n >= self.k:
+            # Các vị trí bị thay đổi khác nhau nên thay đổi được cả k k-mer cùng lúc
+            m: int = max(min(self.k, n - start), 0)
+            if start >= 0:
+                old: np.ndarray = codes[start:start+m].copy()
+            else:
+                if m > 0 and start < -n:
+                    raise IndexError("list index out of range")
+                index: np.ndarray = start + self.positions[:m]
+                old = codes.take(index)
+            new: np.ndarray = (old & self.clears[:m]) | self.placed[letter][:m]
+            if start >= 0:
+                codes[start:start+m] = new
+            else:
+                codes[index] = new
+        else:
+            # Read ngắn hơn k và chỉ mục âm quay vòng: một k-mer có thể bị thay đổi nhiều lần như vòng lặp gốc
+            old_list: List[int] = []
+            new_list: List[int] = []
+            for q in range(self.k):
+                i: int = start + q
+                if i >= n:
+                    continue
+                if i < -n:
+                    raise IndexError("list index out of range")
+
+                old_list.append(int(codes[i]))
+                codes[i] = (old_list[-1] & ~(3 << (2 * q))) | (letter << (2 * q))
+                new_list.append(int(codes[i]))
+            old = np.array(old_list, dtype=np.uint64)
+            new = np.array(new_list, dtype=np.uint64)
+
+        # Bảng tần số chỉ cần tổng thay đổi nên được cập nhật một lần
+        changed: np.ndarray = np.concatenate([new, old])
+        changed_counts: np.ndarray = self.table.add(codes=changed, values=self.signs[len(new)])
+        self.touched.update(zip(changed.tolist(), changed_counts.tolist()))
+
+        order: np.ndarray = changed.argsort()
+
+        return changed.take(order), changed_counts.take(order)
+
+
+    def patch(self, codes: np.ndarray, counts: np.ndarray, changed: np.ndarray, changed_counts: np.ndarray) -> np.ndarray:
+        """Cập nhật số lần xuất hiện của các k-mer trong read mà không cần tra lại bảng tần số
+
+        Args:
+            codes (np.ndarray): Mã các k-mer của read
+            counts (np.ndarray): Số lần xuất hiện cũ của các k-mer
+            changed (np.ndarray): Các k-mer bị thay đổi số lần xuất hiện, đã sắp xếp
+            changed_counts (np.ndarray): Số lần xuất hiện mới của các k-mer bị thay đổi
+
+        Returns:
+            np.ndarray: Số lần xuất hiện mới của các k-mer
+        """
+
+        positions: np.ndarray = np.searchsorted(changed[:-1], codes)
+
+        return np.where(changed.take(positions) == codes, changed_counts.take(positions), counts)
+
+
+    def correct_many(self, reads: Iterable[str], threshold: int) -> Iterator[str]:
+        """Sửa lỗi lần lượt các read. Các read được mã hóa và tra bảng tần số theo từng nhóm,
+        số lần xuất hiện của các k-mer bị thay đổi bởi các lần sửa trước đó trong nhóm được lấy từ self.touched
+
+        Args:
+            reads (Iterable[str]): Các read cần sửa lỗi
+            threshold (int): Ngưỡng sửa lỗi để một k-mers được gọi là "đặc"
+
+        Returns:
+            Iterator[str]: Các read đã được sửa lỗi
+        """
+
+        # Nhóm nhỏ để ít read phải cập nhật lại số lần xuất hiện đã tra theo nhóm
+        for chunk in chunk_reads(reads=reads, size=CORRECTION_CHUNK_SIZE):
+            chunk_codes, offsets = self.encode(reads=chunk)
+            chunk_counts: np.ndarray = self.table.lookup(codes=chunk_codes)[0]
+            self.touched = {}
+
+            # Số k-mer yếu của từng read theo số lần xuất hiện đã tra theo nhóm
+            weak_totals: np.ndarray = np.zeros(len(chunk_codes) + 1, dtype=np.intp)
+            np.cumsum(chunk_counts < threshold, out=weak_totals[1:])
+            weak_counts: List[int] = (weak_totals[offsets[1:]] - weak_totals[offsets[:-1]]).tolist()
+            bounds: List[int] = offsets.tolist()
+            code_list: List[int] = chunk_codes.tolist()
+
+            for r, read in enumerate(chunk):
+                lo, hi = bounds[r], bounds[r+1]
+                if lo == hi:
+                    yield ""
+                    continue
+
+                codes: np.ndarray = chunk_codes[lo:hi]
+                counts: np.ndarray = chunk_counts[lo:hi]
+                weak: bool = weak_counts[r] > 0
+
+                # Số lần xuất hiện đã tra theo nhóm có thể đã bị thay đổi bởi các read trước
+                if self.touched:
+                    common: List[int] = sorted(self.touched.keys() & code_list[lo:hi])
+                    if common:
+                        changed: np.ndarray = np.array(common, dtype=np.uint64)
+                        changed_counts: np.ndarray = np.array([self.touched[code] for code in common], dtype=np.int64)
+                        counts = self.patch(codes=codes, counts=counts, changed=changed, changed_counts=changed_counts)
+                        weak = bool((counts < threshold).any())
+
+                # Read không có k-mer yếu nào thì giữ nguyên
+                if not weak:
+                    yield read.upper()
+                    continue
+
+                yield self.correct_codes(codes=codes, counts=counts, threshold=threshold)
+
+
+    def correct(self, read: str, threshold: int) -> str:
+        """Sửa lỗi một read
+
+        Args:
+            read (str): Read cần sửa lỗi
+            threshold (int): Ngưỡng sửa lỗi để một k-mers được gọi là "đặc"
+
+        Returns:
+            str: Read đã được sửa lỗi
+        """
+
+        return next(self.correct_many(reads=[read], threshold=threshold))
+
+
+    def correct_codes(self, codes: np.ndarray, counts: np.ndarray, threshold: int) -> str:
+        """Sửa lỗi một read đã được mã hóa, codes được thay đổi trực tiếp
+
+        Args:
+            codes (np.ndarray): Mã các k-mer của read
+            counts (np.ndarray): Số lần xuất hiện hiện tại của các k-mer trong read
+            threshold (int): Ngưỡng sửa lỗi để một k-mers được gọi là "đặc"
+
+        Returns:
+            str: Read đã được sửa lỗi
+        """
+
+        n: int = len(codes)
+        weak: List[bool] = (counts < threshold).tolist()
+
+        for i in range(n):
+            if not weak[i]:
+                continue
+
+            # Chưa đủ ceil(k/2) k-mer yếu trong k k-mer tính từ i thì vòng lặp gốc không tính điểm lần nào
+            window: List[bool] = weak[i:i+self.k]
+            if sum(window) < self.half:
+                continue
+
+            # Vòng lặp gốc tính điểm từ vị trí j mà cutoff về 0 tới hết cửa sổ, cutoff không tăng lại sau khi sửa
+            cutoff: int = self.half
+            first: int = 0
+            while cutoff > 0:
+                cutoff -= window[first]
+                first += 1
+
+            for _ in range(first - 1, len(window)):
+                best_score, x, letter = self.score(codes=codes, counts=counts, i=i)
+                # Lần tính điểm không thay đổi gì thì các lần sau cũng cho cùng kết quả
+                if best_score <= 0:
+                    break
+
+                changed, changed_counts = self.apply(codes=codes, start=i-x, letter=letter)
+                counts = self.patch(codes=codes, counts=counts, changed=changed, changed_counts=changed_counts)
+                weak = (counts < threshold).tolist()
+
+        return self.decode(codes=codes)
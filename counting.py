@@ -0,0 +1,633 @@
+import os
+import sys
+import glob
+import mmap
+import zlib
+import bisect
+import pickle
+import tempfile
+import multiprocessing
+from array import array
+from collections import Counter
+from typing import List, Dict, Iterable, Iterator, Tuple, BinaryIO, Optional
+
+import kmer
+from sketch import BloomFilter, SolidTable
+from readstore import ReadStore
+
+
+CHUNK_SIZE: int = 10000 # Số read trong mỗi phần việc gửi cho một tiến trình
+EXTERNAL_MAX_K: int = 32 # Khi đếm ngoài bộ nhớ, mã của mỗi k-mer phải vừa một số 64 bit
+BUCKET_PREFIX: int = 4 # Số ký tự đầu của k-mer dùng để chia các bucket ở lần ghi đầu tiên (256 bucket)
+SPLIT_PREFIX: int = 2 # Số ký tự thêm vào tiền tố mỗi khi một bucket quá lớn phải chia tiếp
+ENTRY_BYTES: int = 160 # Bộ nhớ ước tính của một k-mer khác nhau khi đếm một bucket (khóa, giá trị, ô trong bảng băm và danh sách đã sắp xếp)
+
+
+def chunk_reads(reads: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """Chia các read thành từng nhóm nhỏ
+
+    Args:
+        reads (Iterable[str]): Các read
+        size (int, optional): Số read trong một nhóm. Defaults to CHUNK_SIZE.
+
+    Returns:
+        Iterator[List[str]]: Các nhóm read
+    """
+
+    chunk: List[str] = []
+    for read in reads:
+        chunk.append(read)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def shard_of(k_mer: str, shards: int) -> int:
+    """Phân hoạch k-mer vào một shard theo giá trị băm.
+    Không dùng hash() vì giá trị băm của chuỗi khác nhau giữa các tiến trình
+
+    Args:
+        k_mer (str): k-mer cần phân hoạch
+        shards (int): Số shard
+
+    Returns:
+        int: Chỉ số shard của k-mer
+    """
+
+    return zlib.crc32(k_mer.encode("ascii")) % shards
+
+
+def read_kmers(read: str, k: int, canonical: bool = False) -> List[str]:
+    """Các k-mer của một read theo thứ tự
+
+    Args:
+        read (str): Read
+        k (int): Độ dài một k-mer
+        canonical (bool, optional): Thay mỗi k-mer bằng dạng chuẩn của nó. Defaults to False.
+
+    Returns:
+        List[str]: Các k-mer (hoặc dạng chuẩn của chúng) bắt đầu tại vị trí 0, 1, ..., len(read) - k
+    """
+
+    k_mers: List[str] = [read[i:i+k] for i in range(len(read)-k+1)]
+    if canonical:
+        # Chuỗi bổ sung ngược của read[i:i+k] là một đoạn của chuỗi bổ sung ngược của cả read,
+        # chỉ cần đảo read một lần thay vì đảo từng k-mer
+        reverse: str = kmer.reverse_complement(read)
+        n: int = len(read)
+        k_mers = [min(k_mer, reverse[n-i-k:n-i]) for i, k_mer in enumerate(k_mers)]
+
+    return k_mers
+
+
+def count_chunk(args: Tuple[List[str], int, int, bool]) -> List[Dict[str, int]]:
+    """Đếm các k-mer trong một nhóm read và chia kết quả theo shard
+
+    Args:
+        args (Tuple[List[str], int, int, bool]): Nhóm read, độ dài k-mer, số shard và có đếm theo dạng chuẩn không
+
+    Returns:
+        List[Dict[str, int]]: Bảng tần số của từng shard
+    """
+
+    reads, k, shards, canonical = args
+    counter: Counter = Counter()
+    for read in reads:
+        counter.update(read_kmers(read=read, k=k, canonical=canonical))
+
+    if shards == 1:
+        return [dict(counter)]
+
+    partitions: List[Dict[str, int]] = [{} for _ in range(shards)]
+    for k_mer, count in counter.items():
+        partitions[shard_of(k_mer=k_mer, shards=shards)][k_mer] = count
+
+    return partitions
+
+
+def spill_chunk(args: Tuple[int, List[str], int, int, bool, str]) -> None:
+    """Đếm các k-mer trong một nhóm read và ghi bảng tần số của từng shard ra một file riêng,
+    để các bảng từng phần không phải gửi qua tiến trình chính
+
+    Args:
+        args (Tuple[int, List[str], int, int, bool, str]): Số thứ tự nhóm, nhóm read, độ dài k-mer, số shard,
+            có đếm theo dạng chuẩn không và thư mục ghi file
+    """
+
+    index, reads, k, shards, canonical, directory = args
+    for shard, partition in enumerate(count_chunk(args=(reads, k, shards, canonical))):
+        if not partition:
+            continue
+
+        with open(os.path.join(directory, "{}-{}.pickle".format(shard, index)), "wb") as f:
+            pickle.dump(partition, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def merge_shard(args: Tuple[int, str]) -> Dict[str, int]:
+    """Gộp các bảng tần số từng phần của cùng một shard đã được ghi ra file
+
+    Args:
+        args (Tuple[int, str]): Chỉ số shard và thư mục chứa các file
+
+    Returns:
+        Dict[str, int]: Bảng tần số của shard
+    """
+
+    shard, directory = args
+    counter: Counter = Counter()
+    for path in glob.glob(os.path.join(directory, "{}-*.pickle".format(shard))):
+        with open(path, "rb") as f:
+            counter.update(pickle.load(f))
+
+    return dict(counter)
+
+
+class CountingReport(object):
+    """
+    Kết quả của một lần đếm k-mer có lọc các k-mer chỉ gặp một lần
+    """
+
+    def __init__(self) -> None:
+        self.kmers: int = 0 # Số k-mer trong bảng tần số (gặp ít nhất hai lần)
+        self.singletons: int = 0 # Số k-mer chỉ gặp một lần, không được đưa vào bảng (ước tính khi đếm tuần tự)
+        self.table_bytes: int = 0 # Bộ nhớ ước tính của bảng tần số (bảng băm và các chuỗi k-mer)
+        self.filter_bytes: int = 0 # Bộ nhớ của bộ lọc Bloom
+
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bộ nhớ ước tính tiết kiệm được so với bảng tần số đầy đủ: các k-mer chỉ gặp một lần
+        tính theo bộ nhớ trung bình của một k-mer trong bảng, trừ đi bộ lọc Bloom
+
+        Returns:
+            int: Số byte
+        """
+
+        if self.kmers == 0:
+            return -self.filter_bytes
+
+        return self.singletons * self.table_bytes // self.kmers - self.filter_bytes
+
+
+    def __str__(self) -> str:
+        """
+
+        Returns:
+            str: Tóm tắt kết quả
+        """
+
+        return "{} k-mer trong bảng, {} k-mer chỉ gặp một lần, bảng {} byte, bộ lọc {} byte, tiết kiệm {} byte".format(
+            self.kmers, self.singletons, self.table_bytes, self.filter_bytes, self.saved_bytes)
+
+
+class CanonicalTable(object):
+    """
+    Bảng tần số được đánh chỉ mục theo dạng chuẩn của k-mer. Phần sửa lỗi vẫn tra cứu và cập nhật
+    theo k-mer trên read như với một Dict[str, int], mỗi khóa được đổi sang dạng chuẩn trước khi dùng
+    """
+
+    def __init__(self, table: Dict[str, int]) -> None:
+        """
+
+        Args:
+            table (Dict[str, int]): Bảng tần số đã được đếm theo dạng chuẩn (dict hoặc SolidTable)
+        """
+
+        self.table: Dict[str, int] = table
+
+
+    def __getitem__(self, k_mer: str) -> int:
+        """
+
+        Args:
+            k_mer (str): k-mer
+
+        Returns:
+            int: Số lần xuất hiện của k-mer trên cả hai mạch
+        """
+
+        return self.table[kmer.canonical(k_mer)]
+
+
+    def __setitem__(self, k_mer: str, count: int) -> None:
+        """
+
+        Args:
+            k_mer (str): k-mer
+            count (int): Số lần xuất hiện mới của k-mer và chuỗi bổ sung ngược của nó
+        """
+
+        self.table[kmer.canonical(k_mer)] = count
+
+
+    def __contains__(self, k_mer: object) -> bool:
+        """
+
+        Args:
+            k_mer (object): k-mer
+
+        Returns:
+            bool: True nếu k-mer hoặc chuỗi bổ sung ngược của nó có trong bảng
+        """
+
+        return isinstance(k_mer, str) and kmer.canonical(k_mer) in self.table
+
+
+    def __len__(self) -> int:
+        """
+
+        Returns:
+            int: Số k-mer dạng chuẩn trong bảng
+        """
+
+        return len(self.table)
+
+
+def table_bytes(table: Dict[str, int]) -> int:
+    """Ước tính bộ nhớ của một bảng tần số: bảng băm và các chuỗi k-mer (các số đếm nhỏ được Python dùng chung)
+
+    Args:
+        table (Dict[str, int]): Bảng tần số
+
+    Returns:
+        int: Số byte
+    """
+
+    return sys.getsizeof(table) + sum(sys.getsizeof(k_mer) for k_mer in table)
+
+
+def merge_solid_shard(args: Tuple[int, str, int, float]) -> Tuple[Dict[str, int], BloomFilter]:
+    """Gộp các bảng tần số từng phần của một shard, tách các k-mer chỉ gặp một lần vào một bộ lọc Bloom
+
+    Args:
+        args (Tuple[int, str, int, float]): Chỉ số shard, thư mục chứa các file, số phần tử dự kiến và xác suất sai của bộ lọc
+
+    Returns:
+        Tuple[Dict[str, int], BloomFilter]: Các k-mer gặp ít nhất hai lần và bộ lọc chứa các k-mer còn lại
+    """
+
+    shard, directory, capacity, error_rate = args
+    singletons: BloomFilter = BloomFilter(capacity=capacity, error_rate=error_rate)
+    solid: Dict[str, int] = {}
+    for k_mer, count in merge_shard(args=(shard, directory)).items():
+        if count > 1:
+            solid[k_mer] = count
+        else:
+            singletons.add(k_mer)
+
+    return solid, singletons
+
+
+def count_solid_kmers(reads: Iterable[str], k: int, capacity: int, error_rate: float = 0.01, workers: int = 1, shards: int = 0,
+                      canonical: bool = False) -> Tuple[SolidTable, CountingReport]:
+    """Tạo bảng tần số chỉ chứa các k-mer gặp ít nhất hai lần, các k-mer chỉ gặp một lần (phần lớn là lỗi giải trình tự)
+    chỉ được ghi nhận trong một bộ lọc Bloom có kích thước cố định.
+    Khi đếm tuần tự, k-mer gặp lần đầu chỉ được thêm vào bộ lọc, lần thứ hai mới được đưa vào bảng với số đếm 2;
+    một k-mer mới bị bộ lọc báo nhầm là đã gặp (xác suất error_rate) sẽ bị đếm thừa một lần.
+    Khi đếm song song, mỗi shard được đếm chính xác rồi mới tách các k-mer chỉ gặp một lần
+
+    Args:
+        reads (Iterable[str]): Các read
+        k (int): Độ dài một k-mer
+        capacity (int): Số k-mer khác nhau dự kiến, dùng để chọn kích thước bộ lọc
+        error_rate (float, optional): Xác suất sai của bộ lọc. Defaults to 0.01.
+        workers (int, optional): Số tiến trình. Defaults to 1.
+        shards (int, optional): Số shard, nếu bằng 0 thì dùng 4 shard cho mỗi tiến trình. Defaults to 0.
+        canonical (bool, optional): Đếm theo dạng chuẩn của k-mer. Defaults to False.
+
+    Returns:
+        Tuple[SolidTable, CountingReport]: Bảng tần số và bộ nhớ tiết kiệm được
+    """
+
+    report: CountingReport = CountingReport()
+
+    if workers <= 1:
+        singletons: BloomFilter = BloomFilter(capacity=capacity, error_rate=error_rate)
+        table: SolidTable = SolidTable(singletons=singletons)
+        for read in reads:
+            for k_mer in read_kmers(read=read, k=k, canonical=canonical):
+                count: int = table.get(k_mer, 0)
+                if count:
+                    table[k_mer] = count + 1
+                elif singletons.add(k_mer):
+                    table[k_mer] = 2
+        # Các k-mer đã vào bộ lọc lần đầu, trừ đi các k-mer sau đó được đưa vào bảng
+        report.singletons = max(singletons.added - len(table), 0)
+    else:
+        shards = shards or 4 * workers
+        singletons: BloomFilter = BloomFilter(capacity=capacity, error_rate=error_rate)
+        table: SolidTable = SolidTable(singletons=singletons)
+        with tempfile.TemporaryDirectory(prefix="kmers-") as directory, multiprocessing.Pool(processes=workers) as pool:
+            tasks: Iterator[Tuple[int, List[str], int, int, bool, str]] = ((index, chunk, k, shards, canonical, directory) for index, chunk in enumerate(chunk_reads(reads=reads)))
+            for _ in pool.imap_unordered(spill_chunk, tasks):
+                pass
+
+            # Các shard không có k-mer chung, bộ lọc của các shard có cùng kích thước nên gộp được bằng phép OR
+            for solid, shard_singletons in pool.imap_unordered(merge_solid_shard, [(shard, directory, capacity, error_rate) for shard in range(shards)]):
+                table.update(solid)
+                singletons.update(shard_singletons)
+                report.singletons += shard_singletons.added
+
+    report.kmers = len(table)
+    report.table_bytes = table_bytes(table=table)
+    report.filter_bytes = singletons.nbytes
+
+    return table, report
+
+
+def count_kmers(reads: Iterable[str], k: int, workers: int = 1, shards: int = 0, canonical: bool = False) -> Dict[str, int]:
+    """Tạo bảng tần số của các k-mer, song song trên nhiều tiến trình nếu workers > 1.
+    Các tiến trình đếm từng nhóm read và ghi kết quả theo shard ra file tạm,
+    sau đó mỗi tiến trình tự đọc và gộp một shard. Mỗi k-mer chỉ đi qua tiến trình chính một lần, trong bảng kết quả
+
+    Args:
+        reads (Iterable[str]): Các read
+        k (int): Độ dài một k-mer
+        workers (int, optional): Số tiến trình. Defaults to 1.
+        shards (int, optional): Số shard, nếu bằng 0 thì dùng 4 shard cho mỗi tiến trình. Defaults to 0.
+        canonical (bool, optional): Đếm theo dạng chuẩn của k-mer, một k-mer và chuỗi bổ sung ngược của nó
+            dùng chung một số đếm. Defaults to False.
+
+    Returns:
+        Dict[str, int]: Bảng tần số của các k-mer
+    """
+
+    if workers <= 1:
+        return count_chunk(args=(reads, k, 1, canonical))[0]
+
+    shards = shards or 4 * workers
+    freq_dict: Dict[str, int] = {}
+    # Kho read được chép một lần vào vùng nhớ chung, mỗi phần việc chỉ gửi tên vùng nhớ và vị trí nhóm read
+    shared: Optional[ReadStore] = reads.share() if isinstance(reads, ReadStore) else None
+    chunks: Iterator[Iterable[str]] = shared.chunks(size=CHUNK_SIZE) if shared is not None else chunk_reads(reads=reads)
+    try:
+        with tempfile.TemporaryDirectory(prefix="kmers-") as directory, multiprocessing.Pool(processes=workers) as pool:
+            # Đếm từng nhóm read, chỉ các read được gửi tới tiến trình con
+            tasks: Iterator[Tuple[int, Iterable[str], int, int, bool, str]] = ((index, chunk, k, shards, canonical, directory) for index, chunk in enumerate(chunks))
+            for _ in pool.imap_unordered(spill_chunk, tasks):
+                pass
+
+            # Gộp từng shard, các shard không có k-mer chung nên chỉ cần nối lại
+            for shard_dict in pool.imap_unordered(merge_shard, [(shard, directory) for shard in range(shards)]):
+                freq_dict.update(shard_dict)
+    finally:
+        if shared is not None:
+            shared.close()
+
+    return freq_dict
+
+
+class ExternalTable(object):
+    """
+    Bảng tần số nằm trên đĩa: mã 2 bit của các k-mer đã sắp xếp và số đếm tương ứng trong hai file được ánh xạ vào bộ nhớ (mmap).
+    Tra cứu bằng tìm kiếm nhị phân, số đếm được sửa trực tiếp trên file; chỉ các k-mer mới được thêm khi sửa lỗi nằm trong bộ nhớ.
+    Bộ nhớ của tiến trình không phụ thuộc vào số k-mer, các trang của file do hệ điều hành quản lý
+    """
+
+    def __init__(self, directory: tempfile.TemporaryDirectory, size: int) -> None:
+        """
+
+        Args:
+            directory (tempfile.TemporaryDirectory): Thư mục tạm chứa file "codes" và "counts", bị xóa khi đóng bảng
+            size (int): Số k-mer trong các file
+        """
+
+        self.directory: tempfile.TemporaryDirectory = directory
+        self.size: int = size
+        self.added: Dict[str, int] = {} # Các k-mer không có trong file, được thêm khi sửa lỗi
+        self.files: List[mmap.mmap] = []
+        self.codes: Iterable[int] = array("Q")
+        self.counts: Iterable[int] = array("I")
+        if size:
+            with open(os.path.join(directory.name, "codes"), "rb") as f:
+                self.files.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            with open(os.path.join(directory.name, "counts"), "r+b") as f:
+                self.files.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE))
+            self.codes = memoryview(self.files[0]).cast("Q")
+            self.counts = memoryview(self.files[1]).cast("I")
+
+
+    def find(self, k_mer: str) -> int:
+        """
+
+        Args:
+            k_mer (str): k-mer
+
+        Returns:
+            int: Vị trí của k-mer trong file, -1 nếu không có
+        """
+
+        code: int = kmer.encode_valid(k_mer)
+        position: int = bisect.bisect_left(self.codes, code)
+        if position < self.size and self.codes[position] == code:
+            return position
+
+        return -1
+
+
+    def __getitem__(self, k_mer: str) -> int:
+        """
+
+        Args:
+            k_mer (str): k-mer
+
+        Returns:
+            int: Số lần xuất hiện của k-mer
+        """
+
+        position: int = self.find(k_mer=k_mer)
+        if position < 0:
+            return self.added[k_mer]
+
+        return self.counts[position]
+
+
+    def __setitem__(self, k_mer: str, count: int) -> None:
+        """
+
+        Args:
+            k_mer (str): k-mer
+            count (int): Số lần xuất hiện mới
+        """
+
+        position: int = self.find(k_mer=k_mer)
+        if position < 0:
+            self.added[k_mer] = count
+        else:
+            self.counts[position] = count
+
+
+    def __contains__(self, k_mer: object) -> bool:
+        """
+
+        Args:
+            k_mer (object): k-mer
+
+        Returns:
+            bool: True nếu k-mer có trong bảng
+        """
+
+        return isinstance(k_mer, str) and kmer.is_valid(k_mer) and (self.find(k_mer=k_mer) >= 0 or k_mer in self.added)
+
+
+    def __len__(self) -> int:
+        """
+
+        Returns:
+            int: Số k-mer khác nhau trong bảng
+        """
+
+        return self.size + len(self.added)
+
+
+    def close(self) -> None:
+        """Đóng các file và xóa thư mục tạm
+        """
+
+        if isinstance(self.codes, memoryview):
+            self.codes.release()
+            self.counts.release()
+        self.codes, self.counts = array("Q"), array("I")
+        for f in self.files:
+            f.close()
+        self.files = []
+        self.size = 0
+        self.directory.cleanup()
+
+
+def spill_codes(chunks: Iterable[array], directory: str, name: str, depth: int, width: int, k: int, buffer_items: int) -> List[str]:
+    """Chia các mã k-mer theo width ký tự sau depth ký tự đầu và ghi nối vào file của từng bucket,
+    mỗi bucket giữ một bộ đệm nhỏ trong bộ nhớ
+
+    Args:
+        chunks (Iterable[array]): Các dãy mã kiểu "Q"
+        directory (str): Thư mục ghi các file
+        name (str): Tiền tố tên file của các bucket
+        depth (int): Số ký tự đầu mà mọi mã đã có chung
+        width (int): Số ký tự tiếp theo dùng để chia bucket
+        k (int): Độ dài một k-mer
+        buffer_items (int): Tổng số mã tối đa trong các bộ đệm trước khi ghi ra file
+
+    Returns:
+        List[str]: File của 4 ** width bucket theo thứ tự mã, bucket rỗng không có file
+    """
+
+    shift: int = 2 * (k - depth - width)
+    mask: int = (1 << (2 * width)) - 1
+    paths: List[str] = [os.path.join(directory, "{}-{}".format(name, bucket)) for bucket in range(1 << (2 * width))]
+    buffers: List[array] = [array("Q") for _ in paths]
+    buffered: int = 0
+
+    def flush() -> None:
+        for path, buffer in zip(paths, buffers):
+            if buffer:
+                with open(path, "ab") as f:
+                    buffer.tofile(f)
+                del buffer[:]
+
+    for chunk in chunks:
+        for code in chunk:
+            buffers[(code >> shift) & mask].append(code)
+        buffered += len(chunk)
+        if buffered >= buffer_items:
+            flush()
+            buffered = 0
+    flush()
+
+    return paths
+
+
+def count_bucket(path: str, depth: int, k: int, memory: int, codes: BinaryIO, counts: BinaryIO) -> int:
+    """Đếm một bucket và ghi các mã đã sắp xếp cùng số đếm vào cuối hai file kết quả.
+    Bucket không vừa memory được chia tiếp theo các ký tự sau tiền tố chung cho tới khi vừa
+
+    Args:
+        path (str): File của bucket, bị xóa sau khi đếm
+        depth (int): Số ký tự đầu mà mọi mã trong bucket có chung
+        k (int): Độ dài một k-mer
+        memory (int): Bộ nhớ tối đa (byte) khi đếm một bucket
+        codes (BinaryIO): File kết quả của các mã
+        counts (BinaryIO): File kết quả của các số đếm
+
+    Returns:
+        int: Số k-mer khác nhau trong bucket
+    """
+
+    if not os.path.exists(path):
+        return 0
+
+    occurrences: int = os.path.getsize(path) // 8
+    if occurrences * (8 + ENTRY_BYTES) > memory and depth < k:
+        # Đọc bucket theo từng khối và chia tiếp, các bucket con được đếm theo thứ tự nên kết quả vẫn được sắp xếp
+        width: int = min(SPLIT_PREFIX, k - depth)
+        buffer_items: int = max(memory // 32, 1024)
+
+        def blocks() -> Iterator[array]:
+            with open(path, "rb") as f:
+                while True:
+                    block: array = array("Q")
+                    try:
+                        block.fromfile(f, buffer_items)
+                    except EOFError:
+                        pass
+                    if not block:
+                        return
+                    yield block
+
+        paths: List[str] = spill_codes(chunks=blocks(), directory=os.path.dirname(path), name=os.path.basename(path), depth=depth,
+                                       width=width, k=k, buffer_items=buffer_items)
+        os.remove(path)
+
+        return sum(count_bucket(path=child, depth=depth+width, k=k, memory=memory, codes=codes, counts=counts) for child in paths)
+
+    bucket: array = array("Q")
+    with open(path, "rb") as f:
+        bucket.fromfile(f, occurrences)
+    os.remove(path)
+    counter: Counter = Counter(bucket)
+    del bucket
+
+    keys: List[int] = sorted(counter)
+    array("Q", keys).tofile(codes)
+    array("I", [counter[key] for key in keys]).tofile(counts)
+
+    return len(keys)
+
+
+def count_kmers_external(reads: Iterable[str], k: int, memory: int, canonical: bool = False, directory: Optional[str] = None) -> ExternalTable:
+    """Đếm k-mer ngoài bộ nhớ: lần đọc các read ghi mã của từng k-mer vào các file bucket theo tiền tố,
+    sau đó từng bucket được đếm riêng trong giới hạn bộ nhớ (bucket quá lớn được chia tiếp theo tiền tố dài hơn).
+    Các bucket được đếm theo thứ tự tiền tố nên kết quả nối lại đã được sắp xếp theo mã, dùng được cho tìm kiếm nhị phân
+
+    Args:
+        reads (Iterable[str]): Các read hợp lệ
+        k (int): Độ dài một k-mer, không quá EXTERNAL_MAX_K
+        memory (int): Bộ nhớ tối đa (byte) dùng cho bộ đệm khi ghi và khi đếm một bucket
+        canonical (bool, optional): Đếm theo dạng chuẩn của k-mer. Defaults to False.
+        directory (Optional[str], optional): Thư mục chứa các file tạm, None để dùng thư mục tạm của hệ thống. Defaults to None.
+
+    Returns:
+        ExternalTable: Bảng tần số trên đĩa
+    """
+
+    if k > EXTERNAL_MAX_K:
+        raise ValueError("Đếm k-mer ngoài bộ nhớ chỉ hỗ trợ k không quá {}".format(EXTERNAL_MAX_K))
+
+    temporary: tempfile.TemporaryDirectory = tempfile.TemporaryDirectory(prefix="kmers-", dir=directory)
+    # Bộ đệm (8 byte mỗi mã) và các k-mer của nhóm read đang được mã hóa (khoảng 8 KiB mỗi read) dùng mỗi phần một phần tư bộ nhớ,
+    # phần còn lại cho bộ nhớ của chính tiến trình và các trang của file
+    buffer_items: int = max(memory // 32, 1024)
+    chunks: Iterator[array] = (kmer.encode_all(sequences=[k_mer for read in chunk for k_mer in read_kmers(read=read, k=k, canonical=canonical)])
+                               for chunk in chunk_reads(reads=reads, size=max(memory // 32768, 1)))
+    width: int = min(BUCKET_PREFIX, k)
+    paths: List[str] = spill_codes(chunks=chunks, directory=temporary.name, name="bucket", depth=0, width=width, k=k, buffer_items=buffer_items)
+
+    size: int = 0
+    with open(os.path.join(temporary.name, "codes"), "wb") as codes, open(os.path.join(temporary.name, "counts"), "wb") as counts:
+        for path in paths:
+            size += count_bucket(path=path, depth=width, k=k, memory=memory, codes=codes, counts=counts)
+
+    return ExternalTable(directory=temporary, size=size)
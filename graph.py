@@ -1,25 +1,124 @@
-import copy
+import sys
 import math
-from typing import List, Dict, Optional, Tuple
-from loader import Loader
-#from vertex import Vertex
-#from edge import Edge
-#from read import Read
+from array import array
+from typing import List, Dict, Set, Tuple, Iterable, Iterator, Optional
+from counting import count_kmers, count_solid_kmers, count_kmers_external, CountingReport, CanonicalTable, ExternalTable, EXTERNAL_MAX_K
+from store import GraphStore, ID_TYPE
+from readstore import ReadStore
+from instrument import Instrumentation
+import kmer
+
+
+ANCHOR_STEP: int = 8 # Ở chế độ k-mer chuẩn, khoảng 1/ANCHOR_STEP số k-mer được dùng làm mốc để chọn chiều các read
+ANCHOR_HASH: int = 0x9E3779B97F4A7C15 # Hệ số nhân để trộn các bit của mã k-mer trước khi chọn mốc
 
 
 class Vertex(object):
+    """
+    Đỉnh của đồ thị, chỉ gồm tham chiếu tới đồ thị và id, dữ liệu nằm trong các cột của Graph.store
+    """
+    
+    __slots__ = ("graph", "id")
     
     
-    def __init__(self, sequence: str) -> None:
+    def __init__(self, graph: "Graph", id: int) -> None:
         """
 
         Args:
-            sequence (str): Chuỗi đánh dấu đỉnh
+            graph (Graph): Đồ thị chứa đỉnh
+            id (int): Id của đỉnh trong Graph.store
+        """
+        
+        self.graph: Graph = graph
+        self.id: int = id
+    
+    
+    @property
+    def code(self) -> int:
+        """
+
+        Returns:
+            int: Mã 2 bit của chuỗi đánh dấu đỉnh
+        """
+        
+        return self.graph.store.vertex_code(self.id)
+    
+    
+    @property
+    def length(self) -> int:
+        """
+
+        Returns:
+            int: Độ dài chuỗi đánh dấu đỉnh
+        """
+        
+        return self.graph.k - 1
+    
+    
+    @property
+    def in_edges(self) -> List["Edge"]:
+        """
+
+        Returns:
+            List[Edge]: Các cạnh vào của đỉnh
+        """
+        
+        return [Edge(graph=self.graph, id=edge) for edge in self.graph.store.in_edges(self.id)]
+    
+    
+    @property
+    def out_edges(self) -> List["Edge"]:
+        """
+
+        Returns:
+            List[Edge]: Các cạnh ra của đỉnh
+        """
+        
+        return [Edge(graph=self.graph, id=edge) for edge in self.graph.store.out_edges(self.id)]
+    
+    
+    @property
+    def in_degree(self) -> int:
+        """
+
+        Returns:
+            int: Số cạnh vào của đỉnh, bằng len(self.in_edges) nhưng không cần tạo danh sách
+        """
+        
+        return self.graph.store.in_degrees[self.id]
+    
+    
+    @property
+    def out_degree(self) -> int:
+        """
+
+        Returns:
+            int: Số cạnh ra của đỉnh, bằng len(self.out_edges) nhưng không cần tạo danh sách
+        """
+        
+        return self.graph.store.out_degrees[self.id]
+    
+    
+    @property
+    def live(self) -> bool:
+        """
+
+        Returns:
+            bool: False khi đỉnh đã bị loại khỏi đồ thị
+        """
+        
+        return bool(self.graph.store.vertex_live[self.id])
+    
+    
+    @property
+    def sequence(self) -> str:
+        """Chuỗi đánh dấu đỉnh, chỉ được giải mã khi cần
+
+        Returns:
+            str: Chuỗi đánh dấu đỉnh
         """
         
-        self.sequence: str = sequence
-        self.in_edges: List[Edge] = []
-        self.out_edges: List[Edge] = []
+        return kmer.decode(code=self.code, length=self.length)
     
     
     def __getitem__(self, n: int) -> str:
@@ -42,7 +141,7 @@ class Vertex(object):
             int: Độ dài của chuỗi đại diện cho đỉnh
         """
         
-        return len(self.sequence)
+        return self.length
     
     
     def __str__(self) -> str:
@@ -55,36 +154,147 @@ class Vertex(object):
         return self.sequence
     
     
-    def add_out_edge(self, out_vertex, edge) -> None:
-        """ Thêm một cạnh đi ra từ đỉnh hiện tại
+    def __eq__(self, other: object) -> bool:
+        """Hai handle bằng nhau khi cùng chỉ tới một đỉnh
 
         Args:
-            out_vertex (Vertex): Đỉnh đích của cạnh đi ra từ đỉnh hiện tại
-            edge (_type_): Cạnh cần được thêm đi ra từ đỉnh hiện tại
-        """    
-        
-        self.out_edges.append(edge)
-        out_vertex.in_edges.append(edge)
-        
+            other (object): Object cần so sánh
+
+        Returns:
+            bool: True nếu cùng một đỉnh, nếu không là False
+        """
         
+        return isinstance(other, Vertex) and other.graph is self.graph and other.id == self.id
+    
+    
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
 class Edge(object):
+    """
+    Cạnh của đồ thị, chỉ gồm tham chiếu tới đồ thị và id, dữ liệu nằm trong các cột của Graph.store
+    """
+    
+    __slots__ = ("graph", "id")
     
     
-    def __init__(self, in_vertex: Vertex, out_vertex: Vertex, sequence: str) -> None:
+    def __init__(self, graph: "Graph", id: int) -> None:
         """
 
         Args:
-            in_vertex (Vertex): Đỉnh bắt đầu cạnh hiện tại
-            out_vertex (Vertex): Đỉnh kết thúc cạnh hiện tại
-            sequence (str): Chuỗi đại diện cho cạnh hiện tại
+            graph (Graph): Đồ thị chứa cạnh
+            id (int): Id của cạnh trong Graph.store
         """
         
-        self.sequence: str = sequence
-        self.in_vertex: Vertex = in_vertex
-        self.out_vertex: Vertex = out_vertex
-        self.reads: List[Read] = []
-        self.visited: bool = False
+        self.graph: Graph = graph
+        self.id: int = id
+    
+    
+    @property
+    def code(self) -> int:
+        """
+
+        Returns:
+            int: Mã 2 bit của chuỗi đại diện cho cạnh
+        """
         
+        return self.graph.store.edge_code(self.id)
+    
+    
+    @property
+    def length(self) -> int:
+        """
+
+        Returns:
+            int: Độ dài chuỗi đại diện cho cạnh
+        """
+        
+        return self.graph.store.lengths[self.id]
+    
+    
+    @property
+    def in_vertex(self) -> Vertex:
+        """
+
+        Returns:
+            Vertex: Đỉnh bắt đầu cạnh
+        """
+        
+        return Vertex(graph=self.graph, id=self.graph.store.sources[self.id])
+    
+    
+    @property
+    def out_vertex(self) -> Vertex:
+        """
+
+        Returns:
+            Vertex: Đỉnh kết thúc cạnh
+        """
+        
+        return Vertex(graph=self.graph, id=self.graph.store.targets[self.id])
+    
+    
+    @property
+    def reads(self) -> Dict["Read", Set[int]]:
+        """Chỉ mục ngược: các read đi qua cạnh và các vị trí của cạnh trên đường đi của read, theo thứ tự read.
+        Được dựng lại từ Graph.store mỗi lần gọi nên cần giữ kết quả khi dùng nhiều lần
+
+        Returns:
+            Dict[Read, Set[int]]: Các vị trí theo read
+        """
+        
+        reads: Dict[Read, Set[int]] = {}
+        read_list: List[Read] = self.graph.read_list
+        for read_id, position in self.graph.store.occurrences(self.id):
+            read: Read = read_list[read_id]
+            # Bỏ qua các vị trí đã được thay bằng cạnh khác hoặc bỏ trống
+            if read.edge_ids[position] == self.id:
+                if read in reads:
+                    reads[read].add(position)
+                else:
+                    reads[read] = {position}
+        
+        return reads
+    
+    
+    @property
+    def visited(self) -> bool:
+        """
+
+        Returns:
+            bool: True khi cạnh đã được đi qua
+        """
+        
+        return bool(self.graph.store.visited[self.id])
+    
+    
+    @visited.setter
+    def visited(self, value: bool) -> None:
+        self.graph.store.visited[self.id] = 1 if value else 0
+    
+    
+    @property
+    def live(self) -> bool:
+        """
+
+        Returns:
+            bool: False khi cạnh đã bị loại khỏi đồ thị
+        """
+        
+        return bool(self.graph.store.edge_live[self.id])
+    
+    
+    @property
+    def sequence(self) -> str:
+        """Chuỗi đại diện cho cạnh, chỉ được giải mã khi cần
+
+        Returns:
+            str: Chuỗi đại diện cho cạnh
+        """
+        
+        return kmer.decode(code=self.code, length=self.length)
+    
     
     def __getitem__(self, n: int) -> str:
         """Lấy ký tự thứ n trong chuỗi đại diện cho cạnh
@@ -105,7 +315,7 @@ class Edge(object):
         Returns:
             int: Độ dài của chuỗi đại diện cho cạnh
         """
-        return len(self.sequence)
+        return self.length
     
     
     def __str__(self) -> str:
@@ -117,20 +327,62 @@ class Edge(object):
         return self.sequence
     
     
+    def __eq__(self, other: object) -> bool:
+        """Hai handle bằng nhau khi cùng chỉ tới một cạnh
+
+        Args:
+            other (object): Object cần so sánh
+
+        Returns:
+            bool: True nếu cùng một cạnh, nếu không là False
+        """
+        
+        return isinstance(other, Edge) and other.graph is self.graph and other.id == self.id
+    
+    
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
 class Read(object):
     
-    def __init__(self, sequence: str, read_id: int) -> None:
+    __slots__ = ("graph", "read_id", "reverse", "edge_ids", "next_positions", "prev_positions", "last", "copies")
+    
+    
+    def __init__(self, graph: "Graph", read_id: int, reverse: bool = False) -> None:
         """
 
         Args:
-            sequence (str): Chuỗi đại diện cho read
+            graph (Graph): Đồ thị chứa read, chuỗi của read nằm ở vị trí read_id trong graph.reads
             read_id (int): id của read
+            reverse (bool, optional): Đường đi của read đi theo chuỗi bổ sung ngược của sequence. Defaults to False.
         """
-        self.sequence: str = sequence
+        self.graph: Graph = graph
         self.read_id: int = read_id
-        self.edges: List[Edge] = []
-        
+        self.reverse: bool = reverse # Chiều của read trên đồ thị, chỉ có thể là True ở chế độ k-mer chuẩn
+        # Id các cạnh trên đường đi của read theo vị trí. Khi gộp hai cạnh, vị trí của cạnh sau được bỏ trống (-1)
+        # thay vì xóa khỏi danh sách, nhờ vậy vị trí của các cạnh khác không thay đổi và chỉ mục ngược luôn đúng
+        self.edge_ids: array = array(ID_TYPE)
+        self.next_positions: array = array(ID_TYPE) # Vị trí của cạnh liền sau mỗi vị trí, bằng len(self.edge_ids) nếu là cạnh cuối
+        self.prev_positions: array = array(ID_TYPE) # Vị trí của cạnh liền trước mỗi vị trí, bằng -1 nếu là cạnh đầu
+        # Vị trí của cạnh cuối, cạnh đầu luôn ở vị trí 0 vì khi gộp chỉ vị trí của cạnh sau bị bỏ trống
+        self.last: int = -1
+        # Số read đầu vào có cùng đường đi này. Các read trùng đường đi chỉ được lưu một lần vì chúng luôn được gộp giống nhau
+        # và chỉ sự có mặt (không phải số lượng) của read được dùng khi xét gộp hai cạnh
+        self.copies: int = 1
+    
+    
+    @property
+    def sequence(self) -> str:
+        """Chuỗi của read theo chiều ban đầu (đã sửa lỗi nếu có), được giải mã từ kho read của đồ thị
+
+        Returns:
+            str: Chuỗi đại diện cho read
+        """
         
+        return self.graph.reads[self.read_id]
+    
+    
     def __getitem__(self, n: int) -> Edge:
         """Lấy cạnh thứ n trong danh sách các cạnh của read hiện tại
 
@@ -140,7 +392,110 @@ class Read(object):
         Returns:
             Edge: Cạnh ở vị trí cần được lấy
         """
-        return self.edges[n]
+        return self.path()[n]
+    
+    
+    def edge(self, position: int) -> Optional[Edge]:
+        """Lấy cạnh ở một vị trí trên đường đi, kể cả vị trí trống
+
+        Args:
+            position (int): Vị trí trong self.edge_ids
+
+        Returns:
+            Optional[Edge]: Cạnh ở vị trí này, None nếu vị trí đã bị bỏ trống
+        """
+        
+        edge: int = self.edge_ids[position]
+        
+        return Edge(graph=self.graph, id=edge) if edge >= 0 else None
+    
+    
+    @property
+    def edges(self) -> List[Optional[Edge]]:
+        """Các cạnh trên đường đi theo vị trí, None ở các vị trí trống
+
+        Returns:
+            List[Optional[Edge]]: Các cạnh
+        """
+        
+        return [self.edge(position) for position in range(len(self.edge_ids))]
+    
+    
+    def path(self) -> List[Edge]:
+        """Danh sách các cạnh trên đường đi của read, bỏ qua các vị trí trống
+
+        Returns:
+            List[Edge]: Các cạnh theo thứ tự
+        """
+        
+        return [Edge(graph=self.graph, id=edge) for edge in self.edge_ids if edge >= 0]
+    
+    
+    def append(self, edge: Edge) -> None:
+        """Thêm một cạnh vào cuối đường đi của read và vào chỉ mục của cạnh
+
+        Args:
+            edge (Edge): Cạnh được thêm
+        """
+        
+        position: int = len(self.edge_ids)
+        self.edge_ids.append(edge.id)
+        self.next_positions.append(position + 1)
+        self.prev_positions.append(self.last)
+        self.last = position
+        self.graph.store.add_occurrence(edge=edge.id, read_id=self.read_id, position=position)
+    
+    
+    def assign(self, edge_ids: List[int]) -> None:
+        """Đặt đường đi của read một lần từ id các cạnh, tương đương append lần lượt từng cạnh vào read rỗng.
+        Các vị trí của đường đi cũ (nếu có) phải được xóa khỏi chỉ mục trước
+
+        Args:
+            edge_ids (List[int]): Id các cạnh theo thứ tự
+        """
+        
+        length: int = len(edge_ids)
+        self.edge_ids = array(ID_TYPE, edge_ids)
+        self.next_positions = array(ID_TYPE, range(1, length + 1))
+        self.prev_positions = array(ID_TYPE, range(-1, length - 1))
+        self.last = length - 1
+        for position, edge in enumerate(edge_ids):
+            self.graph.store.add_occurrence(edge=edge, read_id=self.read_id, position=position)
+        
+        
+    def replace(self, position: int, old: Edge, new: Edge) -> None:
+        """Thay cạnh ở một vị trí bằng cạnh mới và cập nhật chỉ mục của hai cạnh
+
+        Args:
+            position (int): Vị trí cần thay
+            old (Edge): Cạnh cũ
+            new (Edge): Cạnh mới
+        """
+        
+        self.edge_ids[position] = new.id
+        self.graph.store.remove_occurrence(edge=old.id)
+        self.graph.store.add_occurrence(edge=new.id, read_id=self.read_id, position=position)
+    
+    
+    def remove(self, position: int, old: Edge) -> None:
+        """Bỏ trống một vị trí, nối cạnh liền trước với cạnh liền sau của vị trí đó
+
+        Args:
+            position (int): Vị trí cần bỏ trống
+            old (Edge): Cạnh cũ ở vị trí này
+        """
+        
+        self.edge_ids[position] = -1
+        self.graph.store.remove_occurrence(edge=old.id)
+        
+        prev_position: int = self.prev_positions[position]
+        next_position: int = self.next_positions[position]
+        if prev_position >= 0:
+            self.next_positions[prev_position] = next_position
+        if next_position < len(self.edge_ids):
+            self.prev_positions[next_position] = prev_position
+        if position == self.last:
+            self.last = prev_position
     
     
     def change_x(self, x: Edge, z: Edge) -> bool:
@@ -154,16 +509,10 @@ class Read(object):
             bool: True nếu cạnh cũ được thay đổi, nếu không là False
         """
         
-        if self.edges[-1] == x:
-            self.edges[-1] = z
-            
-            # Thêm read hiện tại và tập các read của cạnh mới
-            z.reads.append(self)
+        if self.last >= 0 and self.edge_ids[self.last] == x.id:
+            # Thay cạnh cũ bằng cạnh mới, cập nhật tập các read của hai cạnh
+            self.replace(position=self.last, old=x, new=z)
             
-            # Xóa read hiện tại từ cạnh cũ
-            if self in x.reads:
-                x.reads.remove(self)
-                
             return True
         
         return False
@@ -179,29 +528,24 @@ class Read(object):
         Returns:
             bool: True nếu cạnh cũ được thay đổi, nếu không là False
         """
-        if self.edges[0] == y:
-            self.edges[0] = z
-            
-            # Thêm read hiện tại và tập các read của cạnh mới
-            z.reads.append(self)
+        if self.last >= 0 and self.edge_ids[0] == y.id:
+            # Thay cạnh cũ bằng cạnh mới, cập nhật tập các read của hai cạnh
+            self.replace(position=0, old=y, new=z)
             
-            # Xóa read hiện tại từ cạnh cũ
-            if self in y.reads:
-                y.reads.remove(self)
-                
             return True
         
         return False
     
     
-    def change_xy(self, x: Edge, y: Edge, z: Edge) -> bool:
+    def change_xy(self, x: Edge, y: Edge, z: Edge, positions: Iterable[int]) -> bool:
         """Thay đổi hai cạnh liên tiếp x, y trong đường dẫn
-    
+
 
         Args:
             x (Edge): Cạnh đầu tiên liền trước
             y (Edge): Cạnh liền sau cạnh x
             z (Edge): Cạnh mới thay thế hai cạnh x và cạnh y
+            positions (Iterable[int]): Các vị trí của x trong read lấy từ x.reads
 
         Returns:
             bool: True nếu hai cạnh bị thay đổi bởi z, nếu không là False
@@ -209,126 +553,255 @@ class Read(object):
         
         found_xy: bool = False
         
-        # Xét từng cặp cạnh liền nhau có phải là cạnh x là cạnh đầu tiên, y là cạnh liền cạnh x hay không:
-        for i in range(len(self.edges)-1):
+        # Chỉ xét các vị trí của x trong chỉ mục, từ trái sang phải giống như khi duyệt từng cặp cạnh liền nhau
+        for i in sorted(positions):
+            # Vị trí có thể đã bị bỏ trống bởi lần gộp trước (khi x cũng là y)
+            if self.edge_ids[i] != x.id:
+                continue
             
-            # Nếu tìm thấy x là cạnh liền trước, y là cạnh liền sau cạnh x
-            if self.edges[i] == x and self.edges[i+1] == y:
+            # Nếu y là cạnh liền sau cạnh x
+            j: int = self.next_positions[i]
+            if j < len(self.edge_ids) and self.edge_ids[j] == y.id:
                 found_xy = True
                 
-                # Thêm cạnh z, xóa bỏ các cạnh x và cạnh y
-                self.edges[i] = z
-                self.edges[i+1] = None
-                
-                # Thêm read hiện tại vào danh sách các read của cạnh mới z
-                z.reads.append(self)
-                
-                # Xóa read hiện tại từ danh sách các read của các cạnh bị xóa x và y
-                if self in x.reads:
-                    x.reads.remove(self)
-                if self in y.reads:
-                    y.reads.remove(self)
-        
-        # Xóa tất cả các cạnh mà vị trí đó là None
-        self.edges = [e for e in self.edges if e != None]
+                # Thêm cạnh z ở vị trí của x, bỏ trống vị trí của y
+                self.replace(position=i, old=x, new=z)
+                self.remove(position=j, old=y)
         
         return found_xy
     
     
-    def update(self, x: Edge, y: Edge, z: Edge) -> bool:
+    def update(self, x: Edge, y: Edge, z: Edge, positions: Iterable[int]) -> bool:
         """Chạy tất cả các phương thức cập nhật cạnh mới
 
         Args:
             x (Edge): Cạnh nếu là cạnh cuối cùng trong danh sách các cạnh sẽ bị thay thế bởi cạnh z
             y (Edge): Cạnh nếu là cạnh đầu tiên trong danh sách các cạnh sẽ bị thay thế bởi cạnh z
             z (Edge): Cạnh mới
+            positions (Iterable[int]): Các vị trí của x trong read lấy từ x.reads
 
         Returns:
             bool: True nếu có thay đổi, nếu không là False
         """
         
         # Xét từng trường hợp
-        changed: List[bool] = [self.change_xy(x=x, y=y, z=z), self.change_x(x=x, z=z), self.change_y(y=y, z=z)]
+        changed: List[bool] = [self.change_xy(x=x, y=y, z=z, positions=positions), self.change_x(x=x, z=z), self.change_y(y=y, z=z)]
         
         return any(changed)
 
 
+class CompactionReport(object):
+    """
+    Kết quả của một lần dọn đồ thị
+    """
+    
+    def __init__(self) -> None:
+        self.vertices: int = 0 # Số đỉnh bị loại
+        self.edges: int = 0 # Số cạnh bị loại
+        self.bytes: int = 0 # Số byte ước tính được giải phóng (phần co lại của bảng chỉ mục, danh sách kề và chỉ mục ngược)
+        
+        
+    def __str__(self) -> str:
+        """
+
+        Returns:
+            str: Tóm tắt kết quả
+        """
+        
+        return "{} đỉnh, {} cạnh, {} byte".format(self.vertices, self.edges, self.bytes)
+
+
+def footprint(*objects) -> int:
+    """Ước tính bộ nhớ của các object (không tính các object mà chúng tham chiếu tới, trừ __dict__)
+
+    Args:
+        objects: Các object
+
+    Returns:
+        int: Số byte
+    """
+    
+    total: int = 0
+    for obj in objects:
+        total += sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            total += sys.getsizeof(obj.__dict__)
+            
+    return total
+
+
 class Graph(object):
     
-    def __init__(self, seqs: Optional[Loader], k: int, threshold: int, error_correct: bool = False) -> None:
+    def __init__(self, seqs: Optional[Iterable[str]], k: int, threshold: int, error_correct: bool = False, workers: int = 1, engine: str = "python",
+                 prefilter: bool = False, error_rate: float = 0.01, capacity: int = 0, canonical: bool = False,
+                 instrument: Optional[Instrumentation] = None, cache: Optional["SpectrumCache"] = None, source: Optional[str] = None,
+                 counting_memory: int = 0) -> None:
         """
 
         Args:
-            seqs (Loader): Các reads đọc được trong loader
+            seqs (Iterable[str]): Các reads đọc được trong loader, hoặc luồng đọc read từ Loader.stream.
+                Khi sửa lỗi, các read được đọc hai lần nên seqs phải lặp lại được (list, ReadStream), không được là iterator
             k (int): k-mers, số ký tự trong một chuỗi đại diện cho một cạnh
             threshold (int): ngưỡng để sửa lỗi
             error_correct (bool, optional): Có sử lỗi hay không. Defaults to False.
+            workers (int, optional): Số tiến trình dùng để đếm k-mer khi sửa lỗi. Defaults to 1.
+            engine (str, optional): Cách sửa lỗi, "python" hoặc "numpy" (cần cài đặt NumPy). Defaults to "python".
+            prefilter (bool, optional): Khi sửa lỗi bằng "python", chỉ giữ các k-mer gặp ít nhất hai lần trong bảng tần số,
+                các k-mer còn lại nằm trong một bộ lọc Bloom. Defaults to False.
+            error_rate (float, optional): Xác suất sai của bộ lọc Bloom. Defaults to 0.01.
+            capacity (int, optional): Số k-mer khác nhau dự kiến để chọn kích thước bộ lọc,
+                nếu bằng 0 thì dùng tổng số k-mer của các read (cần đọc các read thêm một lần). Defaults to 0.
+            canonical (bool, optional): Coi một k-mer và chuỗi bổ sung ngược của nó là một: bảng tần số khi sửa lỗi được đếm
+                theo dạng chuẩn, mỗi read được đưa vào đồ thị theo chiều trùng với các k-mer đã có. Defaults to False.
+            instrument (Optional[Instrumentation], optional): Nơi ghi thời gian các bước và các bộ đếm, None để không đo. Defaults to None.
+            cache (Optional[SpectrumCache], optional): Cache trên đĩa của bảng tần số khi sửa lỗi bằng "python",
+                None để luôn đếm lại. Defaults to None.
+            source (Optional[str], optional): File chứa các read, checksum của file là một phần khóa trong cache. Defaults to None.
+            counting_memory (int, optional): Khi lớn hơn 0, bảng tần số khi sửa lỗi bằng "python" được đếm ngoài bộ nhớ
+                theo từng bucket trên đĩa với giới hạn bộ nhớ này (byte) và được tra cứu trực tiếp trên đĩa. Defaults to 0.
         """
         
-        self.vertex_list: List[Vertex] = [] # Danh sách các đỉnh trong đồ thị
-        self.vertex_dict: Dict[str, Vertex] = {} # Danh sách các đỉnh được đánh chỉ mục bởi chuỗi đại diện
-        self.edge_list: List[Edge] = [] # Danh sách các cạnh trong đồ thị
-        self.edge_dict: Dict[str, Edge] = {} # Danh sách các cạnh trong đồ thị được chỉ mục bởi chuỗi đại diện
-        self.read_list: List[Read] = [] # Danh sách các reads trong đồ thị
+        self.store: GraphStore = GraphStore() # Các cột của đỉnh, cạnh và chỉ mục ngược, Vertex và Edge chỉ là handle tới đây
+        self.vertex_dict: Dict[int, int] = {} # Id các đỉnh được đánh chỉ mục bởi mã 2 bit của chuỗi đại diện
+        self.edge_dict: Dict[int, int] = {} # Id các cạnh k-mer trong đồ thị được chỉ mục bởi mã 2 bit của chuỗi đại diện
+        self.read_list: List[Read] = [] # Danh sách các reads trong đồ thị, mỗi đường đi khác nhau một read
+        self.reads: ReadStore = ReadStore() # Chuỗi của các read trong đồ thị (đã sửa lỗi nếu có), mỗi base một byte
+        self.duplicates: int = 0 # Số read đầu vào bị bỏ vì trùng đường đi với một read đã có
         self.k: int = k # Độ dài chuỗi đại diện cho một cạnh
-        self.seqs: Optional[Loader] = seqs # Các read được đọc từ loader
+        self.seqs: Optional[Iterable[str]] = seqs # Các read được đọc từ loader
         self.threshold: int = threshold # Ngưỡng để sửa lỗi
+        self.workers: int = workers # Số tiến trình đếm k-mer
+        self.engine: str = engine # Cách sửa lỗi
+        self.prefilter: bool = prefilter # Lọc các k-mer chỉ gặp một lần khỏi bảng tần số
+        self.error_rate: float = error_rate # Xác suất sai của bộ lọc Bloom
+        self.capacity: int = capacity # Kích thước dự kiến của bộ lọc Bloom
+        self.counting: Optional[CountingReport] = None # Bộ nhớ tiết kiệm được khi lọc, có sau khi sửa lỗi với prefilter
+        self.canonical: bool = canonical # Chế độ k-mer chuẩn, hai mạch của cùng một vùng chỉ được lưu một lần
+        self.instrument: Instrumentation = instrument or Instrumentation() # Đo các bước, mặc định tắt
+        self.cache: Optional["SpectrumCache"] = cache # Cache của bảng tần số, chỉ dùng khi biết file chứa các read
+        self.source: Optional[str] = source # File chứa các read
+        self.counting_memory: int = counting_memory # Giới hạn bộ nhớ khi đếm k-mer ngoài bộ nhớ, 0 là đếm trong bộ nhớ
         
-        # k_mers là danh sách của các danh sách của các k-mer, corrected_seqs là danh sách của các danh sách của các k-mers đã được chỉnh sửa
-        self.corrected_seqs, self.k_mers = self.error_correction(threshold=self.threshold)
-            
-        # Ghép lại các k-mer khi đã sửa lỗi
-        for n in range(len(self.corrected_seqs)):
-            new_read: str = ""
-            for i in self.corrected_seqs[n]:
-                if new_read == "":
-                    new_read += i
-                else:
-                    new_read += i[-1]
-            self.corrected_seqs[n] = new_read
-            
+        if self.engine not in ("python", "numpy"):
+            raise ValueError("Không hỗ trợ cách sửa lỗi {}, hãy sử dụng \"python\" hoặc \"numpy\"".format(self.engine))
+        
+        # Bảng tần số của NumpyCorrector đã là mảng, còn k-mer chỉ gặp một lần luôn dưới ngưỡng khi ngưỡng từ 2 trở lên
+        if error_correct and self.prefilter and self.engine != "python":
+            raise ValueError("Lọc k-mer bằng bộ lọc Bloom chỉ dùng được với cách sửa lỗi \"python\"")
+        if error_correct and self.prefilter and self.threshold < 2:
+            raise ValueError("Lọc k-mer bằng bộ lọc Bloom cần ngưỡng sửa lỗi từ 2 trở lên")
+        # Bảng tần số của NumpyCorrector được đánh chỉ mục theo mã của k-mer trên từng mạch
+        if error_correct and self.canonical and self.engine != "python":
+            raise ValueError("Đếm k-mer theo dạng chuẩn chỉ dùng được với cách sửa lỗi \"python\"")
+        
+        # Bảng trên đĩa chỉ chứa số đếm chính xác, mã của mỗi k-mer phải vừa 64 bit
+        if error_correct and self.counting_memory and (self.engine != "python" or self.prefilter):
+            raise ValueError("Đếm k-mer ngoài bộ nhớ chỉ dùng được với cách sửa lỗi \"python\" và không dùng cùng bộ lọc Bloom")
+        if error_correct and self.counting_memory and self.k > EXTERNAL_MAX_K:
+            raise ValueError("Đếm k-mer ngoài bộ nhớ chỉ hỗ trợ k không quá {}".format(EXTERNAL_MAX_K))
+        
+        # Sửa lỗi cần đọc các read hai lần (đếm k-mer rồi sửa lỗi), một iterator sẽ bị dùng hết ở lần đầu
+        if error_correct and iter(self.seqs) is self.seqs:
+            raise ValueError("Sửa lỗi cần đọc các read hai lần, hãy truyền vào list hoặc ReadStream thay vì iterator")
+        if self.canonical and iter(self.seqs) is self.seqs:
+            raise ValueError("Chế độ k-mer chuẩn cần đọc các read hai lần, hãy truyền vào list hoặc ReadStream thay vì iterator")
+        
+        # Chiều của các read được chọn trước khi tạo đồ thị
+        reverse: array = self.orient_reads() if self.canonical else array("b")
         
-        if error_correct:
-            self.seqs: List[str] = self.corrected_seqs
+        # Sửa lỗi là một bước tùy chọn, các read đã sửa lỗi được đưa thẳng vào xây dựng đồ thị
+        reads: Iterable[str] = self.error_correction(threshold=self.threshold) if error_correct else self.valid_reads()
+        
+        # Mặt nạ giữ lại mã của k-mer và của hậu tố (k-1 ký tự cuối)
+        k_mask: int = kmer.mask(k)
+        suffix_mask: int = kmer.mask(k-1)
             
-        for s in range(len(seqs)):
-            # Lấy các read
-            seq: str = seqs[s]
-            # Tạo object Read
-            read: Read = Read(sequence=seq, read_id=s)
-            self.read_list.append(read)
+        # Giá trị băm của đường đi -> vị trí read đầu tiên có đường đi đó, để chỉ lưu một lần các đường đi trùng nhau
+        paths: Dict[int, int] = {}
+        
+        # Lấy lần lượt các read, không cần đọc toàn bộ các read trước
+        for s, seq in enumerate(reads):
+            # Ở chế độ k-mer chuẩn read có thể được đưa vào đồ thị theo chuỗi bổ sung ngược
+            flipped: bool = self.canonical and bool(reverse[s])
+            oriented: str = kmer.reverse_complement(seq) if flipped else seq
             
-            # Tạo các đỉnh và các cạnh
-            for i in range(len(seq)-k+1):
-                # Tạo k-mer
-                k_mer: str = seq[i:i+k]
-                prefix: str = k_mer[:k-1]
-                suffix: str = k_mer[1:]
+            # Tạo các đỉnh và các cạnh, mã của k-mer được cập nhật cuốn chiếu theo từng ký tự
+            path: List[int] = [] # Id các cạnh trên đường đi của read
+            code: int = 0
+            for i, base in enumerate(kmer.encode_bases(oriented)):
+                code = ((code << 2) | base) & k_mask
+                if i < k-1:
+                    continue
+                
+                # Cạnh đã có thì cả hai đỉnh của nó cũng đã có
+                if code in self.edge_dict:
+                    path.append(self.edge_dict[code])
+                    continue
+                
+                # Mã của tiền tố và hậu tố
+                prefix: int = code >> 2
+                suffix: int = code & suffix_mask
                 
                 # Tạo đỉnh tiền tố
                 if prefix in self.vertex_dict:
-                    p_vertex: Vertex = self.vertex_dict[prefix]
+                    p_vertex: Vertex = Vertex(graph=self, id=self.vertex_dict[prefix])
                 else:
-                    p_vertex: Vertex = self.new_vertex(sequence=prefix)
+                    p_vertex: Vertex = self.new_vertex(code=prefix)
                     
                 # Tạo đỉnh hậu tố
                 if suffix in self.vertex_dict:
-                    s_vertex: Vertex = self.vertex_dict[suffix]
+                    s_vertex: Vertex = Vertex(graph=self, id=self.vertex_dict[suffix])
                 else:
-                    s_vertex: Vertex = self.new_vertex(sequence=suffix)
+                    s_vertex: Vertex = self.new_vertex(code=suffix)
                     
                 # Tạo cạnh
-                if k_mer in self.edge_dict:
-                    edge: Edge = self.edge_dict[k_mer]
-                else:
-                    edge: Edge = self.new_edge(in_vertex=p_vertex, out_vertex=s_vertex, sequence=k_mer)
-                    
-                # Thêm cạnh vào danh sách cạnh của read
-                read.edges.append(edge)
-                # Thêm read vào danh sách read của cạnh
-                edge.reads.append(read)                
+                path.append(self.new_edge(in_vertex=p_vertex, out_vertex=s_vertex, code=code, length=k).id)
+                
+            # Read trùng đường đi với một read đã có chỉ tăng số bản sao của read đó (so sánh cả đường đi nếu trùng giá trị băm)
+            edge_ids: array = array(ID_TYPE, path)
+            digest: int = hash(edge_ids.tobytes())
+            first: Optional[int] = paths.get(digest)
+            if first is not None and self.read_list[first].edge_ids == edge_ids:
+                self.read_list[first].copies += 1
+                self.duplicates += 1
+                continue
+            paths.setdefault(digest, len(self.read_list))
+            
+            # Tạo object Read, đặt đường đi của read và thêm read vào chỉ mục của các cạnh
+            self.reads.append(read=seq)
+            read: Read = Read(graph=self, read_id=len(self.read_list), reverse=flipped)
+            self.read_list.append(read)
+            read.assign(edge_ids=edge_ids)
+                
+        # Dựng danh sách kề và chỉ mục ngược dạng CSR một lần sau khi đã có tất cả các cạnh
+        self.store.compact(paths=[read.edge_ids for read in self.read_list])
+        self.instrument.count(name="reads", value=len(self.read_list) + self.duplicates)
+        self.instrument.count(name="duplicate_paths", value=self.duplicates)
+        self.instrument.count(name="edges", value=self.store.edge_count)
                 
         
+    @property
+    def vertex_list(self) -> List[Vertex]:
+        """Danh sách các đỉnh còn trong đồ thị theo thứ tự được tạo ra
+
+        Returns:
+            List[Vertex]: Các đỉnh
+        """
+        
+        return [Vertex(graph=self, id=vertex) for vertex, live in enumerate(self.store.vertex_live) if live]
+    
+    
+    @property
+    def edge_list(self) -> List[Edge]:
+        """Danh sách các cạnh còn trong đồ thị theo thứ tự được tạo ra
+
+        Returns:
+            List[Edge]: Các cạnh
+        """
+        
+        return [Edge(graph=self, id=edge) for edge, live in enumerate(self.store.edge_live) if live]
+    
+    
     def __str__(self) -> str:
         """_summary_
 
@@ -343,45 +816,117 @@ class Graph(object):
         return out
     
     
-    def new_vertex(self, sequence: str) -> Vertex:
+    def valid_reads(self) -> Iterable[str]:
+        """Lần lượt lấy các read đầu vào, bỏ qua các read có ký tự khác A, C, G, T (ví dụ các mã IUPAC như R, Y)
+        vì không mã hóa được thành 2 bit. Các read trong ReadStore luôn hợp lệ nên kho được trả về nguyên vẹn,
+        nhờ vậy khi đếm k-mer song song kho được chia sẻ cho các tiến trình thay vì gửi từng nhóm read
+
+        Returns:
+            Iterable[str]: Các read hợp lệ
+        """
+        
+        if isinstance(self.seqs, ReadStore):
+            return self.seqs
+        
+        return (seq for seq in self.seqs if kmer.is_valid(seq))
+    
+    
+    def orient_reads(self) -> array:
+        """Chọn chiều của các read ở chế độ k-mer chuẩn sao cho hai read có chung một k-mer dạng chuẩn
+        đi qua nó theo cùng một chiều. Hai read chung một k-mer mốc được nối trong một union-find có ghi độ lệch chiều,
+        chiều của mỗi read là độ lệch so với gốc của thành phần. Chỉ dùng các k-mer có giá trị băm của dạng chuẩn
+        chia hết cho ANCHOR_STEP làm mốc để bảng mốc nhỏ hơn nhiều so với edge_dict.
+        Các read được chọn chiều trước khi sửa lỗi vì sửa lỗi chỉ thay một vài ký tự, không đổi mạch của read
+
+        Returns:
+            array: 1 nếu read ở vị trí tương ứng được đưa vào đồ thị theo chuỗi bổ sung ngược, nếu không là 0
+        """
+        
+        parents: array = array(ID_TYPE) # Read cha trong union-find
+        flips: array = array("b") # Độ lệch chiều của read so với read cha
+        anchors: Dict[int, int] = {} # Mã dạng chuẩn của k-mer mốc -> 2 * id read đầu tiên chứa nó + chiều của nó trong read
+        
+        def root_of(read: int) -> Tuple[int, int]:
+            # Gốc và độ lệch chiều so với gốc, các read trên đường đi được nối thẳng vào gốc
+            path: List[int] = []
+            flip: int = 0
+            while parents[read] != read:
+                path.append(read)
+                flip ^= flips[read]
+                read = parents[read]
+            total: int = flip
+            for node in path:
+                total, flips[node] = total ^ flips[node], total
+                parents[node] = read
+            return read, flip
+        
+        for r, seq in enumerate(self.valid_reads()):
+            parents.append(r)
+            flips.append(0)
+            # Đảo lại để k-mer thứ i của read ứng với chuỗi bổ sung ngược của nó
+            reverse_codes: List[int] = list(kmer.codes(sequence=kmer.reverse_complement(seq), k=self.k))[::-1]
+            for code, reverse_code in zip(kmer.codes(sequence=seq, k=self.k), reverse_codes):
+                # Thứ tự của mã trùng với thứ tự từ điển, k-mer đối xứng không cho biết chiều
+                anchor: int = min(code, reverse_code)
+                if code == reverse_code or (anchor * ANCHOR_HASH >> 40) % ANCHOR_STEP:
+                    continue
+                
+                flip: int = int(code != anchor)
+                if anchor not in anchors:
+                    anchors[anchor] = 2 * r + flip
+                    continue
+                
+                # Hai read phải lệch chiều nhau đúng bằng độ lệch chiều của k-mer mốc trong hai read
+                other: int = anchors[anchor]
+                root, root_flip = root_of(r)
+                other_root, other_flip = root_of(other >> 1)
+                if root != other_root:
+                    parents[root] = other_root
+                    flips[root] = root_flip ^ other_flip ^ flip ^ (other & 1)
+        
+        return array("b", [root_of(r)[1] for r in range(len(parents))])
+    
+    
+    def new_vertex(self, code: int) -> Vertex:
         """Tạo ra một đỉnh mới thêm vào đồ thị
 
         Args:
-            sequence (str): Chuỗi đại diện cho đỉnh
+            code (int): Mã 2 bit của chuỗi đại diện cho đỉnh (độ dài k-1)
 
         Returns:
             Vertex: Đỉnh mới được tạo ra
         """
         
-        vertex: Vertex = Vertex(sequence=sequence)
-        self.vertex_list.append(vertex)
-        self.vertex_dict[sequence] = vertex
+        vertex: Vertex = Vertex(graph=self, id=self.store.add_vertex(code=code))
+        self.vertex_dict[code] = vertex.id
         
         return vertex
     
     
-    def new_edge(self, in_vertex: Vertex, out_vertex: Vertex, sequence: str) -> Edge:
+    def new_edge(self, in_vertex: Vertex, out_vertex: Vertex, code: int, length: int) -> Edge:
         """Tạo ra một cạnh mới thêm vào đồ thị khi cho biết đỉnh vào, đỉnh ra, chuỗi đại diện cho cạnh
 
         Args:
             in_vertex (Vertex): Đỉnh vào cạnh mới
             out_vertex (Vertex): Đỉnh ra cạnh mới
-            sequence (str): Chuỗi đại diện cho cạnh mới
+            code (int): Mã 2 bit của chuỗi đại diện cho cạnh mới
+            length (int): Độ dài chuỗi đại diện cho cạnh mới
 
         Returns:
             Edge: Cạnh mới được tạo ra
         """
         
-        edge: Edge = Edge(in_vertex=in_vertex, out_vertex=out_vertex, sequence=sequence)
-        self.edge_list.append(edge)
-        in_vertex.add_out_edge(out_vertex=out_vertex, edge=edge)
-        self.edge_dict[sequence] = edge
+        edge: Edge = Edge(graph=self, id=self.store.add_edge(source=in_vertex.id, target=out_vertex.id, code=code, length=length))
+        # Chỉ các cạnh k-mer được chỉ mục, mã của các chuỗi có độ dài khác nhau có thể trùng nhau
+        if length == self.k:
+            self.edge_dict[code] = edge.id
         
         return edge
     
     
     def get_unvisited(self, vertex: Vertex) -> Edge:
-        """Lấy cạnh ra của một đỉnh mà chưa được đi qua
+        """Lấy cạnh ra của một đỉnh mà chưa được đi qua. Mỗi đỉnh giữ một con trỏ trong danh sách kề
+        nên không phải duyệt lại các cạnh đã đi qua, cả đường đi Euler chỉ tốn O(E)
 
         Args:
             vertex (Vertex): đỉnh được tìm trong các cạnh ra tương ứng
@@ -390,11 +935,19 @@ class Graph(object):
             Edge: cạnh ra đầu tiên chưa được đi qua của đỉnh là tham số đầu vào của hàm
         """
         
-        for edge in vertex.out_edges:
-            if not edge.visited:
-                return edge
+        edge: int = self.store.next_unvisited(vertex.id)
             
-        return None
+        return Edge(graph=self, id=edge) if edge >= 0 else None
+    
+    
+    def components(self) -> List[List[Vertex]]:
+        """Các thành phần liên thông yếu của đồ thị, bỏ qua các đỉnh không có cạnh
+
+        Returns:
+            List[List[Vertex]]: Các đỉnh của từng thành phần theo thứ tự được tạo ra
+        """
+        
+        return [[Vertex(graph=self, id=vertex) for vertex in component] for component in self.store.components()]
     
     
     def merge(self, x: Edge, y: Edge) -> Edge:
@@ -408,39 +961,42 @@ class Graph(object):
             Edge: Cạnh kết quả là cạnh được gộp hai cạnh x và cạnh y
         """
         
-        # Lấy các đỉnh là đỉnh vào của cạnh x, đỉnh ra của cạnh x và đỉnh ra của cạnh y
-        in_vertex: Vertex = x.in_vertex
-        mid_vertex: Vertex = x.out_vertex
-        out_vertex: Vertex = y.out_vertex
-        
-        assert mid_vertex == y.in_vertex
-        
-        # Kiểm tra các đỉnh vẫn còn kích hoạt (không có đỉnh nào không có cạnh vào hoặc cạnh ra)
-        
-        if len(in_vertex.out_edges) == 0 or len(mid_vertex.in_edges) == 0 or \
-            len(mid_vertex.out_edges) == 0 or len(out_vertex.in_edges) == 0:
-                return None
+        self.instrument.count(name="merges_attempted")
+        with self.instrument.stage(name="Graph.merge"):
+            # Lấy các đỉnh là đỉnh vào của cạnh x, đỉnh ra của cạnh x và đỉnh ra của cạnh y
+            in_vertex: Vertex = x.in_vertex
+            mid_vertex: Vertex = x.out_vertex
+            out_vertex: Vertex = y.out_vertex
             
-        # Tạo chuỗi đại diện mới cho cạnh mới        
-        y_length: int = len(y.sequence)
-        seq: str = x.sequence + y.sequence[self.k-1:]
-        
-        # Tạo một cạnh mới        
-        z: Edge = self.new_edge(in_vertex=in_vertex, out_vertex=out_vertex, sequence=seq)
-        
-        # Cập nhật các đỉnh và đường đi
-        if x in in_vertex.out_edges:
-            in_vertex.out_edges.remove(x)
-        if x in mid_vertex.in_edges:
-            mid_vertex.in_edges.remove(x)
-        if y in mid_vertex.out_edges:
-            mid_vertex.out_edges.remove(y)
-        if y in out_vertex.in_edges:
-            out_vertex.in_edges.remove(y)
-        for read in self.read_list:
-            read.update(x=x, y=y, z=z)
+            assert mid_vertex == y.in_vertex
+            
+            # Kiểm tra các đỉnh vẫn còn kích hoạt (không có đỉnh nào không có cạnh vào hoặc cạnh ra)
+            
+            if in_vertex.out_degree == 0 or mid_vertex.in_degree == 0 or \
+                mid_vertex.out_degree == 0 or out_vertex.in_degree == 0:
+                    return None
+                
+            # Tạo chuỗi đại diện mới cho cạnh mới (x nối với phần sau k-1 ký tự đầu của y)
+            code: int = kmer.concat(code=x.code, other=y.code, other_length=y.length, overlap=self.k-1)
+            length: int = x.length + y.length - (self.k-1)
             
-        return z
+            # Tạo một cạnh mới        
+            z: Edge = self.new_edge(in_vertex=in_vertex, out_vertex=out_vertex, code=code, length=length)
+            
+            # Cập nhật các đỉnh và đường đi: gỡ x, y khỏi danh sách kề của các đỉnh
+            self.store.detach(x.id)
+            self.store.detach(y.id)
+            # Chỉ cập nhật các read đi qua x hoặc y theo chỉ mục, theo thứ tự của các read trong đồ thị
+            x_reads: Dict[Read, Set[int]] = x.reads
+            y_reads: Dict[Read, Set[int]] = y.reads
+            reads: List[Read] = sorted(x_reads.keys() | y_reads.keys(), key=lambda read: read.read_id)
+            for read in reads:
+                read.update(x=x, y=y, z=z, positions=x_reads.get(read, ()))
+            self.instrument.count(name="merges_succeeded")
+            self.instrument.count(name="reads_updated", value=len(reads))
+            self.instrument.maximum(name="reads_updated_max", value=len(reads))
+                
+            return z
         
         
     def is_mergeable(self, p: Edge, x: Edge, y: Edge) -> bool:
@@ -455,172 +1011,351 @@ class Graph(object):
             bool: Nếu có thể gộp hai cạnh x và y, trả về True. Nếu không trả về False
         """
         
+        # Chỉ mục ngược được dựng lại mỗi lần đọc nên chỉ lấy một lần
+        x_reads: Dict[Read, Set[int]] = x.reads
+        y_reads: Dict[Read, Set[int]] = y.reads
+        
         is_spanned: bool = False
         # Kiểm tra hai cạnh x và y có cùng một read hay không
-        for read in x.reads:
-            if read in y.reads:
+        for read in x_reads:
+            if read in y_reads:
                 is_spanned = True
                 
         # Kiểm tra xem có tồn tại một read mà thông tin bị mâu thuẫn không?
         is_conflicted: bool = False
-        for read in x.reads:
-            # Bắt đầu từ cạnh kề trước, theo thường đi này
-            for i in range(len(read.edges)-2):
-                # Tìm x
-                if read.edges[i] == x:
-                    # Bắt đầu khớp
-                    if (p == None and i == 0) or p == read.edges[i-1]:
-                        # Kiểm tra nếu y không phải ở vị trí sau x
-                        if y != read.edges[i+1]:
-                            is_conflicted = True
-                    else:
+        for read in x_reads:
+            # Các vị trí của x trong read lấy từ chỉ mục
+            for i in sorted(x_reads[read]):
+                # Giống vòng lặp theo thứ tự trên đường đi: bỏ qua x nếu là một trong hai cạnh cuối
+                j: int = read.next_positions[i]
+                if j >= read.last:
+                    continue
+                # Cạnh liền trước, với cạnh đầu tiên là cạnh cuối cùng như chỉ mục -1 của list
+                previous: Edge = read.edge(read.last) if i == 0 else read.edge(read.prev_positions[i])
+                # Bắt đầu khớp
+                if (p == None and i == 0) or p == previous:
+                    # Kiểm tra nếu y không phải ở vị trí sau x
+                    if y.id != read.edge_ids[j]:
+                        is_conflicted = True
+                else:
+                    
+                    if y.id == read.edge_ids[j]:
+                        is_conflicted = True
                         
-                        if y == read.edges[i+1]:
-                            is_conflicted = True
-                            
             return is_spanned and not is_conflicted # Sai căn lề??????????
         
 
-    def clean(self) -> None:
-        """Loại bỏ các cạnh và đỉnh trống từ đồ thị
+    def is_internal(self, vertex: int) -> bool:
+        """Đỉnh nằm giữa một đường không rẽ nhánh: đúng một cạnh vào và một cạnh ra
+
+        Args:
+            vertex (int): Id đỉnh
+
+        Returns:
+            bool: True nếu đỉnh có đúng một cạnh vào và một cạnh ra, nếu không là False
         """
         
-        # Loại bỏ các đỉnh rỗng
-        to_remove_vertex: List[Vertex] = []
-        for vertex in self.vertex_list:
-            if len(vertex.in_edges) == 0 and len(vertex.out_edges) == 0:
-                to_remove_vertex.append(vertex)
-                
-        # Xóa các đỉnh rỗng
-        for vertex in to_remove_vertex:
-            self.vertex_list.remove(vertex)
+        return self.store.in_degrees[vertex] == 1 and self.store.out_degrees[vertex] == 1
+    
+    
+    def compact_unitigs(self) -> int:
+        """Gộp mỗi đường không rẽ nhánh tối đa thành một cạnh (unitig) trong thời gian tuyến tính,
+        đường đi của các read được viết lại theo các cạnh mới. Các vòng tròn mà mọi đỉnh đều không rẽ nhánh được giữ nguyên
+        vì không có đỉnh rẽ nhánh để bắt đầu. Một đường chỉ được gộp khi mọi read đi qua nó đều đi hết đường,
+        các đường bị read đi qua một phần hoặc đi vòng qua được giữ nguyên các cạnh
+
+        Returns:
+            int: Số unitig được tạo ra
+        """
+        
+        store: GraphStore = self.store
+        
+        # Mỗi đường bắt đầu từ một cạnh có đỉnh vào rẽ nhánh (hoặc là đầu mút) và đỉnh ra không rẽ nhánh,
+        # đi tiếp theo cạnh ra duy nhất của đỉnh ra tới khi gặp đỉnh rẽ nhánh. Mỗi cạnh thuộc nhiều nhất một đường
+        chains: List[List[int]] = []
+        for edge in range(store.edge_count):
+            if not store.attached[edge] or self.is_internal(store.sources[edge]) or not self.is_internal(store.targets[edge]):
+                continue
             
-        # Loại bỏ các cạnh rỗng
-        to_remove_edge: List[Edge] = []
-        for edge in self.edge_list:
-            if len(edge.reads) == 0:
-                to_remove_edge.append(edge)
-            elif edge.in_vertex not in self.vertex_list:
-                to_remove_edge.append(edge)
-            elif edge.out_vertex not in self.vertex_list:
-                to_remove_edge.append(edge)
+            chain: List[int] = [edge]
+            target: int = store.targets[edge]
+            while self.is_internal(target):
+                following: int = store.out_edges(target)[0]
+                chain.append(following)
+                target = store.targets[following]
+            chains.append(chain)
+        
+        # Đường và vị trí trong đường của mỗi cạnh, -1 nếu cạnh không thuộc đường nào
+        owners: array = array(ID_TYPE, [-1]) * store.edge_count
+        indexes: array = array(ID_TYPE, [-1]) * store.edge_count
+        for number, chain in enumerate(chains):
+            for index, edge in enumerate(chain):
+                owners[edge] = number
+                indexes[edge] = index
+        
+        # Một đường chỉ được gộp nếu mọi đoạn read đi qua nó đều đi hết đường, từ cạnh đầu tới cạnh cuối.
+        # Đường bị read đi qua một phần (kể cả read bắt đầu hoặc kết thúc giữa đường) hoặc đi vòng qua
+        # (cạnh cuối rồi lại cạnh đầu) được giữ nguyên các cạnh, nếu không read sẽ bị coi là đi hết đường, có khi nhiều lần
+        keep: bytearray = bytearray(len(chains)) # 1 nếu đường không được gộp
+        for read in self.read_list:
+            edges: List[int] = [edge for edge in read.edge_ids if edge >= 0]
+            start: int = 0
+            while start < len(edges):
+                owner: int = owners[edges[start]]
+                end: int = start + 1
+                while end < len(edges) and owners[edges[end]] == owner and indexes[edges[end]] == indexes[edges[end-1]] + 1:
+                    end += 1
+                if owner >= 0:
+                    first_index: int = indexes[edges[start]]
+                    last_index: int = indexes[edges[end-1]]
+                    complete: bool = first_index == 0 and last_index == len(chains[owner]) - 1
+                    wrapped: bool = start > 0 and owners[edges[start-1]] == owner
+                    if not complete or wrapped:
+                        keep[owner] = 1
+                start = end
+        
+        # Unitig của mỗi cạnh bị gộp, -1 nếu cạnh không bị gộp
+        unitigs: array = array(ID_TYPE, [-1]) * store.edge_count
+        created: int = 0
+        for number, chain in enumerate(chains):
+            if keep[number]:
+                continue
+            
+            # Chuỗi của unitig: cạnh đầu, rồi phần không chồng lên cạnh trước của các cạnh sau
+            first: Edge = Edge(graph=self, id=chain[0])
+            parts: List[str] = [first.sequence] + [Edge(graph=self, id=edge).sequence[self.k-1:] for edge in chain[1:]]
+            sequence: str = "".join(parts)
+            unitig: Edge = self.new_edge(in_vertex=first.in_vertex, out_vertex=Vertex(graph=self, id=store.targets[chain[-1]]),
+                                         code=kmer.encode(sequence), length=len(sequence))
+            created += 1
+            
+            for edge in chain:
+                unitigs[edge] = unitig.id
+                store.detach(edge)
+        
+        # Viết lại đường đi của các read: mỗi lần đi qua một unitig (các cạnh liên tiếp của nó) được thay bằng unitig
+        for read in self.read_list:
+            path: List[int] = []
+            previous: int = -1 # Vị trí trong unitig của cạnh liền trước
+            for edge in read.edge_ids:
+                if edge < 0:
+                    continue
+                
+                store.remove_occurrence(edge=edge)
+                if edge >= len(unitigs) or unitigs[edge] < 0:
+                    path.append(edge)
+                    previous = -1
+                    continue
                 
-        # Xóa các cạnh rỗng
-        for edge in to_remove_edge:
-            self.edge_list.remove(edge)
+                if not (path and path[-1] == unitigs[edge] and indexes[edge] == previous + 1):
+                    path.append(unitigs[edge])
+                previous = indexes[edge]
+            
+            read.assign(edge_ids=path)
+        
+        # Loại các cạnh, đỉnh đã bị gộp và dựng lại chỉ mục
+        self.clean()
+        
+        return created
     
     
-    def error_correction(self, threshold: int) -> Tuple[List[str], List[str]]:
-        """Sửa lỗi các reads và lưu vào đồ thị
+    def clean(self) -> CompactionReport:
+        """Loại bỏ các cạnh và đỉnh trống từ đồ thị trong thời gian tuyến tính: đánh dấu các đỉnh, cạnh bị loại
+        rồi dựng lại bảng chỉ mục, danh sách kề và chỉ mục ngược một lần. Id của các đỉnh, cạnh còn lại không đổi
+
+        Returns:
+            CompactionReport: Số đỉnh, số cạnh và số byte được giải phóng
+        """
+        
+        self.instrument.count(name="clean_passes")
+        with self.instrument.stage(name="Graph.clean"):
+            store: GraphStore = self.store
+            report: CompactionReport = CompactionReport()
+            containers: int = footprint(self.vertex_dict, self.edge_dict) + store.index_bytes()
+            
+            # Đánh dấu các đỉnh rỗng
+            for vertex in range(store.vertex_count):
+                if store.vertex_live[vertex] and store.in_degrees[vertex] == 0 and store.out_degrees[vertex] == 0:
+                    store.vertex_live[vertex] = 0
+                    report.vertices += 1
+                    
+            # Đánh dấu các cạnh rỗng hoặc có đỉnh đã bị loại
+            for edge in range(store.edge_count):
+                if store.edge_live[edge] and (store.counts[edge] == 0 or not store.vertex_live[store.sources[edge]] or not store.vertex_live[store.targets[edge]]):
+                    store.edge_live[edge] = 0
+                    report.edges += 1
+                    
+            # Dựng lại bảng chỉ mục, các cạnh đã bị gộp cũng được xóa khỏi bảng chỉ mục
+            self.vertex_dict = {code: vertex for code, vertex in self.vertex_dict.items() if store.vertex_live[vertex]}
+            self.edge_dict = {code: edge for code, edge in self.edge_dict.items() if store.edge_live[edge] and store.attached[edge]}
+            # Bỏ các phần tử đã gỡ khỏi danh sách kề và các vị trí không còn đúng trong chỉ mục ngược
+            store.compact(paths=[read.edge_ids for read in self.read_list])
+            report.bytes += containers - footprint(self.vertex_dict, self.edge_dict) - store.index_bytes()
+            
+            return report
+    
+    
+    def error_correction(self, threshold: int) -> Iterator[str]:
+        """Sửa lỗi lần lượt từng read. Bảng tần số chỉ được tạo khi bắt đầu lấy read đầu tiên,
+        mỗi lần chỉ giữ các k-mer của một read
 
         Args:
             threshold (int): Ngưỡng sửa lỗi để một k-mers được gọi là "đặc"
 
         Returns:
-            Tuplle[List[str], List[str]]: Danh sách các k-mers được sửa lỗi và danh sách các k-mers gốc
+            Iterator[str]: Các read đã được sửa lỗi
         """
         
-        """
-        Là danh sách của từng danh sách của các k-mers, 
-        mỗi danh sách con là danh sách của các k-mers từ một read
-        """
-        list_sequences: List[List[str]] = []
-        freq_dict: Dict[str, int] = {}
+        if self.engine == "numpy":
+            # NumPy chỉ cần khi dùng cách sửa lỗi này
+            from correction import NumpyCorrector
+            
+            with self.instrument.stage(name="count_kmers"):
+                corrector: NumpyCorrector = NumpyCorrector(reads=self.valid_reads(), k=self.k)
+            yield from corrector.correct_many(reads=self.valid_reads(), threshold=threshold)
+            return
         
-        for read in self.seqs:
-            one_sequence_kmers: List[str] = [] # Danh sách các k-mers từ một read
-            for i in range(len(read)-(self.k)+1):
-                one_sequence_kmers.append(read[i:i+(self.k)])
-                # Tính số lần xuất hiện theo k-mers
-                if read[i:i+(self.k)] not in freq_dict:
-                    freq_dict[read[i:i+(self.k)]] = 1
-                else:
-                    freq_dict[read[i:i+(self.k)]] += 1
-            list_sequences.append(one_sequence_kmers)
+        # Tính số lần xuất hiện theo k-mers, song song theo từng shard nếu có nhiều tiến trình.
+        # Bảng đã được đếm ở một lần chạy trước trên cùng file read được đọc lại từ cache
+        with self.instrument.stage(name="count_kmers"):
+            key: Optional[str] = None
+            cached: Optional[Tuple[Dict[str, int], Optional[CountingReport]]] = None
+            # Bảng đếm ngoài bộ nhớ không được đưa vào cache vì đọc lại từ cache sẽ tạo cả bảng trong bộ nhớ
+            if self.cache is not None and self.source is not None and not self.counting_memory:
+                # spectrum dùng định dạng của snapshot, mà snapshot lại cần Graph, nên chỉ được import khi cần
+                from spectrum import file_checksum
+                
+                key = self.cache.key(checksum=file_checksum(filename=self.source), k=self.k, canonical=self.canonical, prefilter=self.prefilter,
+                                     error_rate=self.error_rate, capacity=self.capacity, workers=self.workers)
+                cached = self.cache.load(key=key)
+            
+            if cached is not None:
+                freq_dict, self.counting = cached
+            elif self.counting_memory:
+                freq_dict = count_kmers_external(reads=self.valid_reads(), k=self.k, memory=self.counting_memory, canonical=self.canonical)
+            elif self.prefilter:
+                capacity: int = self.capacity or sum(max(len(read)-self.k+1, 0) for read in self.valid_reads())
+                freq_dict, self.counting = count_solid_kmers(reads=self.valid_reads(), k=self.k, capacity=capacity,
+                                                             error_rate=self.error_rate, workers=self.workers, canonical=self.canonical)
+            else:
+                freq_dict: Dict[str, int] = count_kmers(reads=self.valid_reads(), k=self.k, workers=self.workers, canonical=self.canonical)
+            
+            # Ghi bảng vào cache trước khi sửa lỗi thay đổi các số đếm
+            if key is not None and cached is None:
+                self.cache.store(key=key, k=self.k, table=freq_dict, report=self.counting)
+        self.instrument.count(name="kmers_counted", value=len(freq_dict))
+        self.instrument.count(name="spectrum_cache_hits", value=int(cached is not None))
         
-        seq_list: List[List[str]] = copy.deepcopy(list_sequences)
+        # Bảng trên đĩa được đóng (xóa các file tạm) sau khi đã sửa lỗi hết các read
+        external: Optional[ExternalTable] = freq_dict if isinstance(freq_dict, ExternalTable) else None
         
-        # Lặp qua từng read của list sequence
-        for read in seq_list:
-            # Lặp qua từng k-mer trong từng danh sách con (đại diện cho từng read)
-            for i in range(len(read)):
-                k_mer: str = read[i]
-                
+        # Bảng được đếm theo dạng chuẩn, các k-mer trên read được đổi sang dạng chuẩn mỗi lần tra cứu
+        if self.canonical:
+            freq_dict = CanonicalTable(table=freq_dict)
+        
+        for read in self.valid_reads():
+            # Danh sách các k-mers từ một read
+            k_mers: List[str] = [read[i:i+self.k] for i in range(len(read)-self.k+1)]
+            with self.instrument.stage(name="correct_read"):
+                self.correct_read(read=k_mers, freq_dict=freq_dict, threshold=threshold)
+            
+            # Ghép lại các k-mer khi đã sửa lỗi, read ngắn hơn k trở thành chuỗi rỗng giống NumpyCorrector.decode
+            if k_mers:
+                yield k_mers[0] + "".join([k_mer[-1] for k_mer in k_mers[1:]])
+            else:
+                yield ""
+        
+        if external is not None:
+            external.close()
+    
+    
+    def correct_read(self, read: List[str], freq_dict: Dict[str, int], threshold: int) -> None:
+        """Sửa lỗi các k-mers của một read, danh sách các k-mers và bảng tần số được thay đổi trực tiếp
+
+        Args:
+            read (List[str]): Danh sách các k-mers của read
+            freq_dict (Dict[str, int]): Bảng tần số các k-mers
+            threshold (int): Ngưỡng sửa lỗi để một k-mers được gọi là "đặc"
+        """
+        
+        # Lặp qua từng k-mer trong read
+        for i in range(len(read)):
+            k_mer: str = read[i]
+            
+            """
+            Tra số lần xuất hiện của k-mers trong bảng tần số và 
+            kiểm tra số lần xuất hiện có lớn hơn hoặc bằng ngưỡng hay không?
+            """
+            ocurrences: int = freq_dict[k_mer]
+            if ocurrences < threshold:
                 """
-                Tra số lần xuất hiện của k-mers trong bảng tần số và 
-                kiểm tra số lần xuất hiện có lớn hơn hoặc bằng ngưỡng hay không?
+                Nếu số lần xuất hiện trong bảng tần số ít hơn ngưỡng, ta kiểm tra thêm k-1 k-mer tiếp theo và 
+                nếu số lần xuất hiện cũng những k-mer này cũng nhỏ hơn ngưỡng.
+                Nếu k/2 trong số k-mer này số lần xuất hiện cũng nhỏ hơn ngưỡng, 
+                ta cần phải thay đổi, nếu không ta giữ nguyên
                 """
-                ocurrences: int = freq_dict[k_mer]
-                if ocurrences < threshold:
-                    """
-                    Nếu số lần xuất hiện trong bảng tần số ít hơn ngưỡng, ta kiểm tra thêm k-1 k-mer tiếp theo và 
-                    nếu số lần xuất hiện cũng những k-mer này cũng nhỏ hơn ngưỡng.
-                    Nếu k/2 trong số k-mer này số lần xuất hiện cũng nhỏ hơn ngưỡng, 
-                    ta cần phải thay đổi, nếu không ta giữ nguyên
-                    """
-                    cutoff = math.ceil((len(k_mer)/2.0))
-                    # Lặp thêm k-1 k-mer sau k-mer hiện tại
-                    for j in range(len(k_mer)): # range(1, len(k_mer))?????
-                        if i + j >= len(read):
-                            break
-                        if freq_dict[read[i+j]] < threshold:
-                            cutoff -= 1
-
-                        # Nếu quá nhiều k-mer ngay sau dưới ngưỡng, ta cần phải sửa lỗi
-                        if cutoff <= 0: # Sai lề???????
-                            choices: List[str] = ["A", "C", "G", "T"]
-                            best_score: int = 0
-                            k_mer_to_change: int = -1 # k-mer đầu tiên cần được thay đổi
-                            letter: int = -1 # Chỉ số vị trí của ký tự cần bị thay đổi trong tập các lựa chọn A, C, G, T
-
-                            # Chỉ lặp qua một nửa số ký tự trong k-mer
-                            for x in range(int(math.ceil(len(k_mer)/2.0))):
-                                index: int = -1 - x
-                                # Theo dõi score của từng ký tự
-                                scores: List[int] = [0, 0, 0, 0]
-                                for y in range(len(k_mer)-x):
-                                    # Lặp qua từng k-mer cũng bao gồm ký tự để so sánh score
-                                    k_mer_index: int = (i) + y
-                                    if k_mer_index >= len(read) or k_mer_index < 0:
-                                        continue
-                                    for n in range(len(choices)):
-                                        option: str = str(read[k_mer_index])
-                                        option_list: List[str] = list(option)
-                                        new_index: int = index - y
-                                        if new_index < -len(k_mer):
-                                            new_index += len(k_mer)
-                                        option_list[new_index] = choices[n]
-                                        option_back_to_string: str = "".join(option_list)
-                                        option = option_back_to_string
-                                        if option in freq_dict:
-                                            # Thêm vào chênh lệch về số lần xuất hiện của k-mer thay thế và k-mer ban đầu
-                                            scores[n] += (freq_dict[option] - freq_dict[read[k_mer_index]])
-                                        else:
-                                            # Trừ đi nếu không trong bảng tần số
-                                            scores[n] -= 10
-
-                                for n in range(len(scores)):
-                                    if scores[n] > best_score:
-                                        best_score = scores[n]
-                                        k_mer_to_change = (i - x)
-                                        letter = n
-
-                            if best_score == 0:
-                                # Giữ nguyên ban đầu
-                                continue
-                            else:
-                                # Thay đổi k-mer
-                                for p in range(len(k_mer)): # Thay đổi thành -x
-                                    if (p + k_mer_to_change) < len(read):
-                                        freq_dict[read[k_mer_to_change + p]] -= 1
-                                        list_of_k_mer: List[str] = list(read[k_mer_to_change + p])
-                                        list_of_k_mer[-(p+1)] = choices[letter]
-                                        back_to_string = "".join(list_of_k_mer)
-                                        read[k_mer_to_change + p] = back_to_string
-                                        if read[k_mer_to_change + p] in freq_dict:
-                                            freq_dict[read[k_mer_to_change + p]] += 1
-                                        else:
-                                            freq_dict[read[k_mer_to_change + p]] = 1
-                            
-        return seq_list, list_sequences
-                    
\ No newline at end of file
+                cutoff = math.ceil((len(k_mer)/2.0))
+                # Lặp thêm k-1 k-mer sau k-mer hiện tại
+                for j in range(len(k_mer)): # range(1, len(k_mer))?????
+                    if i + j >= len(read):
+                        break
+                    if freq_dict[read[i+j]] < threshold:
+                        cutoff -= 1
+
+                    # Nếu quá nhiều k-mer ngay sau dưới ngưỡng, ta cần phải sửa lỗi
+                    if cutoff <= 0: # Sai lề???????
+                        choices: List[str] = ["A", "C", "G", "T"]
+                        best_score: int = 0
+                        k_mer_to_change: int = -1 # k-mer đầu tiên cần được thay đổi
+                        letter: int = -1 # Chỉ số vị trí của ký tự cần bị thay đổi trong tập các lựa chọn A, C, G, T
+
+                        # Chỉ lặp qua một nửa số ký tự trong k-mer
+                        for x in range(int(math.ceil(len(k_mer)/2.0))):
+                            index: int = -1 - x
+                            # Theo dõi score của từng ký tự
+                            scores: List[int] = [0, 0, 0, 0]
+                            for y in range(len(k_mer)-x):
+                                # Lặp qua từng k-mer cũng bao gồm ký tự để so sánh score
+                                k_mer_index: int = (i) + y
+                                if k_mer_index >= len(read) or k_mer_index < 0:
+                                    continue
+                                for n in range(len(choices)):
+                                    option: str = str(read[k_mer_index])
+                                    option_list: List[str] = list(option)
+                                    new_index: int = index - y
+                                    if new_index < -len(k_mer):
+                                        new_index += len(k_mer)
+                                    option_list[new_index] = choices[n]
+                                    option_back_to_string: str = "".join(option_list)
+                                    option = option_back_to_string
+                                    if option in freq_dict:
+                                        # Thêm vào chênh lệch về số lần xuất hiện của k-mer thay thế và k-mer ban đầu
+                                        scores[n] += (freq_dict[option] - freq_dict[read[k_mer_index]])
+                                    else:
+                                        # Trừ đi nếu không trong bảng tần số
+                                        scores[n] -= 10
+
+                            for n in range(len(scores)):
+                                if scores[n] > best_score:
+                                    best_score = scores[n]
+                                    k_mer_to_change = (i - x)
+                                    letter = n
+
+                        if best_score == 0:
+                            # Giữ nguyên ban đầu
+                            continue
+                        else:
+                            # Thay đổi k-mer
+                            self.instrument.count(name="corrections_applied")
+                            for p in range(len(k_mer)): # Thay đổi thành -x
+                                if (p + k_mer_to_change) < len(read):
+                                    freq_dict[read[k_mer_to_change + p]] -= 1
+                                    list_of_k_mer: List[str] = list(read[k_mer_to_change + p])
+                                    list_of_k_mer[-(p+1)] = choices[letter]
+                                    back_to_string = "".join(list_of_k_mer)
+                                    read[k_mer_to_change + p] = back_to_string
+                                    if read[k_mer_to_change + p] in freq_dict:
+                                        freq_dict[read[k_mer_to_change + p]] += 1
+                                    else:
+                                        freq_dict[read[k_mer_to_change + p]] = 1
+                
\ No newline at end of file
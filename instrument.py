@@ -0,0 +1,284 @@
+import sys
+import json
+import time
+import pstats
+import cProfile
+import tracemalloc
+from contextlib import nullcontext
+from typing import Any, List, Dict, TextIO, Optional, ContextManager
+
+# resource chỉ có trên các hệ Unix, không có thì không đo được RSS đỉnh
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+PROFILE_LIMIT: int = 20 # Số hàm tốn thời gian nhất được đưa vào báo cáo cProfile
+SNAPSHOT_LIMIT: int = 10 # Số dòng mã cấp phát nhiều bộ nhớ nhất trong mỗi snapshot tracemalloc
+_DISABLED: ContextManager = nullcontext() # Dùng chung cho mọi bước khi tắt đo, không tạo đối tượng mới
+
+
+def peak_rss() -> int:
+    """RSS đỉnh của tiến trình từ lúc bắt đầu
+
+    Returns:
+        int: Số byte, bằng 0 nếu hệ điều hành không hỗ trợ
+    """
+
+    if resource is None:
+        return 0
+
+    # Linux trả về KiB, macOS trả về byte
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageStats(object):
+    """
+    Thời gian và bộ nhớ cộng dồn của một bước qua mọi lần chạy
+    """
+
+    def __init__(self) -> None:
+        self.calls: int = 0 # Số lần chạy
+        self.wall_seconds: float = 0.0 # Tổng thời gian thực
+        self.cpu_seconds: float = 0.0 # Tổng thời gian CPU của tiến trình
+        self.peak_rss_bytes: int = 0 # RSS đỉnh của tiến trình khi bước kết thúc
+        self.traced_peak_bytes: int = 0 # Bộ nhớ Python đỉnh theo tracemalloc từ lúc vào bước ngoài cùng, bằng 0 nếu không bật
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: Các số liệu dạng dict để ghi ra JSON
+        """
+
+        return {"calls": self.calls, "wall_seconds": self.wall_seconds, "cpu_seconds": self.cpu_seconds,
+                "peak_rss_bytes": self.peak_rss_bytes, "traced_peak_bytes": self.traced_peak_bytes}
+
+
+class Stage(object):
+    """
+    Ngữ cảnh đo một lần chạy của một bước, được tạo bởi Instrumentation.stage
+    """
+
+    def __init__(self, instrument: "Instrumentation", name: str) -> None:
+        """
+
+        Args:
+            instrument (Instrumentation): Nơi ghi kết quả
+            name (str): Tên bước
+        """
+
+        self.instrument: Instrumentation = instrument
+        self.name: str = name
+        self.wall: float = 0.0
+        self.cpu: float = 0.0
+
+
+    def __enter__(self) -> "Stage":
+        """
+
+        Returns:
+            Stage: Chính ngữ cảnh này
+        """
+
+        self.instrument.enter()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+        return self
+
+
+    def __exit__(self, *exc_info) -> None:
+        """Bước vẫn được ghi nhận khi có ngoại lệ, ngoại lệ không bị chặn lại
+        """
+
+        wall: float = time.perf_counter() - self.wall
+        cpu: float = time.process_time() - self.cpu
+        self.instrument.exit(name=self.name, wall=wall, cpu=cpu)
+
+
+class Instrumentation(object):
+    """
+    Đo thời gian thực, thời gian CPU và bộ nhớ của từng bước, cùng các bộ đếm (số k-mer, số lần sửa lỗi, số lần gộp...).
+    Có thể chụp snapshot tracemalloc sau mỗi bước ngoài cùng và chạy cProfile trong các bước.
+    Khi tắt, stage trả về một ngữ cảnh rỗng dùng chung và count trả về ngay, gần như không tốn gì
+    """
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, profile: bool = False) -> None:
+        """
+
+        Args:
+            enabled (bool, optional): Có đo hay không. Defaults to False.
+            trace_memory (bool, optional): Bật tracemalloc để đo bộ nhớ Python đỉnh và chụp snapshot, làm chậm chương trình nhiều lần. Defaults to False.
+            profile (bool, optional): Chạy cProfile trong các bước. Defaults to False.
+        """
+
+        self.enabled: bool = enabled
+        self.trace_memory: bool = enabled and trace_memory
+        self.stages: Dict[str, StageStats] = {} # Số liệu của các bước theo tên
+        self.counters: Dict[str, int] = {} # Các bộ đếm theo tên
+        self.snapshots: List[Dict[str, Any]] = [] # Các snapshot tracemalloc theo thứ tự
+        self.profiler: Optional[cProfile.Profile] = cProfile.Profile() if enabled and profile else None
+        self.depth: int = 0 # Số bước đang chạy lồng nhau
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    def stage(self, name: str) -> ContextManager:
+        """Ngữ cảnh đo một bước, các bước có thể lồng nhau (thời gian của bước ngoài gồm cả bước trong)
+
+        Args:
+            name (str): Tên bước
+
+        Returns:
+            ContextManager: Ngữ cảnh dùng với "with"
+        """
+
+        if not self.enabled:
+            return _DISABLED
+
+        return Stage(instrument=self, name=name)
+
+
+    def enter(self) -> None:
+        """Bắt đầu một bước: bật cProfile và đặt lại bộ nhớ đỉnh khi vào bước ngoài cùng
+        """
+
+        if self.depth == 0:
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+            if self.profiler is not None:
+                self.profiler.enable()
+        self.depth += 1
+
+
+    def exit(self, name: str, wall: float, cpu: float) -> None:
+        """Kết thúc một bước và cộng dồn số liệu
+
+        Args:
+            name (str): Tên bước
+            wall (float): Thời gian thực của lần chạy
+            cpu (float): Thời gian CPU của lần chạy
+        """
+
+        self.depth -= 1
+        if self.depth == 0 and self.profiler is not None:
+            self.profiler.disable()
+
+        stats: StageStats = self.stages.setdefault(name, StageStats())
+        stats.calls += 1
+        stats.wall_seconds += wall
+        stats.cpu_seconds += cpu
+        stats.peak_rss_bytes = max(stats.peak_rss_bytes, peak_rss())
+        if self.trace_memory:
+            stats.traced_peak_bytes = max(stats.traced_peak_bytes, tracemalloc.get_traced_memory()[1])
+            if self.depth == 0:
+                self.snapshot(label=name)
+
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Cộng vào một bộ đếm
+
+        Args:
+            name (str): Tên bộ đếm
+            value (int, optional): Giá trị cộng thêm. Defaults to 1.
+        """
+
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+    def maximum(self, name: str, value: int) -> None:
+        """Ghi nhận giá trị lớn nhất của một bộ đếm
+
+        Args:
+            name (str): Tên bộ đếm
+            value (int): Giá trị mới
+        """
+
+        if self.enabled and value > self.counters.get(name, 0):
+            self.counters[name] = value
+
+
+    def snapshot(self, label: str) -> None:
+        """Chụp snapshot tracemalloc, chỉ giữ các dòng mã cấp phát nhiều bộ nhớ nhất
+
+        Args:
+            label (str): Nhãn của snapshot
+        """
+
+        if not self.trace_memory:
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        top: List[tracemalloc.Statistic] = tracemalloc.take_snapshot().statistics("lineno")[:SNAPSHOT_LIMIT]
+        self.snapshots.append({
+            "label": label, "current_bytes": current, "peak_bytes": peak,
+            "top": [{"location": str(stat.traceback[0]), "bytes": stat.size, "blocks": stat.count} for stat in top],
+        })
+
+
+    def profile_stats(self, limit: int = PROFILE_LIMIT) -> List[Dict[str, Any]]:
+        """Các hàm có thời gian tích lũy lớn nhất theo cProfile
+
+        Args:
+            limit (int, optional): Số hàm. Defaults to PROFILE_LIMIT.
+
+        Returns:
+            List[Dict[str, Any]]: Vị trí, số lần gọi, thời gian riêng và thời gian tích lũy của từng hàm
+        """
+
+        if self.profiler is None:
+            return []
+
+        stats: Dict[Any, Any] = pstats.Stats(self.profiler).stats
+        rows: List[Dict[str, Any]] = [{"function": "{}:{}({})".format(*key), "calls": value[1], "total_seconds": value[2], "cumulative_seconds": value[3]}
+                                      for key, value in stats.items()]
+        rows.sort(key=lambda row: row["cumulative_seconds"], reverse=True)
+
+        return rows[:limit]
+
+
+    def dump_profile(self, filename: str) -> None:
+        """Ghi kết quả cProfile ra file để xem bằng pstats hoặc snakeviz
+
+        Args:
+            filename (str): File để ghi
+        """
+
+        if self.profiler is None:
+            raise ValueError("cProfile chưa được bật, hãy tạo Instrumentation với profile=True")
+
+        self.profiler.dump_stats(filename)
+
+
+    def report(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: Số liệu của các bước, các bộ đếm, RSS đỉnh, các snapshot và kết quả cProfile
+        """
+
+        return {
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "counters": dict(self.counters),
+            "peak_rss_bytes": peak_rss(),
+            "snapshots": self.snapshots,
+            "profile": self.profile_stats(),
+        }
+
+
+    def write(self, handle: TextIO) -> None:
+        """Ghi báo cáo dạng JSON
+
+        Args:
+            handle (TextIO): File (hoặc sys.stderr) để ghi
+        """
+
+        json.dump(self.report(), handle, indent=2)
+        handle.write("\n")
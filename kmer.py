@@ -0,0 +1,246 @@
+import sys
+from array import array
+from typing import List, Dict, Iterable, Iterator
+
+
+BASES: str = "ACGT" # Các ký tự theo thứ tự mã 2 bit 0, 1, 2, 3
+
+# Bảng chuyển mỗi byte ký tự sang mã 2 bit, ký tự không hợp lệ được gán 255
+_ENCODE_TABLE: bytearray = bytearray([255] * 256)
+for _code, _base in enumerate(BASES):
+    _ENCODE_TABLE[ord(_base)] = _code
+    _ENCODE_TABLE[ord(_base.lower())] = _code
+_ENCODE_TABLE: bytes = bytes(_ENCODE_TABLE)
+
+# Bảng chuyển mã 2 bit (mỗi mã một byte) về ký tự, và về chữ số hệ 4 để int(..., 4) tính mã của cả dãy
+_BASE_TABLE: bytes = bytes.maketrans(b"\x00\x01\x02\x03", BASES.encode("ascii"))
+_BASE_DIGIT_TABLE: bytes = bytes.maketrans(b"\x00\x01\x02\x03", b"0123")
+
+# Bảng chuyển mỗi byte (4 ký tự, mỗi ký tự 2 bit) sang chuỗi 4 ký tự
+_DECODE_TABLE: List[str] = [BASES[b >> 6] + BASES[(b >> 4) & 3] + BASES[(b >> 2) & 3] + BASES[b & 3] for b in range(256)]
+
+# Bảng chuyển mỗi ký tự sang chữ số hệ 4 của mã 2 bit, để int(..., 4) mã hóa cả chuỗi một lần
+_DIGIT_TABLE: Dict[int, int] = str.maketrans("ACGTacgt", "01230123")
+
+# Bảng chuyển mỗi ký tự sang ký tự bổ sung, giữ nguyên chữ hoa hay chữ thường
+_COMPLEMENT_TABLE: Dict[int, int] = str.maketrans("ACGTacgt", "TGCAtgca")
+
+
+def mask(length: int) -> int:
+    """Mặt nạ bit giữ lại mã của length ký tự cuối cùng
+
+    Args:
+        length (int): Số ký tự
+
+    Returns:
+        int: Mặt nạ gồm 2 * length bit 1
+    """
+
+    return (1 << (2 * length)) - 1
+
+
+def is_valid(sequence: str) -> bool:
+    """Kiểm tra chuỗi chỉ gồm các ký tự A, C, G, T (không phân biệt hoa thường)
+
+    Args:
+        sequence (str): Chuỗi cần kiểm tra
+
+    Returns:
+        bool: True nếu mã hóa được chuỗi, nếu không là False
+    """
+
+    return b"\xff" not in sequence.encode("ascii", "replace").translate(_ENCODE_TABLE)
+
+
+def encode_bases(sequence: str) -> bytes:
+    """Chuyển một chuỗi A/C/G/T sang dãy các mã 2 bit (mỗi mã một byte)
+
+    Args:
+        sequence (str): Chuỗi cần mã hóa
+
+    Returns:
+        bytes: Dãy các mã 0, 1, 2, 3 tương ứng với từng ký tự
+    """
+
+    codes: bytes = sequence.encode("ascii").translate(_ENCODE_TABLE)
+    if b"\xff" in codes:
+        raise ValueError("Chuỗi {} chứa ký tự không phải A, C, G, T".format(sequence))
+
+    return codes
+
+
+def decode_bases(bases: bytes) -> str:
+    """Chuyển một dãy các mã 2 bit (mỗi mã một byte, ví dụ một memoryview của ReadStore) về chuỗi A/C/G/T
+
+    Args:
+        bases (bytes): Dãy các mã 0, 1, 2, 3
+
+    Returns:
+        str: Chuỗi tương ứng
+    """
+
+    return bytes(bases).translate(_BASE_TABLE).decode("ascii")
+
+
+def encode_codes(bases: bytes) -> int:
+    """Mã số nguyên của một dãy các mã 2 bit (mỗi mã một byte), bằng encode(decode_bases(bases)) nhưng không tạo chuỗi
+
+    Args:
+        bases (bytes): Dãy các mã 0, 1, 2, 3
+
+    Returns:
+        int: Mã số nguyên của dãy
+    """
+
+    return int(bytes(bases).translate(_BASE_DIGIT_TABLE), 4) if len(bases) else 0
+
+
+def encode(sequence: str) -> int:
+    """Mã hóa một chuỗi thành một số nguyên, mỗi ký tự chiếm 2 bit
+
+    Args:
+        sequence (str): Chuỗi cần mã hóa
+
+    Returns:
+        int: Mã số nguyên của chuỗi
+    """
+
+    # Gói 4 mã 2 bit vào mỗi byte rồi chuyển cả dãy byte thành số nguyên một lần,
+    # dịch từng ký tự vào một số nguyên lớn sẽ tốn thời gian bình phương với chuỗi dài
+    bases: bytes = bytes((-len(sequence)) % 4) + encode_bases(sequence)
+    packed: bytes = bytes([(a << 6) | (b << 4) | (c << 2) | d for a, b, c, d in zip(bases[0::4], bases[1::4], bases[2::4], bases[3::4])])
+
+    return int.from_bytes(packed, "big")
+
+
+def decode(code: int, length: int) -> str:
+    """Giải mã một số nguyên về chuỗi có độ dài length
+
+    Args:
+        code (int): Mã số nguyên của chuỗi
+        length (int): Độ dài chuỗi
+
+    Returns:
+        str: Chuỗi được giải mã
+    """
+
+    if length == 0:
+        return ""
+
+    # Mỗi byte chứa 4 ký tự, bỏ đi các ký tự thừa ở đầu
+    n_bytes: int = (length + 3) // 4
+    sequence: str = "".join([_DECODE_TABLE[b] for b in code.to_bytes(n_bytes, "big")])
+
+    return sequence[4 * n_bytes - length:]
+
+
+def encode_valid(sequence: str) -> int:
+    """Mã hóa một chuỗi đã biết là hợp lệ, nhanh hơn encode vì không kiểm tra từng ký tự
+
+    Args:
+        sequence (str): Chuỗi A/C/G/T (đã được kiểm tra bằng is_valid)
+
+    Returns:
+        int: Mã số nguyên của chuỗi
+    """
+
+    return int(sequence.translate(_DIGIT_TABLE), 4) if sequence else 0
+
+
+def encode_all(sequences: Iterable[str]) -> array:
+    """Mã hóa nhiều chuỗi A/C/G/T không quá 32 ký tự, nhanh hơn nhiều so với gọi encode cho từng chuỗi
+
+    Args:
+        sequences (Iterable[str]): Các chuỗi hợp lệ (đã được kiểm tra bằng is_valid)
+
+    Returns:
+        array: Dãy mã kiểu "Q" theo thứ tự
+    """
+
+    return array("Q", [int(sequence.translate(_DIGIT_TABLE), 4) if sequence else 0 for sequence in sequences])
+
+
+def decode_all(codes: array, length: int) -> List[str]:
+    """Giải mã một dãy mã của các chuỗi cùng độ dài, không quá 32 ký tự
+
+    Args:
+        codes (array): Dãy mã kiểu "Q"
+        length (int): Độ dài mỗi chuỗi
+
+    Returns:
+        List[str]: Các chuỗi được giải mã theo thứ tự
+    """
+
+    if length > 32:
+        raise ValueError("Chỉ giải mã theo dãy được các chuỗi không quá 32 ký tự")
+
+    # Các mã được ghi big-endian thành một dãy byte rồi giải mã một lần, mỗi mã chiếm 32 ký tự
+    data: array = array("Q", codes)
+    if sys.byteorder == "little":
+        data.byteswap()
+    text: str = "".join([_DECODE_TABLE[b] for b in data.tobytes()])
+
+    return [text[i+32-length:i+32] for i in range(0, len(text), 32)]
+
+
+def concat(code: int, other: int, other_length: int, overlap: int) -> int:
+    """Nối hai chuỗi đã mã hóa chồng lên nhau overlap ký tự
+
+    Args:
+        code (int): Mã của chuỗi phía trước
+        other (int): Mã của chuỗi phía sau
+        other_length (int): Độ dài chuỗi phía sau
+        overlap (int): Số ký tự chồng nhau giữa cuối chuỗi trước và đầu chuỗi sau
+
+    Returns:
+        int: Mã của chuỗi được nối
+    """
+
+    tail: int = other_length - overlap
+
+    return (code << (2 * tail)) | (other & mask(tail))
+
+
+def codes(sequence: str, k: int) -> Iterator[int]:
+    """Mã của lần lượt các k-mer trong chuỗi, được cập nhật cuốn chiếu theo từng ký tự
+
+    Args:
+        sequence (str): Chuỗi A/C/G/T
+        k (int): Độ dài một k-mer
+
+    Returns:
+        Iterator[int]: Mã của k-mer bắt đầu tại vị trí 0, 1, ..., len(sequence) - k
+    """
+
+    k_mask: int = mask(k)
+    code: int = 0
+    for i, base in enumerate(encode_bases(sequence)):
+        code = ((code << 2) | base) & k_mask
+        if i >= k-1:
+            yield code
+
+
+def reverse_complement(sequence: str) -> str:
+    """Chuỗi bổ sung ngược, tức là chuỗi đọc trên mạch còn lại của DNA
+
+    Args:
+        sequence (str): Chuỗi A/C/G/T
+
+    Returns:
+        str: Chuỗi đảo ngược với mỗi ký tự được thay bằng ký tự bổ sung (A-T, C-G)
+    """
+
+    return sequence.translate(_COMPLEMENT_TABLE)[::-1]
+
+
+def canonical(k_mer: str) -> str:
+    """Dạng chuẩn của một k-mer: k-mer và chuỗi bổ sung ngược của nó có cùng một dạng chuẩn
+
+    Args:
+        k_mer (str): k-mer
+
+    Returns:
+        str: k-mer nhỏ hơn theo thứ tự từ điển giữa k-mer và chuỗi bổ sung ngược của nó
+    """
+
+    return min(k_mer, reverse_complement(k_mer))
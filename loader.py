@@ -1,52 +1,160 @@
+import io
 import os
-from typing import List, Dict
+import gzip
+from typing import List, Union, Iterator, BinaryIO
 
+import kmer
+from readstore import ReadStore
 
-class Loader(object):
+
+BUFFER_SIZE: int = 1 << 20 # Kích thước mỗi khối đọc từ file (1 MiB)
+GZIP_MAGIC: bytes = b"\x1f\x8b" # Hai byte đầu của file gzip/bgzip
+
+
+class ReadStream(object):
     """
-    Lưu thông tin về gen
+    Đọc lần lượt các read từ file FASTQ hoặc FASTA, có thể được nén gzip/bgzip.
+    Mỗi lần lặp sẽ mở lại file, các read không được giữ lại trong bộ nhớ
     """
     
-    def __init__(self, reads: List[str]) -> None:
+    def __init__(self, filename: str, buffer_size: int = BUFFER_SIZE) -> None:
         """
-        Sử dụng phương thức tĩnh Loader.load("filename.fq") để khởi tạo đối tượng lưu các reads
+
+        Args:
+            filename (str): File chứa các read
+            buffer_size (int, optional): Kích thước khối đọc từ file. Defaults to BUFFER_SIZE.
         """
-        self.reads = reads
-    
-    
-    @staticmethod
-    def load(filename: str):
-        
-        # Kiểm tra loại file
-        if not (filename.endswith(".fq") or filename.endswith(".fastq")):
-            raise ValueError("Kiểu file không được hỗ trợ, hãy sử dụng file định dạng .fq hoặc .fastq")
         
         # Kiểm tra file có tồn tại không
         if not os.path.isfile(path=filename):
             raise Exception("File {} không tồn tại".format(filename))
         
         # Kiểm tra file có đọc được không
-        if not os.access(path=filename, mode=os.F_OK):
+        if not os.access(path=filename, mode=os.R_OK):
             raise Exception("File {} không đọc được".format(filename))
         
-        # Tạo một list các string để lưu các read
-        reads: List[str] = []
+        self.filename: str = filename
+        self.buffer_size: int = buffer_size
+        
         
-        # Đọc từng dòng của file
-        for line in open(file=filename, mode="r"):
-            line = line.strip()
-            if line[:1] == "@":
-                name = line[1:]
-                is_seq_next: bool = True
-            elif is_seq_next:
-                if "N" in line:
-                    is_seq_next = False
+    def open(self) -> BinaryIO:
+        """Mở file, tự động giải nén nếu file được nén gzip/bgzip
+
+        Returns:
+            BinaryIO: File đã được mở với bộ đệm lớn
+        """
+        
+        handle: BinaryIO = open(file=self.filename, mode="rb", buffering=self.buffer_size)
+        if handle.peek(len(GZIP_MAGIC))[:len(GZIP_MAGIC)] == GZIP_MAGIC:
+            # bgzip là nhiều khối gzip nối tiếp nhau nên cũng được đọc bởi gzip
+            handle = io.BufferedReader(gzip.GzipFile(fileobj=handle, mode="rb"), buffer_size=self.buffer_size)
+            
+        return handle
+    
+    
+    def __iter__(self) -> Iterator[str]:
+        """Lần lượt trả về từng read, bỏ qua các read có ký tự khác A, C, G, T (N hoặc các mã IUPAC khác)
+
+        Returns:
+            Iterator[str]: Các read đọc được
+        """
+        
+        with self.open() as handle:
+            # Xác định định dạng file từ ký tự đầu tiên
+            first: bytes = handle.peek(1)[:1]
+            if first == b"@":
+                records: Iterator[str] = self.parse_fastq(handle=handle)
+            elif first == b">":
+                records: Iterator[str] = self.parse_fasta(handle=handle)
+            elif first == b"":
+                return
+            else:
+                raise ValueError("Kiểu file {} không được hỗ trợ, hãy sử dụng file định dạng FASTQ hoặc FASTA".format(self.filename))
+            
+            for read in records:
+                if not kmer.is_valid(read):
                     continue
+                yield read
                 
-                reads.append(line)
-                is_seq_next = False
                 
-        return Loader(reads=reads)
+    def parse_fastq(self, handle: BinaryIO) -> Iterator[str]:
+        """Đọc các read từ file FASTQ, mỗi bản ghi gồm 4 dòng
+
+        Args:
+            handle (BinaryIO): File đã được mở
+
+        Returns:
+            Iterator[str]: Chuỗi của từng bản ghi
+        """
+        
+        while True:
+            header: bytes = handle.readline()
+            if not header:
+                return
+            if not header.strip():
+                continue
+            sequence: bytes = handle.readline()
+            separator: bytes = handle.readline()
+            handle.readline() # Dòng chất lượng
+            
+            # Kiểm tra cấu trúc bản ghi thay vì dựa vào ký tự đầu của dòng (dòng chất lượng có thể bắt đầu bằng @)
+            if header[:1] != b"@" or separator[:1] != b"+":
+                raise ValueError("File {} không đúng định dạng FASTQ".format(self.filename))
+            
+            yield sequence.strip().decode("ascii").upper()
+            
+            
+    def parse_fasta(self, handle: BinaryIO) -> Iterator[str]:
+        """Đọc các read từ file FASTA, chuỗi của một bản ghi có thể nằm trên nhiều dòng
+
+        Args:
+            handle (BinaryIO): File đã được mở
+
+        Returns:
+            Iterator[str]: Chuỗi của từng bản ghi
+        """
+        
+        lines: List[bytes] = []
+        for line in handle:
+            if line[:1] == b">":
+                if lines:
+                    yield b"".join(lines).decode("ascii").upper()
+                lines = []
+            else:
+                lines.append(line.strip())
+                
+        if lines:
+            yield b"".join(lines).decode("ascii").upper()
+
+
+class Loader(object):
+    """
+    Lưu thông tin về gen
+    """
+    
+    def __init__(self, reads: Union[List[str], ReadStore]) -> None:
+        """
+        Sử dụng phương thức tĩnh Loader.load("filename.fq") để khởi tạo đối tượng lưu các reads
+        """
+        self.reads = reads
+    
+    
+    @staticmethod
+    def load(filename: str):
+        """
+        Đọc toàn bộ các read vào bộ nhớ, các read được nén vào một ReadStore (mỗi base một byte) thay vì mỗi read một chuỗi
+        """
+        
+        return Loader(reads=ReadStore.from_reads(reads=Loader.stream(filename=filename)))
+    
+    
+    @staticmethod
+    def stream(filename: str, buffer_size: int = BUFFER_SIZE) -> ReadStream:
+        """
+        Đọc lần lượt các read mà không giữ toàn bộ trong bộ nhớ, hỗ trợ FASTQ, FASTA, gzip và bgzip
+        """
+        
+        return ReadStream(filename=filename, buffer_size=buffer_size)
     
     
     def __getitem__(self, n: int) -> str:
@@ -70,7 +178,7 @@ class Loader(object):
         Trả về list các string là các reads đã đọc được
         """
         
-        return "".join(str(self.reads))
+        return "".join(str(list(self.reads)))
     
     
 #reads = Loader.load(filename="data/hemoglobin.fastq")
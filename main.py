@@ -1,7 +1,91 @@
-from assembly import Assembler
+import sys
+import json
+import argparse
+from typing import Any, List, Dict, Optional
 
+from batch import Job, collect_jobs, run_batch
+from normalize import NORMALIZE_MEMORY
+from spectrum import SpectrumCache, CACHE_DIRECTORY, CACHE_SIZE, CANDIDATE_KS
 
-if __name__ == "__main__":   
-    assembly: Assembler = Assembler(filename="data/hemoglobin.fastq", k=11)
-    assembly.make_superpath()
-    print(assembly.find_eulerian_path())
\ No newline at end of file
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Đọc các tham số dòng lệnh
+
+    Args:
+        argv (Optional[List[str]], optional): Các tham số, None để dùng sys.argv. Defaults to None.
+
+    Returns:
+        argparse.Namespace: Các tham số đã đọc
+    """
+
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Lắp ráp nhiều mẫu song song, mỗi mẫu ghi các contig ra một file FASTA")
+    parser.add_argument("inputs", nargs="*", help="Các file read (FASTQ/FASTA, có thể nén gzip) hoặc mẫu glob như \"reads/*.fq.gz\"")
+    parser.add_argument("--manifest", help="File danh sách mẫu, mỗi dòng là \"tên mẫu<TAB>file read\" hoặc chỉ \"file read\"")
+    parser.add_argument("-k", type=int, default=31, help="Độ dài một k-mer")
+    # Chỉ chọn được một cách đặt k: chọn tự động hoặc lắp ráp nhiều k
+    k_mode: argparse._MutuallyExclusiveGroup = parser.add_mutually_exclusive_group()
+    k_mode.add_argument("--auto-k", type=int, nargs="*", metavar="K",
+                        help="Chọn k (thay cho -k) và ngưỡng sửa lỗi (thay cho --threshold) từ phổ k-mer, trong các giá trị K hoặc {}".format(CANDIDATE_KS))
+    k_mode.add_argument("--multi-k", type=int, nargs="+", metavar="K", help="Lắp ráp lần lượt với các k tăng dần (thay cho -k), contig của mỗi vòng là read của vòng sau")
+    parser.add_argument("--error-correct", action="store_true", help="Sửa lỗi các read trước khi tạo đồ thị")
+    parser.add_argument("--threshold", type=int, default=2, help="Ngưỡng để một k-mer được gọi là \"đặc\" khi sửa lỗi")
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python", help="Cách sửa lỗi")
+    parser.add_argument("--prefilter", action="store_true", help="Lọc các k-mer chỉ gặp một lần bằng bộ lọc Bloom khi sửa lỗi")
+    parser.add_argument("--counting-memory", type=int, default=0, help="Đếm k-mer ngoài bộ nhớ khi sửa lỗi với giới hạn này (MiB), 0 là đếm trong bộ nhớ")
+    parser.add_argument("--normalize", type=int, default=0, metavar="C", help="Bỏ các read ở những vùng đã đạt độ phủ C trước khi tạo đồ thị, 0 là giữ mọi read")
+    parser.add_argument("--normalize-memory", type=int, default=NORMALIZE_MEMORY >> 20, help="Bộ nhớ của bảng đếm khi chuẩn hóa độ phủ (MiB)")
+    parser.add_argument("--canonical", action="store_true", help="Coi một k-mer và chuỗi bổ sung ngược của nó là một")
+    parser.add_argument("--unitigs", action="store_true", help="Gộp các đường không rẽ nhánh trước khi tạo superpath (thử nghiệm)")
+    parser.add_argument("--cache-dir", help="Thư mục cache bảng tần số k-mer khi sửa lỗi, ví dụ {}".format(CACHE_DIRECTORY))
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE >> 20, help="Tổng kích thước tối đa của cache (MiB), 0 là không giới hạn")
+    parser.add_argument("-o", "--output-dir", default=".", help="Thư mục ghi file contig của từng mẫu")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Số mẫu được lắp ráp cùng lúc")
+    parser.add_argument("--memory-limit", type=int, default=0, help="Giới hạn bộ nhớ của mỗi mẫu (MiB), 0 là không giới hạn")
+    parser.add_argument("--time-limit", type=int, default=0, help="Giới hạn thời gian của mỗi mẫu (giây), 0 là không giới hạn")
+
+    args: argparse.Namespace = parser.parse_args(argv)
+    if not args.inputs and not args.manifest:
+        parser.error("cần ít nhất một file read hoặc --manifest")
+
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Lắp ráp các mẫu, in kết quả từng mẫu dạng JSON (mỗi dòng một mẫu) ra stdout theo thứ tự hoàn thành
+
+    Args:
+        argv (Optional[List[str]], optional): Các tham số, None để dùng sys.argv. Defaults to None.
+
+    Returns:
+        int: 0 nếu mọi mẫu đều thành công, 1 nếu có mẫu bị lỗi
+    """
+
+    args: argparse.Namespace = parse_args(argv=argv)
+    jobs: List[Job] = collect_jobs(patterns=args.inputs, manifest=args.manifest, output_dir=args.output_dir)
+    options: Dict[str, Any] = {
+        "error_correct": args.error_correct, "engine": args.engine,
+        "prefilter": args.prefilter, "canonical": args.canonical, "unitigs": args.unitigs, "counting_memory": args.counting_memory << 20,
+        "normalize": args.normalize, "normalize_memory": args.normalize_memory << 20,
+        "cache": SpectrumCache(directory=args.cache_dir, max_bytes=args.cache_size << 20) if args.cache_dir else None,
+    }
+    # Khi chọn k tự động, ngưỡng sửa lỗi cũng được chọn từ phổ k-mer
+    if args.auto_k is not None:
+        options["candidates"] = args.auto_k or CANDIDATE_KS
+    elif args.multi_k:
+        options.update(ks=args.multi_k, threshold=args.threshold)
+    else:
+        options.update(k=args.k, threshold=args.threshold)
+
+    failed: int = 0
+    for result in run_batch(jobs=jobs, options=options, workers=args.jobs, memory_limit=args.memory_limit << 20, time_limit=args.time_limit):
+        failed += not result.ok
+        sys.stdout.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+    sys.stderr.write("{} mẫu thành công, {} mẫu bị lỗi\n".format(len(jobs) - failed, failed))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import time
+from typing import Any, List, Dict, TextIO, Optional
+
+from assembly import Assembler
+from spectrum import SpectrumCache
+from normalize import NORMALIZE_MEMORY
+from writer import LINE_WIDTH
+from instrument import Instrumentation
+
+
+class MultiKAssembler(object):
+    """
+    Lắp ráp lần lượt với các giá trị k tăng dần. k nhỏ nối được các vùng có độ phủ thấp, k lớn tách được các đoạn lặp;
+    contig của mỗi vòng được đưa vào vòng sau như các read dài, nên vòng sau giữ được các vùng mà k lớn làm đứt.
+    Các read chỉ được đọc (và sửa lỗi, đếm k-mer) một lần ở vòng đầu, các vòng sau dùng lại các read đã nằm trong đồ thị
+    """
+
+    def __init__(self, filename: str, ks: List[int], error_correct: bool = False, threshold: int = 2, workers: int = 1, engine: str = "python",
+                 unitigs: bool = False, prefilter: bool = False, error_rate: float = 0.01, capacity: int = 0, canonical: bool = False,
+                 instrument: Optional[Instrumentation] = None, cache: Optional[SpectrumCache] = None, counting_memory: int = 0,
+                 normalize: int = 0, normalize_memory: int = NORMALIZE_MEMORY) -> None:
+        """
+
+        Args:
+            filename (str): File chứa các read
+            ks (List[int]): Các giá trị k theo thứ tự tăng dần
+            error_correct (bool, optional): Sửa lỗi các read ở vòng đầu. Defaults to False.
+            threshold (int, optional): Ngưỡng để một k-mer được gọi là "đặc" khi sửa lỗi. Defaults to 2.
+            workers (int, optional): Số tiến trình dùng để đếm k-mer. Defaults to 1.
+            engine (str, optional): Cách sửa lỗi, "python" hoặc "numpy". Defaults to "python".
+            unitigs (bool, optional): Gộp các đường không rẽ nhánh trước khi tạo superpath ở mỗi vòng. Defaults to False.
+            prefilter (bool, optional): Chỉ giữ các k-mer gặp ít nhất hai lần trong bảng tần số khi sửa lỗi. Defaults to False.
+            error_rate (float, optional): Xác suất sai của bộ lọc Bloom khi prefilter. Defaults to 0.01.
+            capacity (int, optional): Số k-mer khác nhau dự kiến của bộ lọc Bloom, 0 để tự tính. Defaults to 0.
+            canonical (bool, optional): Coi một k-mer và chuỗi bổ sung ngược của nó là một. Defaults to False.
+            instrument (Optional[Instrumentation], optional): Nơi ghi thời gian các bước và các bộ đếm, None để không đo. Defaults to None.
+            cache (Optional[SpectrumCache], optional): Cache bảng tần số khi sửa lỗi ở vòng đầu. Defaults to None.
+            counting_memory (int, optional): Giới hạn bộ nhớ (byte) để đếm k-mer ngoài bộ nhớ khi sửa lỗi ở vòng đầu. Defaults to 0.
+            normalize (int, optional): Độ phủ mục tiêu khi chuẩn hóa độ phủ các read ở vòng đầu, 0 để giữ mọi read. Defaults to 0.
+            normalize_memory (int, optional): Bộ nhớ (byte) của bảng đếm khi chuẩn hóa độ phủ. Defaults to NORMALIZE_MEMORY.
+        """
+
+        if not ks or any(k < 2 for k in ks):
+            raise ValueError("Cần ít nhất một giá trị k, mỗi giá trị từ 2 trở lên")
+        if any(a >= b for a, b in zip(ks, ks[1:])):
+            raise ValueError("Các giá trị k phải tăng dần và không trùng nhau: {}".format(ks))
+
+        self.filename: str = filename
+        self.ks: List[int] = list(ks)
+        self.error_correct: bool = error_correct
+        self.options: Dict[str, Any] = {
+            "threshold": threshold, "workers": workers, "engine": engine, "unitigs": unitigs,
+            "prefilter": prefilter, "error_rate": error_rate, "capacity": capacity, "canonical": canonical,
+        } # Các tham số chung của Assembler ở mọi vòng
+        self.cache: Optional[SpectrumCache] = cache
+        self.counting_memory: int = counting_memory
+        self.normalize: int = normalize
+        self.normalize_memory: int = normalize_memory
+        self.instrument: Instrumentation = instrument or Instrumentation() # Đo các bước, mặc định tắt
+        self.assembly: Optional[Assembler] = None # Assembler của vòng cuối, dùng để ghi contig
+        self.rounds: List[Dict[str, Any]] = [] # Số liệu của từng vòng: k, số read, số contig đưa vào, số lần gộp, thời gian
+
+
+    def run(self) -> int:
+        """Chạy lần lượt các vòng, đồ thị của vòng trước được bỏ đi trước khi tạo đồ thị của vòng sau
+
+        Returns:
+            int: Tổng số lần gộp cạnh khi tạo superpath qua các vòng
+        """
+
+        reads: List[str] = []
+        contigs: List[str] = []
+        merges: int = 0
+        for round, k in enumerate(self.ks):
+            start: float = time.perf_counter()
+            # Read và contig ngắn hơn k không có k-mer nào, k tăng dần nên read đã bỏ không cần giữ lại
+            reads = [read for read in reads if len(read) >= k]
+            pseudo_reads: List[str] = [contig for contig in contigs if len(contig) >= k]
+            # Bỏ đồ thị của vòng trước để hai đồ thị không cùng nằm trong bộ nhớ
+            self.assembly = None
+            with self.instrument.stage(name="multi_k_round"):
+                if round == 0:
+                    self.assembly = Assembler(filename=self.filename, k=k, error_correct=self.error_correct, instrument=self.instrument,
+                                              cache=self.cache, counting_memory=self.counting_memory, normalize=self.normalize,
+                                              normalize_memory=self.normalize_memory, **self.options)
+                    # Các read (đã chuẩn hóa độ phủ và sửa lỗi nếu có) được giữ trong đồ thị theo chiều ban đầu
+                    reads = [read.sequence for read in self.assembly.graph.read_list if len(read.sequence) >= k]
+                else:
+                    self.assembly = Assembler(filename=self.filename, k=k, instrument=self.instrument, reads=reads + pseudo_reads, **self.options)
+                round_merges: int = self.assembly.make_superpath()
+                if round < len(self.ks) - 1:
+                    contigs = [edge.sequence for edge in self.assembly.graph.edge_list if edge.length >= self.ks[round+1]]
+            merges += round_merges
+            self.rounds.append({"k": k, "reads": len(reads), "pseudo_reads": len(pseudo_reads), "merges": round_merges,
+                                "seconds": time.perf_counter() - start})
+
+        return merges
+
+
+    def find_eulerian_path(self) -> List[str]:
+        """
+
+        Returns:
+            List[str]: Các contig của vòng cuối
+        """
+
+        if self.assembly is None:
+            raise ValueError("Cần gọi run trước khi lấy contig")
+
+        return self.assembly.find_eulerian_path()
+
+
+    def write_contigs(self, handle: TextIO, width: int = LINE_WIDTH) -> int:
+        """Ghi các contig của vòng cuối thành FASTA
+
+        Args:
+            handle (TextIO): File (hoặc sys.stdout) để ghi
+            width (int, optional): Số ký tự trên mỗi dòng. Defaults to LINE_WIDTH.
+
+        Returns:
+            int: Số contig đã ghi
+        """
+
+        if self.assembly is None:
+            raise ValueError("Cần gọi run trước khi ghi contig")
+
+        return self.assembly.write_contigs(handle=handle, width=width)
@@ -0,0 +1,70 @@
+from statistics import median_low
+from typing import List, Iterable, Iterator
+
+import kmer
+from counting import read_kmers
+from sketch import CountMinSketch, COUNT_LIMIT
+
+
+NORMALIZE_K: int = 20 # Độ dài k-mer dùng để ước tính độ phủ của một read, không phụ thuộc vào k của đồ thị
+NORMALIZE_MEMORY: int = 16 << 20 # Bộ nhớ mặc định của bảng đếm (byte)
+
+
+class NormalizedReads(object):
+    """
+    Chuẩn hóa độ phủ (digital normalization) trên luồng read: một read bị bỏ nếu trung vị số lần đã gặp các k-mer của nó
+    (trong các read được giữ trước đó) đã đạt độ phủ mục tiêu, nếu không thì read được giữ và các k-mer của nó được đếm.
+    Số read còn lại tỉ lệ với kích thước bộ gen nhân với độ phủ mục tiêu thay vì với độ sâu giải trình tự.
+    Mỗi lần lặp bắt đầu lại với một bảng đếm rỗng nên luôn cho cùng các read, dùng được khi Graph cần đọc các read hai lần
+    """
+
+    def __init__(self, reads: Iterable[str], coverage: int, k: int = NORMALIZE_K, memory: int = NORMALIZE_MEMORY, canonical: bool = False) -> None:
+        """
+
+        Args:
+            reads (Iterable[str]): Các read (list hoặc ReadStream nếu cần lặp lại)
+            coverage (int): Độ phủ mục tiêu, nhỏ hơn COUNT_LIMIT của CountMinSketch
+            k (int, optional): Độ dài k-mer dùng để đếm, không quá 32. Defaults to NORMALIZE_K.
+            memory (int, optional): Bộ nhớ của bảng đếm (byte), bảng nhỏ làm số đếm bị ước tính cao và bỏ thêm read. Defaults to NORMALIZE_MEMORY.
+            canonical (bool, optional): Đếm theo dạng chuẩn của k-mer, để read trên hai mạch của cùng một vùng được tính chung. Defaults to False.
+        """
+
+        if not 0 < coverage < COUNT_LIMIT:
+            raise ValueError("Độ phủ mục tiêu phải nằm trong khoảng (0, {})".format(COUNT_LIMIT))
+        if not 0 < k <= 32:
+            raise ValueError("Độ dài k-mer khi chuẩn hóa độ phủ phải nằm trong khoảng [1, 32]")
+
+        self.reads: Iterable[str] = reads
+        self.coverage: int = coverage
+        self.k: int = k
+        self.memory: int = memory
+        self.canonical: bool = canonical
+        self.kept: int = 0 # Số read được giữ ở lần lặp gần nhất
+        self.dropped: int = 0 # Số read bị bỏ ở lần lặp gần nhất
+
+
+    def __iter__(self) -> Iterator[str]:
+        """
+
+        Returns:
+            Iterator[str]: Các read được giữ theo thứ tự, read có ký tự khác A/C/G/T hoặc ngắn hơn k luôn được giữ nguyên
+        """
+
+        sketch: CountMinSketch = CountMinSketch(memory=self.memory)
+        self.kept = 0
+        self.dropped = 0
+        for read in self.reads:
+            if len(read) < self.k or not kmer.is_valid(read):
+                self.kept += 1
+                yield read
+                continue
+
+            codes: List[int] = kmer.encode_all(sequences=read_kmers(read=read, k=self.k, canonical=self.canonical))
+            if median_low([sketch.count(code=code) for code in codes]) >= self.coverage:
+                self.dropped += 1
+                continue
+
+            for code in codes:
+                sketch.add(code=code)
+            self.kept += 1
+            yield read
@@ -0,0 +1,290 @@
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Dict, Union, Iterable, Iterator, Optional
+
+import kmer
+
+
+OFFSET_TYPE: str = "q" # Kiểu của các offset, 8 byte nên vùng nhớ chung chỉ cần đặt các offset lên trước để luôn thẳng hàng
+
+
+class ReadStore(object):
+    """
+    Kho chứa các read A/C/G/T trong một vùng nhớ liền: mã 2 bit của mỗi base (một byte) của mọi read được nối liền nhau,
+    read thứ n nằm ở bases[offsets[n]:offsets[n+1]]. Không tạo một object str cho mỗi read, chuỗi chỉ được giải mã khi cần,
+    các k-mer được lấy ra dưới dạng memoryview mà không chép dữ liệu.
+    Một kho có thể được chia sẻ (chỉ đọc) cho các tiến trình khác qua multiprocessing.shared_memory, khi được gửi tới
+    một tiến trình (pickle) chỉ có tên vùng nhớ và vị trí các read được gửi đi
+    """
+
+    def __init__(self, bases: Optional[array] = None, offsets: Optional[array] = None) -> None:
+        """
+
+        Args:
+            bases (Optional[array], optional): Các mã 2 bit kiểu "B" đã có (ví dụ đọc từ snapshot), None để tạo kho rỗng. Defaults to None.
+            offsets (Optional[array], optional): Các offset kiểu OFFSET_TYPE tương ứng với bases, bắt đầu bằng 0. Defaults to None.
+        """
+
+        # Thứ tự các thuộc tính quan trọng: các memoryview vào vùng nhớ chung phải được giải phóng trước khi đóng vùng nhớ
+        self.bases: Union[array, memoryview] = bases if bases is not None else array("B") # Mã 2 bit của các base, mỗi base một byte
+        self.offsets: Union[array, memoryview] = offsets if offsets is not None else array(OFFSET_TYPE, [0]) # Vị trí bắt đầu của từng read và vị trí kết thúc
+        self.frozen: bool = False # Kho chỉ đọc (đã chia sẻ hoặc là một đoạn của kho khác), không thêm được read
+        self.shared: Optional[shared_memory.SharedMemory] = None # Vùng nhớ chung chứa kho nếu kho đã được chia sẻ
+        self.owner: bool = False # Tiến trình đã tạo vùng nhớ chung, có trách nhiệm xóa nó
+        self.layout: Dict[str, int] = {} # Tên vùng nhớ chung, số read, số base của cả kho và vị trí read đầu tiên của đoạn này
+
+
+    @staticmethod
+    def from_reads(reads: Iterable[str]) -> "ReadStore":
+        """
+
+        Args:
+            reads (Iterable[str]): Các read A/C/G/T
+
+        Returns:
+            ReadStore: Kho chứa các read theo thứ tự
+        """
+
+        store: ReadStore = ReadStore()
+        store.extend(reads=reads)
+
+        return store
+
+
+    def append(self, read: str) -> None:
+        """Thêm một read vào cuối kho
+
+        Args:
+            read (str): Read chỉ gồm các ký tự A, C, G, T (có thể rỗng)
+        """
+
+        if self.frozen:
+            raise ValueError("Không thể thêm read vào một kho chỉ đọc")
+
+        self.bases.frombytes(kmer.encode_bases(read))
+        self.offsets.append(len(self.bases))
+
+
+    def extend(self, reads: Iterable[str]) -> None:
+        """Thêm lần lượt các read vào cuối kho
+
+        Args:
+            reads (Iterable[str]): Các read A/C/G/T
+        """
+
+        for read in reads:
+            self.append(read=read)
+
+
+    def __len__(self) -> int:
+        """
+
+        Returns:
+            int: Số read trong kho
+        """
+
+        return len(self.offsets) - 1
+
+
+    def __getitem__(self, n: Union[int, slice]) -> Union[str, "ReadStore"]:
+        """Giải mã read thứ n, hoặc lấy một đoạn liên tiếp các read (bước 1) dưới dạng một kho chỉ đọc dùng chung dữ liệu
+
+        Args:
+            n (Union[int, slice]): Vị trí của read hoặc đoạn cần lấy
+
+        Returns:
+            Union[str, ReadStore]: Chuỗi của read, hoặc kho chứa đoạn read
+        """
+
+        if isinstance(n, slice):
+            start, stop, step = n.indices(len(self))
+            if step != 1:
+                raise ValueError("Chỉ lấy được các đoạn read liên tiếp")
+
+            # Các offset vẫn chỉ vào cùng dãy bases, chỉ chép (hoặc cắt memoryview) các offset của đoạn
+            part: ReadStore = ReadStore(bases=self.bases, offsets=self.offsets[start:max(start, stop)+1])
+            part.frozen = True
+            if self.layout:
+                part.layout = dict(self.layout, first=self.layout["first"] + start)
+
+            return part
+
+        return kmer.decode_bases(self.view(n=n))
+
+
+    def __iter__(self) -> Iterator[str]:
+        """
+
+        Returns:
+            Iterator[str]: Chuỗi của các read theo thứ tự
+        """
+
+        for n in range(len(self)):
+            yield kmer.decode_bases(self.view(n=n))
+
+
+    def view(self, n: int) -> memoryview:
+        """
+
+        Args:
+            n (int): Vị trí của read
+
+        Returns:
+            memoryview: Các mã 2 bit của read, không chép dữ liệu. Kho chưa chia sẻ không thêm được read khi còn memoryview chưa giải phóng
+        """
+
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError("Không có read ở vị trí {}".format(n))
+
+        return memoryview(self.bases)[self.offsets[n]:self.offsets[n+1]]
+
+
+    def window(self, n: int, start: int, k: int) -> memoryview:
+        """
+
+        Args:
+            n (int): Vị trí của read
+            start (int): Vị trí bắt đầu của k-mer trong read
+            k (int): Độ dài k-mer
+
+        Returns:
+            memoryview: Các mã 2 bit của k-mer, dùng kmer.encode_codes để lấy mã số nguyên hoặc kmer.decode_bases để lấy chuỗi
+        """
+
+        if start < 0 or start + k > self.offsets[n+1] - self.offsets[n]:
+            raise IndexError("k-mer tại vị trí {} nằm ngoài read {}".format(start, n))
+
+        return self.view(n=n)[start:start+k]
+
+
+    def kmers(self, n: int, k: int) -> Iterator[memoryview]:
+        """
+
+        Args:
+            n (int): Vị trí của read
+            k (int): Độ dài k-mer
+
+        Returns:
+            Iterator[memoryview]: Các k-mer của read theo thứ tự, mỗi k-mer là một memoryview vào kho
+        """
+
+        bases: memoryview = self.view(n=n)
+        for i in range(len(bases) - k + 1):
+            yield bases[i:i+k]
+
+
+    def chunks(self, size: int) -> Iterator["ReadStore"]:
+        """
+
+        Args:
+            size (int): Số read trong mỗi đoạn
+
+        Returns:
+            Iterator[ReadStore]: Các đoạn read liên tiếp, dùng chung dữ liệu với kho
+        """
+
+        for start in range(0, len(self), size):
+            yield self[start:start+size]
+
+
+    @property
+    def nbytes(self) -> int:
+        """
+
+        Returns:
+            int: Số byte của các base và các offset
+        """
+
+        return len(self.bases) + len(self.offsets) * array(OFFSET_TYPE).itemsize
+
+
+    def share(self) -> "ReadStore":
+        """Chép kho vào một vùng nhớ chung mới, các offset được đặt trước các base.
+        Tiến trình gọi share là chủ của vùng nhớ và phải gọi close của kho trả về để xóa vùng nhớ
+
+        Returns:
+            ReadStore: Kho chỉ đọc nằm trên vùng nhớ chung, gửi được cho các tiến trình khác
+        """
+
+        if self.layout:
+            raise ValueError("Kho đã nằm trên vùng nhớ chung")
+
+        offsets: array = array(OFFSET_TYPE, self.offsets)
+        offset_bytes: int = len(offsets) * offsets.itemsize
+        memory: shared_memory.SharedMemory = shared_memory.SharedMemory(create=True, size=max(offset_bytes + len(self.bases), 1))
+        memory.buf[:offset_bytes] = offsets.tobytes()
+        memory.buf[offset_bytes:offset_bytes+len(self.bases)] = memoryview(self.bases).cast("B")
+        memory.close()
+
+        store: ReadStore = ReadStore.attach(layout={"name": memory.name, "reads": len(offsets) - 1, "bases": len(self.bases), "first": 0, "count": len(offsets) - 1})
+        store.owner = True
+
+        return store
+
+
+    @staticmethod
+    def attach(layout: Dict[str, int]) -> "ReadStore":
+        """Mở một kho (hoặc một đoạn của kho) đã nằm trên vùng nhớ chung
+
+        Args:
+            layout (Dict[str, int]): Tên vùng nhớ, số read và số base của cả kho, vị trí read đầu tiên và số read của đoạn
+
+        Returns:
+            ReadStore: Kho chỉ đọc, các base và offset là memoryview vào vùng nhớ chung
+        """
+
+        memory: shared_memory.SharedMemory = shared_memory.SharedMemory(name=layout["name"])
+        offset_bytes: int = (layout["reads"] + 1) * array(OFFSET_TYPE).itemsize
+        offsets: memoryview = memory.buf[:offset_bytes].cast(OFFSET_TYPE)[layout["first"]:layout["first"]+layout["count"]+1]
+        store: ReadStore = ReadStore(bases=memory.buf[offset_bytes:offset_bytes+layout["bases"]].toreadonly(), offsets=offsets)
+        store.frozen = True
+        store.shared = memory
+        store.layout = dict(layout)
+
+        return store
+
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Kho trên vùng nhớ chung chỉ gửi đi vị trí của nó, kho khác được gửi đi toàn bộ dữ liệu
+
+        Returns:
+            Dict[str, Any]: Trạng thái được pickle
+        """
+
+        if self.layout:
+            return {"layout": dict(self.layout, count=len(self))}
+
+        return {"bases": array("B", self.bases), "offsets": array(OFFSET_TYPE, self.offsets), "frozen": self.frozen}
+
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+
+        Args:
+            state (Dict[str, Any]): Trạng thái đã được tạo bởi __getstate__
+        """
+
+        if "layout" in state:
+            self.__dict__.update(ReadStore.attach(layout=state["layout"]).__dict__)
+            return
+
+        self.__init__(bases=state["bases"], offsets=state["offsets"])
+        self.frozen = state["frozen"]
+
+
+    def close(self) -> None:
+        """Giải phóng vùng nhớ chung (nếu có), chủ của vùng nhớ xóa nó. Các đoạn lấy từ kho không còn dùng được sau đó"""
+
+        if self.shared is None:
+            return
+
+        memory: shared_memory.SharedMemory = self.shared
+        self.shared = None
+        for view in (self.bases, self.offsets):
+            view.release()
+        self.bases, self.offsets = array("B"), array(OFFSET_TYPE, [0])
+        memory.close()
+        if self.owner:
+            memory.unlink()
@@ -0,0 +1,254 @@
+import math
+import hashlib
+from typing import List, Iterator
+
+
+MASK_64: int = (1 << 64) - 1 # Giữ lại 64 bit thấp
+MIX_64: int = 0x9E3779B97F4A7C15 # Hệ số nhân Fibonacci để trộn các bit của mã k-mer
+COUNT_LIMIT: int = 255 # Số đếm lớn nhất của một ô trong CountMinSketch (mỗi ô một byte)
+
+
+class BloomFilter(object):
+    """
+    Bộ lọc Bloom cho các k-mer: cho biết một k-mer chắc chắn chưa gặp, hoặc có thể đã gặp với xác suất sai error_rate.
+    Các bit được lưu trong một bytearray, vị trí các bit của một k-mer được tính bằng băm kép từ một giá trị blake2b
+    nên cho cùng kết quả trên mọi tiến trình
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        """
+
+        Args:
+            capacity (int): Số phần tử dự kiến
+            error_rate (float, optional): Xác suất sai khi đã thêm capacity phần tử. Defaults to 0.01.
+        """
+
+        if not 0 < error_rate < 1:
+            raise ValueError("Xác suất sai của bộ lọc Bloom phải nằm trong khoảng (0, 1)")
+
+        capacity = max(capacity, 1)
+        self.capacity: int = capacity
+        self.error_rate: float = error_rate
+        # Số bit và số hàm băm tối ưu cho capacity phần tử
+        self.size: int = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes: int = max(1, round(self.size / capacity * math.log(2)))
+        self.bits: bytearray = bytearray((self.size + 7) // 8)
+        self.added: int = 0 # Số lần thêm một phần tử chắc chắn chưa có
+
+
+    def positions(self, k_mer: str) -> Iterator[int]:
+        """Vị trí các bit của một k-mer
+
+        Args:
+            k_mer (str): k-mer
+
+        Returns:
+            Iterator[int]: self.hashes vị trí bit, được tính lần lượt để có thể dừng sớm
+        """
+
+        value: int = int.from_bytes(hashlib.blake2b(k_mer.encode("ascii"), digest_size=16).digest(), "little")
+        position: int = value & MASK_64
+        step: int = (value >> 64) | 1
+        for _ in range(self.hashes):
+            yield position % self.size
+            position += step
+
+
+    def add(self, k_mer: str) -> bool:
+        """Thêm một k-mer vào bộ lọc
+
+        Args:
+            k_mer (str): k-mer
+
+        Returns:
+            bool: True nếu k-mer có thể đã có trong bộ lọc từ trước, False nếu chắc chắn chưa có
+        """
+
+        seen: bool = True
+        bits: bytearray = self.bits
+        for position in self.positions(k_mer=k_mer):
+            mask: int = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                seen = False
+                bits[position >> 3] |= mask
+        if not seen:
+            self.added += 1
+
+        return seen
+
+
+    def __contains__(self, k_mer: str) -> bool:
+        """
+
+        Args:
+            k_mer (str): k-mer
+
+        Returns:
+            bool: True nếu k-mer có thể đã được thêm, False nếu chắc chắn chưa được thêm
+        """
+
+        # Giống positions nhưng viết trực tiếp vì phép kiểm tra này được gọi rất nhiều lần khi sửa lỗi,
+        # phần lớn các k-mer chưa được thêm dừng ở một vài bit đầu tiên
+        value: int = int.from_bytes(hashlib.blake2b(k_mer.encode("ascii"), digest_size=16).digest(), "little")
+        position: int = value & MASK_64
+        step: int = (value >> 64) | 1
+        bits: bytearray = self.bits
+        size: int = self.size
+        for _ in range(self.hashes):
+            bit: int = position % size
+            if not bits[bit >> 3] & (1 << (bit & 7)):
+                return False
+            position += step
+
+        return True
+
+
+    def update(self, other: "BloomFilter") -> None:
+        """Gộp một bộ lọc cùng kích thước vào bộ lọc hiện tại (phép OR trên các bit)
+
+        Args:
+            other (BloomFilter): Bộ lọc có cùng size và hashes
+        """
+
+        if other.size != self.size or other.hashes != self.hashes:
+            raise ValueError("Chỉ gộp được hai bộ lọc Bloom có cùng kích thước và số hàm băm")
+
+        merged: int = int.from_bytes(self.bits, "little") | int.from_bytes(other.bits, "little")
+        self.bits = bytearray(merged.to_bytes(len(self.bits), "little"))
+
+
+    @property
+    def nbytes(self) -> int:
+        """
+
+        Returns:
+            int: Số byte của các bit
+        """
+
+        return len(self.bits)
+
+
+class CountMinSketch(object):
+    """
+    Bảng đếm xấp xỉ với bộ nhớ cố định cho mã 2 bit của các k-mer: depth hàng, mỗi hàng width ô một byte.
+    Số đếm của một k-mer là giá trị nhỏ nhất trong các ô của nó nên không bao giờ nhỏ hơn số đếm thật,
+    mỗi ô dừng ở COUNT_LIMIT vì chỉ cần so sánh với các ngưỡng nhỏ. Vị trí được tính bằng băm nhân trên mã,
+    không phụ thuộc vào tiến trình hay PYTHONHASHSEED
+    """
+
+    def __init__(self, memory: int, depth: int = 4) -> None:
+        """
+
+        Args:
+            memory (int): Số byte của bảng
+            depth (int, optional): Số hàng (số hàm băm). Defaults to 4.
+        """
+
+        if depth < 1:
+            raise ValueError("CountMinSketch cần ít nhất một hàng")
+
+        self.depth: int = depth
+        self.width: int = max(memory // depth, 1)
+        self.cells: bytearray = bytearray(self.width * depth)
+
+
+    def positions(self, code: int) -> List[int]:
+        """
+
+        Args:
+            code (int): Mã 2 bit của k-mer
+
+        Returns:
+            List[int]: Vị trí ô của k-mer trong từng hàng
+        """
+
+        value: int = (code * MIX_64) & MASK_64
+        step: int = (value >> 32) | 1
+        width: int = self.width
+
+        return [row * width + (value + row * step) % width for row in range(self.depth)]
+
+
+    def count(self, code: int) -> int:
+        """
+
+        Args:
+            code (int): Mã 2 bit của k-mer
+
+        Returns:
+            int: Số đếm xấp xỉ (không nhỏ hơn số đếm thật, tối đa COUNT_LIMIT)
+        """
+
+        cells: bytearray = self.cells
+
+        return min([cells[position] for position in self.positions(code=code)])
+
+
+    def add(self, code: int) -> None:
+        """Tăng số đếm của một k-mer, các ô đã đạt COUNT_LIMIT được giữ nguyên
+
+        Args:
+            code (int): Mã 2 bit của k-mer
+        """
+
+        cells: bytearray = self.cells
+        for position in self.positions(code=code):
+            if cells[position] < COUNT_LIMIT:
+                cells[position] += 1
+
+
+    @property
+    def nbytes(self) -> int:
+        """
+
+        Returns:
+            int: Số byte của các ô
+        """
+
+        return len(self.cells)
+
+
+class SolidTable(dict):
+    """
+    Bảng tần số chỉ chứa các k-mer gặp ít nhất hai lần. Các k-mer chỉ gặp một lần nằm trong bộ lọc Bloom
+    và được coi là có số lần xuất hiện bằng 1, nên phần sửa lỗi vẫn dùng bảng như một Dict[str, int] bình thường
+    """
+
+    def __init__(self, singletons: BloomFilter) -> None:
+        """Bảng được tạo rỗng, các k-mer gặp ít nhất hai lần được thêm vào như một dict
+
+        Args:
+            singletons (BloomFilter): Bộ lọc chứa (ít nhất) các k-mer chỉ gặp một lần
+        """
+
+        super().__init__()
+        self.singletons: BloomFilter = singletons
+
+
+    def __missing__(self, k_mer: str) -> int:
+        """
+
+        Args:
+            k_mer (str): k-mer không có trong bảng
+
+        Returns:
+            int: 1 nếu k-mer nằm trong bộ lọc
+        """
+
+        if k_mer in self.singletons:
+            return 1
+
+        raise KeyError(k_mer)
+
+
+    def __contains__(self, k_mer: object) -> bool:
+        """
+
+        Args:
+            k_mer (object): k-mer
+
+        Returns:
+            bool: True nếu k-mer có trong bảng hoặc trong bộ lọc
+        """
+
+        return dict.__contains__(self, k_mer) or (isinstance(k_mer, str) and k_mer in self.singletons)
@@ -0,0 +1,265 @@
+import os
+import sys
+import json
+import mmap
+import struct
+from array import array
+from typing import Any, List, Dict, Tuple, Optional
+
+import kmer
+from graph import Graph, Read
+from readstore import ReadStore
+from store import GraphStore, CODE_LIMIT, ID_TYPE
+
+
+MAGIC: bytes = b"DBGSNAP1" # 8 byte đầu của file snapshot, số cuối là phiên bản định dạng
+ALIGN: int = 8 # Mỗi cột bắt đầu ở một offset chia hết cho ALIGN
+
+# Các cột của GraphStore được ghi nguyên dạng. Danh sách kề và chỉ mục ngược được dựng lại (compact) trước khi ghi
+# nên các bảng phụ luôn rỗng và không cần lưu
+STORE_COLUMNS: List[str] = [
+    "vertex_codes", "vertex_live", "in_degrees", "out_degrees",
+    "sources", "targets", "edge_codes", "lengths", "visited", "edge_live", "attached", "counts",
+    "out_offsets", "out_items", "in_offsets", "in_items", "cursors",
+    "occurrence_offsets", "occurrence_reads", "occurrence_positions",
+]
+
+
+def pad(size: int) -> int:
+    """
+
+    Args:
+        size (int): Số byte
+
+    Returns:
+        int: Số byte cần thêm để size chia hết cho ALIGN
+    """
+
+    return -size % ALIGN
+
+
+def write_snapshot(filename: str, header: Dict[str, Any], columns: Dict[str, array]) -> None:
+    """Ghi một file snapshot: MAGIC, độ dài phần đầu (8 byte), phần đầu JSON rồi tới dữ liệu thô của từng cột.
+    File được ghi ra file tạm (riêng cho mỗi tiến trình) rồi mới đổi tên, một lần ghi bị ngắt giữa chừng không làm hỏng snapshot trước đó
+
+    Args:
+        filename (str): File để ghi
+        header (Dict[str, Any]): Các thông tin ghi được bằng JSON
+        columns (Dict[str, array]): Các cột theo tên
+    """
+
+    layout: List[Dict[str, Any]] = []
+    offset: int = 0
+    for name, column in columns.items():
+        layout.append({"name": name, "typecode": column.typecode, "itemsize": column.itemsize, "offset": offset, "length": len(column)})
+        offset += len(column) * column.itemsize + pad(len(column) * column.itemsize)
+    encoded: bytes = json.dumps(dict(header, byteorder=sys.byteorder, columns=layout)).encode("utf-8")
+
+    temporary: str = "{}.{}.part".format(filename, os.getpid())
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        f.write(bytes(pad(len(MAGIC) + 8 + len(encoded))))
+        for column in columns.values():
+            column.tofile(f)
+            f.write(bytes(pad(len(column) * column.itemsize)))
+    os.replace(temporary, filename)
+
+
+def read_snapshot(filename: str) -> Tuple[Dict[str, Any], Dict[str, array]]:
+    """Đọc một file snapshot. File được ánh xạ vào bộ nhớ (mmap), mỗi cột được chép một lần thẳng từ trang của file
+
+    Args:
+        filename (str): File snapshot
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, array]]: Phần đầu và các cột theo tên
+    """
+
+    with open(filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError("File {} không phải là snapshot đồ thị".format(filename))
+
+        length: int = struct.unpack("<Q", mapped[len(MAGIC):len(MAGIC)+8])[0]
+        header: Dict[str, Any] = json.loads(mapped[len(MAGIC)+8:len(MAGIC)+8+length].decode("utf-8"))
+        base: int = len(MAGIC) + 8 + length + pad(len(MAGIC) + 8 + length)
+
+        columns: Dict[str, array] = {}
+        with memoryview(mapped) as view:
+            for entry in header["columns"]:
+                column: array = array(entry["typecode"])
+                if column.itemsize != entry["itemsize"]:
+                    raise ValueError("Cột {} được ghi trên máy có kích thước kiểu {} khác".format(entry["name"], entry["typecode"]))
+                start: int = base + entry["offset"]
+                column.frombytes(view[start:start+entry["length"]*column.itemsize])
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                columns[entry["name"]] = column
+
+    return header, columns
+
+
+def pack_codes(columns: Dict[str, array], name: str, pairs: List[Tuple[int, int]]) -> None:
+    """Thêm các cặp (id, mã) có mã không vừa 64 bit vào các cột: id, offset và các byte của mã.
+    Mã của một cạnh đã gộp có thể dài hàng trăm nghìn chữ số nên không ghi được vào JSON
+
+    Args:
+        columns (Dict[str, array]): Các cột của snapshot
+        name (str): Tiền tố tên các cột
+        pairs (List[Tuple[int, int]]): Các cặp (id, mã)
+    """
+
+    ids: array = array(ID_TYPE)
+    offsets: array = array("q", [0])
+    data: array = array("B")
+    for id, code in pairs:
+        ids.append(id)
+        data.frombytes(code.to_bytes((code.bit_length() + 7) // 8, "little"))
+        offsets.append(len(data))
+    columns[name + "_ids"] = ids
+    columns[name + "_offsets"] = offsets
+    columns[name + "_bytes"] = data
+
+
+def unpack_codes(columns: Dict[str, array], name: str) -> List[Tuple[int, int]]:
+    """
+
+    Args:
+        columns (Dict[str, array]): Các cột của snapshot
+        name (str): Tiền tố tên các cột đã ghi bởi pack_codes
+
+    Returns:
+        List[Tuple[int, int]]: Các cặp (id, mã)
+    """
+
+    offsets: array = columns[name + "_offsets"]
+    data: bytes = columns[name + "_bytes"].tobytes()
+
+    return [(id, int.from_bytes(data[offsets[i]:offsets[i+1]], "little")) for i, id in enumerate(columns[name + "_ids"])]
+
+
+def split_codes(columns: Dict[str, array], name: str, table: Dict[int, int]) -> None:
+    """Ghi một bảng chỉ mục mã -> id thành hai cột cho các mã vừa 64 bit, các mã còn lại được ghi bằng pack_codes
+
+    Args:
+        columns (Dict[str, array]): Các cột của snapshot
+        name (str): Tiền tố tên các cột
+        table (Dict[int, int]): Bảng chỉ mục
+    """
+
+    codes: array = array("Q")
+    ids: array = array(ID_TYPE)
+    long_codes: List[Tuple[int, int]] = []
+    for code, id in table.items():
+        if code < CODE_LIMIT:
+            codes.append(code)
+            ids.append(id)
+        else:
+            long_codes.append((id, code))
+    columns[name + "_codes"] = codes
+    columns[name + "_ids"] = ids
+    pack_codes(columns=columns, name=name + "_long", pairs=long_codes)
+
+
+def save_graph(graph: Graph, filename: str, state: Optional[Dict[str, Any]] = None, queue: Optional[List[Tuple[int, int]]] = None) -> None:
+    """Ghi đồ thị ra một file snapshot. Danh sách kề và chỉ mục ngược được dựng lại trước khi ghi (không đổi kết quả duyệt)
+
+    Args:
+        graph (Graph): Đồ thị
+        filename (str): File để ghi
+        state (Optional[Dict[str, Any]], optional): Các thông tin khác (của Assembler, SuperpathEngine) ghi được bằng JSON. Defaults to None.
+        queue (Optional[List[Tuple[int, int]]], optional): Hàng đợi các khóa (read_id, vị trí) của superpath đang chạy. Defaults to None.
+    """
+
+    store: GraphStore = graph.store
+    store.compact(paths=[read.edge_ids for read in graph.read_list])
+
+    columns: Dict[str, array] = {name: getattr(store, name) for name in STORE_COLUMNS}
+    pack_codes(columns=columns, name="long_vertex_codes", pairs=list(store.long_vertex_codes.items()))
+    pack_codes(columns=columns, name="long_edge_codes", pairs=list(store.long_edge_codes.items()))
+    split_codes(columns=columns, name="vertex_dict", table=graph.vertex_dict)
+    split_codes(columns=columns, name="edge_dict", table=graph.edge_dict)
+
+    # Đường đi của các read được nối liền dạng CSR, chuỗi của các read là các base của graph.reads dạng ký tự
+    columns["read_offsets"] = array("q", [0])
+    columns["read_edges"] = array(ID_TYPE)
+    columns["read_next"] = array(ID_TYPE)
+    columns["read_prev"] = array(ID_TYPE)
+    columns["read_last"] = array(ID_TYPE)
+    columns["read_reverse"] = array("b")
+    columns["read_copies"] = array(ID_TYPE)
+    columns["sequences"] = array("B")
+    for read in graph.read_list:
+        columns["read_edges"].extend(read.edge_ids)
+        columns["read_next"].extend(read.next_positions)
+        columns["read_prev"].extend(read.prev_positions)
+        columns["read_offsets"].append(len(columns["read_edges"]))
+        columns["read_last"].append(read.last)
+        columns["read_reverse"].append(read.reverse)
+        columns["read_copies"].append(read.copies)
+    columns["sequence_offsets"] = array("q", graph.reads.offsets)
+    columns["sequences"].frombytes(kmer.decode_bases(graph.reads.bases).encode("ascii"))
+
+    if queue is not None:
+        columns["queue_reads"] = array(ID_TYPE, [read_id for read_id, _ in queue])
+        columns["queue_positions"] = array(ID_TYPE, [position for _, position in queue])
+
+    header: Dict[str, Any] = {
+        "graph": {
+            "k": graph.k, "threshold": graph.threshold, "workers": graph.workers, "engine": graph.engine, "prefilter": graph.prefilter,
+            "error_rate": graph.error_rate, "capacity": graph.capacity, "canonical": graph.canonical,
+        },
+        "state": state or {},
+    }
+    write_snapshot(filename=filename, header=header, columns=columns)
+
+
+def load_graph(filename: str, **options) -> Tuple[Graph, Dict[str, Any], Optional[List[Tuple[int, int]]]]:
+    """Đọc đồ thị từ một file snapshot
+
+    Args:
+        filename (str): File snapshot
+        **options: Các tham số khác của Graph (ví dụ instrument)
+
+    Returns:
+        Tuple[Graph, Dict[str, Any], Optional[List[Tuple[int, int]]]]: Đồ thị, các thông tin khác đã ghi cùng đồ thị
+            và hàng đợi của superpath (None nếu snapshot không được ghi khi đang tạo superpath)
+    """
+
+    header, columns = read_snapshot(filename=filename)
+
+    # Đồ thị rỗng với cùng các tham số, sau đó thay các cột bằng các cột đã đọc
+    graph: Graph = Graph(seqs=[], **header["graph"], **options)
+    store: GraphStore = graph.store
+    for name in STORE_COLUMNS:
+        setattr(store, name, columns[name])
+    store.long_vertex_codes = dict(unpack_codes(columns=columns, name="long_vertex_codes"))
+    store.long_edge_codes = dict(unpack_codes(columns=columns, name="long_edge_codes"))
+    store.compacted = True
+    store.indexed = True
+
+    graph.vertex_dict = dict(zip(columns["vertex_dict_codes"], columns["vertex_dict_ids"]))
+    graph.vertex_dict.update({code: vertex for vertex, code in unpack_codes(columns=columns, name="vertex_dict_long")})
+    graph.edge_dict = dict(zip(columns["edge_dict_codes"], columns["edge_dict_ids"]))
+    graph.edge_dict.update({code: edge for edge, code in unpack_codes(columns=columns, name="edge_dict_long")})
+
+    offsets: array = columns["read_offsets"]
+    graph.reads = ReadStore(bases=array("B", kmer.encode_bases(columns["sequences"].tobytes().decode("ascii"))), offsets=columns["sequence_offsets"])
+    for read_id in range(len(offsets) - 1):
+        read: Read = Read(graph=graph, read_id=read_id, reverse=bool(columns["read_reverse"][read_id]))
+        start, end = offsets[read_id], offsets[read_id+1]
+        read.edge_ids = columns["read_edges"][start:end]
+        read.next_positions = columns["read_next"][start:end]
+        read.prev_positions = columns["read_prev"][start:end]
+        read.last = columns["read_last"][read_id]
+        # Snapshot ghi trước khi có số bản sao coi mỗi read là một read riêng
+        read.copies = columns["read_copies"][read_id] if "read_copies" in columns else 1
+        graph.duplicates += read.copies - 1
+        graph.read_list.append(read)
+
+    queue: Optional[List[Tuple[int, int]]] = None
+    if "queue_reads" in columns:
+        queue = list(zip(columns["queue_reads"], columns["queue_positions"]))
+
+    return graph, header["state"], queue
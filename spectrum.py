@@ -0,0 +1,383 @@
+import os
+import json
+import struct
+import hashlib
+from array import array
+from collections import Counter
+from typing import Any, List, Dict, Tuple, Iterable, Optional
+
+import kmer
+from sketch import BloomFilter, SolidTable
+from counting import CountingReport, table_bytes
+from snapshot import write_snapshot, read_snapshot
+
+
+CACHE_DIRECTORY: str = os.path.join(os.path.expanduser("~"), ".cache", "kmer-spectra") # Thư mục cache mặc định
+CACHE_SIZE: int = 1 << 30 # Tổng kích thước mặc định của các file trong cache (byte)
+CACHE_MAX_K: int = 32 # Mã của k-mer dài hơn không vừa một số 64 bit nên không được lưu vào cache
+CACHE_SUFFIX: str = ".kmers" # Đuôi của các file trong cache
+CACHE_VERSION: int = 1 # Đổi khi cách đếm hoặc định dạng file thay đổi, các file cũ sẽ không còn được dùng
+CHECKSUM_BLOCK: int = 1 << 20 # Kích thước khối đọc khi tính checksum của file read
+CANDIDATE_KS: List[int] = [21, 25, 31, 41, 51, 61] # Các giá trị k được xét khi chọn k tự động
+SAMPLE_PREFIX: str = "ACAGT" # Khi phân tích phổ, chỉ các k-mer bắt đầu bằng sample ký tự đầu của chuỗi này được đếm
+SAMPLE_LENGTH: int = 2 # Độ dài tiền tố lấy mẫu mặc định, mỗi ký tự giảm số k-mer được đếm 4 lần
+MIN_COVERAGE: int = 3 # Độ phủ k-mer (đỉnh của phổ) tối thiểu để một giá trị k được chọn
+
+
+def file_checksum(filename: str) -> str:
+    """Checksum của nội dung một file, không phụ thuộc vào tên và thời gian sửa đổi
+
+    Args:
+        filename (str): File chứa các read
+
+    Returns:
+        str: SHA-256 dạng hex
+    """
+
+    digest: Any = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+class SpectrumCache(object):
+    """
+    Cache trên đĩa của các bảng tần số k-mer dùng khi sửa lỗi, được đánh chỉ mục bởi checksum của file read,
+    k và các tham số đếm. Mỗi bảng là một file snapshot gồm mã 2 bit của các k-mer đã sắp xếp và số đếm tương ứng
+    (cùng các bit của bộ lọc Bloom nếu đếm có prefilter), được đọc lại bằng mmap.
+    Khi tổng kích thước vượt quá max_bytes, các file lâu nhất chưa được dùng bị xóa (LRU theo thời gian sửa đổi)
+    """
+
+    def __init__(self, directory: str = CACHE_DIRECTORY, max_bytes: int = CACHE_SIZE) -> None:
+        """
+
+        Args:
+            directory (str, optional): Thư mục chứa cache, được tạo nếu chưa có. Defaults to CACHE_DIRECTORY.
+            max_bytes (int, optional): Tổng kích thước tối đa của các file, 0 là không giới hạn. Defaults to CACHE_SIZE.
+        """
+
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0 # Số lần đọc được bảng từ cache
+        self.misses: int = 0 # Số lần không có bảng trong cache
+
+        os.makedirs(self.directory, exist_ok=True)
+
+
+    def key(self, checksum: str, k: int, canonical: bool, prefilter: bool, error_rate: float, capacity: int, workers: int) -> str:
+        """Khóa của một bảng tần số. Ngưỡng sửa lỗi không làm đổi bảng nên không nằm trong khóa;
+        số tiến trình chỉ có trong khóa khi đếm có prefilter vì cách tách các k-mer chỉ gặp một lần khác nhau
+
+        Args:
+            checksum (str): Checksum của file read
+            k (int): Độ dài một k-mer
+            canonical (bool): Đếm theo dạng chuẩn của k-mer
+            prefilter (bool): Lọc các k-mer chỉ gặp một lần bằng bộ lọc Bloom
+            error_rate (float): Xác suất sai của bộ lọc Bloom
+            capacity (int): Số k-mer khác nhau dự kiến của bộ lọc Bloom, 0 là tự tính
+            workers (int): Số tiến trình đếm k-mer
+
+        Returns:
+            str: Khóa dạng hex, cũng là tên file trong cache
+        """
+
+        params: Dict[str, Any] = {"version": CACHE_VERSION, "checksum": checksum, "k": k, "canonical": canonical, "prefilter": prefilter}
+        if prefilter:
+            params.update(error_rate=error_rate, capacity=capacity, parallel=workers > 1)
+
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+    def path(self, key: str) -> str:
+        """
+
+        Args:
+            key (str): Khóa của bảng
+
+        Returns:
+            str: File chứa bảng trong cache
+        """
+
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+
+    def load(self, key: str) -> Optional[Tuple[Dict[str, int], Optional[CountingReport]]]:
+        """Đọc một bảng tần số từ cache. File hỏng hoặc được ghi bởi phiên bản khác bị xóa và coi như không có
+
+        Args:
+            key (str): Khóa của bảng
+
+        Returns:
+            Optional[Tuple[Dict[str, int], Optional[CountingReport]]]: Bảng tần số (SolidTable nếu đếm có prefilter)
+                và kết quả lọc (None nếu không có prefilter), None nếu không có trong cache
+        """
+
+        filename: str = self.path(key=key)
+        try:
+            header, columns = read_snapshot(filename=filename)
+            if header.get("version") != CACHE_VERSION:
+                raise ValueError("File {} được ghi bởi phiên bản cache khác".format(filename))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, struct.error):
+            self.discard(filename=filename)
+            self.misses += 1
+            return None
+
+        k_mers: List[str] = kmer.decode_all(codes=columns["codes"], length=header["k"])
+        report: Optional[CountingReport] = None
+        if "bloom" in header:
+            bloom: Dict[str, Any] = header["bloom"]
+            singletons: BloomFilter = BloomFilter(capacity=bloom["capacity"], error_rate=bloom["error_rate"])
+            singletons.bits = bytearray(columns["bloom_bits"])
+            singletons.added = bloom["added"]
+            table: Dict[str, int] = SolidTable(singletons=singletons)
+            table.update(zip(k_mers, columns["counts"]))
+
+            report = CountingReport()
+            report.kmers = len(table)
+            report.singletons = header["singletons"]
+            report.table_bytes = table_bytes(table=table)
+            report.filter_bytes = singletons.nbytes
+        else:
+            table = dict(zip(k_mers, columns["counts"]))
+
+        # Đánh dấu file vừa được dùng
+        os.utime(filename)
+        self.hits += 1
+
+        return table, report
+
+
+    def store(self, key: str, k: int, table: Dict[str, int], report: Optional[CountingReport] = None) -> None:
+        """Ghi một bảng tần số vào cache rồi xóa bớt các file cũ nếu vượt quá kích thước cho phép.
+        Bảng phải được ghi trước khi sửa lỗi vì việc sửa lỗi thay đổi các số đếm
+
+        Args:
+            key (str): Khóa của bảng
+            k (int): Độ dài một k-mer
+            table (Dict[str, int]): Bảng tần số (SolidTable nếu đếm có prefilter)
+            report (Optional[CountingReport], optional): Kết quả lọc khi đếm có prefilter. Defaults to None.
+        """
+
+        if k > CACHE_MAX_K:
+            return
+
+        # Sắp xếp theo mã để file của cùng một bảng luôn giống nhau
+        entries: List[Tuple[int, int]] = sorted(zip(kmer.encode_all(sequences=table.keys()), table.values()))
+        columns: Dict[str, array] = {
+            "codes": array("Q", [code for code, _ in entries]),
+            "counts": array("I", [count for _, count in entries]),
+        }
+        header: Dict[str, Any] = {"version": CACHE_VERSION, "k": k}
+        if isinstance(table, SolidTable):
+            singletons: BloomFilter = table.singletons
+            columns["bloom_bits"] = array("B", singletons.bits)
+            header["bloom"] = {"capacity": singletons.capacity, "error_rate": singletons.error_rate, "added": singletons.added}
+            header["singletons"] = report.singletons if report is not None else 0
+
+        write_snapshot(filename=self.path(key=key), header=header, columns=columns)
+        self.evict(keep=key)
+
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Xóa các file lâu nhất chưa được dùng cho tới khi tổng kích thước không vượt quá max_bytes
+
+        Args:
+            keep (Optional[str], optional): Khóa của bảng không bị xóa (bảng vừa được ghi). Defaults to None.
+
+        Returns:
+            int: Số file đã xóa
+        """
+
+        if not self.max_bytes:
+            return 0
+
+        entries: List[Tuple[float, int, str]] = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(CACHE_SUFFIX):
+                continue
+            # Một tiến trình khác có thể vừa xóa file
+            try:
+                stat: os.stat_result = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total: int = sum(size for _, size, _ in entries)
+        removed: int = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and name == keep + CACHE_SUFFIX:
+                continue
+            self.discard(filename=os.path.join(self.directory, name))
+            total -= size
+            removed += 1
+
+        return removed
+
+
+    def discard(self, filename: str) -> None:
+        """Xóa một file trong cache, bỏ qua nếu file đã bị xóa
+
+        Args:
+            filename (str): File trong cache
+        """
+
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+
+class KmerSpectrum(object):
+    """
+    Phổ k-mer với một giá trị k: số k-mer khác nhau theo số lần xuất hiện, cùng các ước lượng rút ra từ phổ.
+    Phần đầu phổ (giảm dần từ số lần 1) là các k-mer lỗi, phần quanh đỉnh là các k-mer của bộ gen,
+    điểm thấp nhất giữa hai phần (valley) là ngưỡng để một k-mer được gọi là "đặc"
+    """
+
+    def __init__(self, k: int, histogram: Dict[int, int], scale: float) -> None:
+        """
+
+        Args:
+            k (int): Độ dài một k-mer
+            histogram (Dict[int, int]): Số k-mer khác nhau (đã lấy mẫu) theo số lần xuất hiện
+            scale (float): Hệ số để đổi số k-mer đã lấy mẫu ra số k-mer trên toàn bộ dữ liệu
+        """
+
+        self.k: int = k
+        self.histogram: Dict[int, int] = histogram
+        self.scale: float = scale
+
+        # Làm trơn bằng trung bình tối đa 3 điểm (từ số lần 1 trở lên) để một vài điểm nhiễu không bị coi là valley hay đỉnh
+        top: int = max(histogram, default=0)
+        counts: List[float] = [0.0] + [sum(histogram.get(c, 0) for c in range(max(n-1, 1), n+2)) / (n+2 - max(n-1, 1))
+                                       for n in range(1, top + 2)]
+
+        # Valley là điểm đầu tiên phổ ngừng giảm, đỉnh là điểm cao nhất sau valley
+        valley: int = 1
+        while valley < top and counts[valley+1] < counts[valley]:
+            valley += 1
+        self.valley: int = valley
+        self.peak: int = max(range(valley, top + 1), key=lambda n: (counts[n], -n), default=0)
+        self.threshold: int = max(2, valley) # Số lần xuất hiện tối thiểu của một k-mer "đặc"
+
+        solid: List[int] = [c for c in histogram if c >= self.threshold]
+        self.solid_kmers: int = round(sum(histogram[c] for c in solid) * scale) # Số k-mer "đặc" khác nhau
+        self.error_kmers: int = round(sum(histogram[c] for c in histogram if c < self.threshold) * scale) # Số k-mer lỗi khác nhau
+        # Tổng số lần xuất hiện của các k-mer "đặc" chia cho độ phủ k-mer, tính cả số bản sao của các đoạn lặp
+        self.genome_size: int = round(sum(c * histogram[c] for c in solid) * scale / self.peak) if self.peak else 0
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: Các ước lượng và phổ dạng dict để ghi ra JSON
+        """
+
+        return {"k": self.k, "valley": self.valley, "peak": self.peak, "threshold": self.threshold, "solid_kmers": self.solid_kmers,
+                "error_kmers": self.error_kmers, "genome_size": self.genome_size, "histogram": {str(c): n for c, n in sorted(self.histogram.items())}}
+
+
+class SpectrumAnalysis(object):
+    """
+    Phân tích phổ k-mer với nhiều giá trị k trong một lần đọc các read, để chọn k và ngưỡng sửa lỗi trước khi lắp ráp.
+    Chỉ các k-mer bắt đầu bằng một tiền tố cố định được đếm (tìm bằng str.find), phần còn lại của read không bị duyệt trong Python.
+    Số lần xuất hiện của mỗi k-mer được lấy mẫu vẫn chính xác nên hình dạng phổ không đổi, chỉ số k-mer bị chia cho 4 mũ độ dài tiền tố.
+    k được chọn là giá trị có nhiều k-mer "đặc" khác nhau nhất trong các k có độ phủ đủ lớn: k lớn hơn tách được thêm các đoạn lặp
+    cho tới khi độ phủ k-mer quá thấp để phân biệt k-mer đúng với k-mer lỗi
+    """
+
+    def __init__(self, reads: Iterable[str], ks: List[int] = CANDIDATE_KS, sample: int = SAMPLE_LENGTH, canonical: bool = False) -> None:
+        """Đọc các read một lần và tạo phổ k-mer của từng k
+
+        Args:
+            reads (Iterable[str]): Các read
+            ks (List[int], optional): Các giá trị k được xét. Defaults to CANDIDATE_KS.
+            sample (int, optional): Độ dài tiền tố lấy mẫu, 0 để đếm mọi k-mer. Defaults to SAMPLE_LENGTH.
+            canonical (bool, optional): Các read nằm trên cả hai mạch, mỗi vùng của bộ gen được lấy mẫu trên cả hai mạch
+                nên kích thước bộ gen và số k-mer được chia đôi. Defaults to False.
+        """
+
+        if not ks:
+            raise ValueError("Cần ít nhất một giá trị k để phân tích phổ k-mer")
+        if not 0 <= sample <= len(SAMPLE_PREFIX):
+            raise ValueError("Độ dài tiền tố lấy mẫu phải từ 0 tới {}".format(len(SAMPLE_PREFIX)))
+
+        prefix: str = SAMPLE_PREFIX[:sample]
+        counters: Dict[int, Counter] = {k: Counter() for k in ks}
+        self.reads: int = 0 # Số read hợp lệ đã đọc
+        self.bases: int = 0 # Tổng độ dài các read hợp lệ
+        for read in reads:
+            if not kmer.is_valid(read):
+                continue
+            self.reads += 1
+            self.bases += len(read)
+
+            # Vị trí các k-mer được lấy mẫu, tiền tố rỗng khớp với mọi vị trí
+            position: int = read.find(prefix)
+            while position != -1:
+                for k, counter in counters.items():
+                    if position + k <= len(read):
+                        counter[read[position:position+k]] += 1
+                position = read.find(prefix, position + 1)
+
+        scale: float = 4 ** sample / (2 if canonical else 1)
+        self.spectra: Dict[int, KmerSpectrum] = {k: KmerSpectrum(k=k, histogram=dict(Counter(counter.values())), scale=scale)
+                                                 for k, counter in counters.items()}
+
+
+    @property
+    def best(self) -> KmerSpectrum:
+        """
+
+        Returns:
+            KmerSpectrum: Phổ của k được chọn: nhiều k-mer "đặc" nhất trong các k có độ phủ ít nhất MIN_COVERAGE,
+                nếu không có k nào đủ độ phủ thì chọn k nhỏ nhất
+        """
+
+        spectra: List[KmerSpectrum] = [self.spectra[k] for k in sorted(self.spectra)]
+        covered: List[KmerSpectrum] = [spectrum for spectrum in spectra if spectrum.peak >= MIN_COVERAGE]
+        if not covered:
+            return spectra[0]
+
+        return max(covered, key=lambda spectrum: (spectrum.solid_kmers, -spectrum.k))
+
+
+    @property
+    def k(self) -> int:
+        """
+
+        Returns:
+            int: Giá trị k được chọn
+        """
+
+        return self.best.k
+
+
+    @property
+    def threshold(self) -> int:
+        """
+
+        Returns:
+            int: Ngưỡng sửa lỗi với k được chọn
+        """
+
+        return self.best.threshold
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: k và ngưỡng được chọn cùng phổ của từng k, dạng dict để ghi ra JSON
+        """
+
+        return {"k": self.k, "threshold": self.threshold, "reads": self.reads, "bases": self.bases,
+                "spectra": [self.spectra[k].to_dict() for k in sorted(self.spectra)]}
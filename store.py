@@ -0,0 +1,456 @@
+import sys
+from array import array
+from itertools import accumulate
+from typing import List, Dict, Tuple, Optional
+
+
+CODE_LIMIT: int = 1 << 64 # Mã từ giá trị này trở lên không vừa một phần tử array("Q")
+ID_TYPE: str = "i" # Kiểu phần tử của các cột chứa id (đỉnh, cạnh, read) và vị trí, đủ cho 2^31 - 1 phần tử
+
+
+def offsets_of(counts: array) -> array:
+    """Mảng offset của CSR từ số phần tử theo từng khóa
+
+    Args:
+        counts (array): Số phần tử của mỗi khóa
+
+    Returns:
+        array: len(counts) + 1 offset, phần tử của khóa i nằm từ offsets[i] tới offsets[i+1]
+    """
+
+    return array("q", accumulate(counts, initial=0))
+
+
+def items_size(offsets: array) -> int:
+    """
+
+    Args:
+        offsets (array): Mảng offset của CSR
+
+    Returns:
+        int: Số byte của mảng phần tử tương ứng
+    """
+
+    return array(ID_TYPE).itemsize * offsets[-1]
+
+
+class GraphStore(object):
+    """
+    Lưu các đỉnh, cạnh của đồ thị và chỉ mục ngược từ cạnh tới các read theo dạng cột (struct-of-arrays).
+    Mỗi đỉnh, cạnh là một id nguyên, là vị trí của nó trong các cột và không đổi trong suốt vòng đời của đồ thị.
+    Danh sách kề và chỉ mục ngược được lưu dạng CSR, các phần tử được thêm sau lần dựng CSR gần nhất
+    nằm trong bảng phụ cho tới lần dựng lại tiếp theo (compact)
+    """
+
+    def __init__(self) -> None:
+        # Các cột của đỉnh
+        self.vertex_codes: array = array("Q") # Mã 2 bit của chuỗi đánh dấu đỉnh
+        self.vertex_live: array = array("b") # 0 khi đỉnh đã bị loại khỏi đồ thị
+        self.in_degrees: array = array(ID_TYPE) # Số cạnh vào còn gắn với đỉnh
+        self.out_degrees: array = array(ID_TYPE) # Số cạnh ra còn gắn với đỉnh
+
+        # Các cột của cạnh
+        self.sources: array = array(ID_TYPE) # Id đỉnh vào
+        self.targets: array = array(ID_TYPE) # Id đỉnh ra
+        self.edge_codes: array = array("Q") # Mã 2 bit của chuỗi đại diện cho cạnh
+        self.lengths: array = array("q") # Độ dài chuỗi đại diện cho cạnh
+        self.visited: array = array("b")
+        self.edge_live: array = array("b") # 0 khi cạnh đã bị loại khỏi đồ thị
+        self.attached: array = array("b") # 0 khi cạnh đã được gỡ khỏi danh sách kề của hai đỉnh (sau khi gộp)
+        self.counts: array = array(ID_TYPE) # Số vị trí trên các read đang đi qua cạnh
+
+        # Mã không vừa 64 bit (cạnh đã gộp dài hơn 32 ký tự) được lưu riêng theo id
+        self.long_vertex_codes: Dict[int, int] = {}
+        self.long_edge_codes: Dict[int, int] = {}
+
+        # Danh sách kề CSR: các cạnh ra (vào) của đỉnh v là out_items[out_offsets[v]:out_offsets[v+1]]
+        self.compacted: bool = False # False khi CSR chưa được dựng lần nào
+        self.out_offsets: array = array("q", [0])
+        self.out_items: array = array(ID_TYPE)
+        self.in_offsets: array = array("q", [0])
+        self.in_items: array = array(ID_TYPE)
+        self.out_extra: Dict[int, List[int]] = {}
+        self.in_extra: Dict[int, List[int]] = {}
+        # Con trỏ tới cạnh ra đầu tiên có thể chưa được đi qua của mỗi đỉnh trong out_items, chỉ tiến về phía trước
+        self.cursors: array = array("q")
+
+        # Chỉ mục ngược CSR: các cặp (read_id, vị trí) của cạnh e nằm trong occurrence_reads, occurrence_positions
+        # từ occurrence_offsets[e] tới occurrence_offsets[e+1]. Các cặp không còn đúng được lọc khi đọc
+        self.indexed: bool = False # False khi chỉ mục ngược chưa được dựng lần nào
+        self.occurrence_offsets: array = array("q", [0])
+        self.occurrence_reads: array = array(ID_TYPE)
+        self.occurrence_positions: array = array(ID_TYPE)
+        self.occurrence_extra: Dict[int, List[Tuple[int, int]]] = {}
+
+
+    @property
+    def vertex_count(self) -> int:
+        """
+
+        Returns:
+            int: Số đỉnh đã tạo, kể cả các đỉnh đã bị loại
+        """
+
+        return len(self.vertex_codes)
+
+
+    @property
+    def edge_count(self) -> int:
+        """
+
+        Returns:
+            int: Số cạnh đã tạo, kể cả các cạnh đã bị loại
+        """
+
+        return len(self.edge_codes)
+
+
+    def add_vertex(self, code: int) -> int:
+        """Thêm một đỉnh
+
+        Args:
+            code (int): Mã 2 bit của chuỗi đánh dấu đỉnh
+
+        Returns:
+            int: Id của đỉnh mới
+        """
+
+        vertex: int = len(self.vertex_codes)
+        if code < CODE_LIMIT:
+            self.vertex_codes.append(code)
+        else:
+            self.vertex_codes.append(0)
+            self.long_vertex_codes[vertex] = code
+        self.vertex_live.append(1)
+        self.in_degrees.append(0)
+        self.out_degrees.append(0)
+
+        return vertex
+
+
+    def add_edge(self, source: int, target: int, code: int, length: int) -> int:
+        """Thêm một cạnh và gắn nó vào cuối danh sách kề của hai đỉnh
+
+        Args:
+            source (int): Id đỉnh vào
+            target (int): Id đỉnh ra
+            code (int): Mã 2 bit của chuỗi đại diện cho cạnh
+            length (int): Độ dài chuỗi đại diện cho cạnh
+
+        Returns:
+            int: Id của cạnh mới
+        """
+
+        edge: int = len(self.edge_codes)
+        if code < CODE_LIMIT:
+            self.edge_codes.append(code)
+        else:
+            self.edge_codes.append(0)
+            self.long_edge_codes[edge] = code
+        self.sources.append(source)
+        self.targets.append(target)
+        self.lengths.append(length)
+        self.visited.append(0)
+        self.edge_live.append(1)
+        self.attached.append(1)
+        self.counts.append(0)
+        self.out_degrees[source] += 1
+        self.in_degrees[target] += 1
+
+        # Trước lần dựng CSR đầu tiên các cạnh chỉ cần nằm trong các cột
+        if self.compacted:
+            self.out_extra.setdefault(source, []).append(edge)
+            self.in_extra.setdefault(target, []).append(edge)
+
+        return edge
+
+
+    def vertex_code(self, vertex: int) -> int:
+        """
+
+        Args:
+            vertex (int): Id đỉnh
+
+        Returns:
+            int: Mã 2 bit của chuỗi đánh dấu đỉnh
+        """
+
+        return self.long_vertex_codes[vertex] if vertex in self.long_vertex_codes else self.vertex_codes[vertex]
+
+
+    def edge_code(self, edge: int) -> int:
+        """
+
+        Args:
+            edge (int): Id cạnh
+
+        Returns:
+            int: Mã 2 bit của chuỗi đại diện cho cạnh
+        """
+
+        return self.long_edge_codes[edge] if edge in self.long_edge_codes else self.edge_codes[edge]
+
+
+    def detach(self, edge: int) -> None:
+        """Gỡ một cạnh khỏi danh sách kề của hai đỉnh, phần tử trong CSR được bỏ qua khi đọc
+
+        Args:
+            edge (int): Id cạnh
+        """
+
+        if self.attached[edge]:
+            self.attached[edge] = 0
+            self.out_degrees[self.sources[edge]] -= 1
+            self.in_degrees[self.targets[edge]] -= 1
+
+
+    def adjacent(self, vertex: int, outgoing: bool) -> List[int]:
+        """Các cạnh còn gắn với đỉnh trong một danh sách kề, theo thứ tự được thêm vào
+
+        Args:
+            vertex (int): Id đỉnh
+            outgoing (bool): True để lấy các cạnh ra, False để lấy các cạnh vào
+
+        Returns:
+            List[int]: Id các cạnh
+        """
+
+        if not self.compacted:
+            self.compact(paths=None)
+
+        offsets: array = self.out_offsets if outgoing else self.in_offsets
+        items: array = self.out_items if outgoing else self.in_items
+        extra: Dict[int, List[int]] = self.out_extra if outgoing else self.in_extra
+        edges: List[int] = []
+        # Đỉnh tạo sau lần dựng CSR gần nhất không có phần tử trong CSR
+        if vertex + 1 < len(offsets):
+            edges = [edge for edge in items[offsets[vertex]:offsets[vertex + 1]] if self.attached[edge]]
+        if vertex in extra:
+            edges += [edge for edge in extra[vertex] if self.attached[edge]]
+
+        return edges
+
+
+    def out_edges(self, vertex: int) -> List[int]:
+        """
+
+        Args:
+            vertex (int): Id đỉnh
+
+        Returns:
+            List[int]: Id các cạnh ra của đỉnh
+        """
+
+        return self.adjacent(vertex=vertex, outgoing=True)
+
+
+    def in_edges(self, vertex: int) -> List[int]:
+        """
+
+        Args:
+            vertex (int): Id đỉnh
+
+        Returns:
+            List[int]: Id các cạnh vào của đỉnh
+        """
+
+        return self.adjacent(vertex=vertex, outgoing=False)
+
+
+    def next_unvisited(self, vertex: int) -> int:
+        """Lấy cạnh ra đầu tiên chưa được đi qua của đỉnh. Các cạnh đã đi qua ở đầu danh sách kề bị bỏ qua vĩnh viễn
+        nhờ con trỏ của đỉnh, nên tổng thời gian của mọi lần gọi là O(E) khi visited chỉ đổi từ 0 sang 1
+
+        Args:
+            vertex (int): Id đỉnh
+
+        Returns:
+            int: Id cạnh, -1 nếu mọi cạnh ra đã được đi qua
+        """
+
+        # Đưa các cạnh, đỉnh mới thêm sau lần dựng CSR gần nhất vào CSR để con trỏ duyệt được
+        if not self.compacted or self.out_extra or vertex + 1 >= len(self.out_offsets):
+            self.compact(paths=None)
+
+        items: array = self.out_items
+        cursor: int = self.cursors[vertex]
+        end: int = self.out_offsets[vertex + 1]
+        while cursor < end:
+            edge: int = items[cursor]
+            if not self.visited[edge] and self.attached[edge]:
+                self.cursors[vertex] = cursor
+                return edge
+            cursor += 1
+        self.cursors[vertex] = cursor
+
+        return -1
+
+
+    def components(self) -> List[List[int]]:
+        """Chia các đỉnh có cạnh thành các thành phần liên thông yếu bằng union-find trên các cạnh còn gắn với đỉnh
+
+        Returns:
+            List[List[int]]: Id các đỉnh của từng thành phần theo thứ tự id, các thành phần theo thứ tự đỉnh nhỏ nhất
+        """
+
+        parents: array = array(ID_TYPE, range(len(self.vertex_codes)))
+        for edge, attached in enumerate(self.attached):
+            if not attached:
+                continue
+
+            # Tìm gốc của hai đỉnh, rút ngắn đường đi lên gốc một nửa sau mỗi bước
+            roots: List[int] = []
+            for vertex in (self.sources[edge], self.targets[edge]):
+                while parents[vertex] != vertex:
+                    parents[vertex] = parents[parents[vertex]]
+                    vertex = parents[vertex]
+                roots.append(vertex)
+            # Gốc nhỏ hơn làm gốc chung để thứ tự các thành phần không phụ thuộc thứ tự các cạnh
+            parents[max(roots)] = min(roots)
+
+        components: Dict[int, List[int]] = {}
+        for vertex in range(len(self.vertex_codes)):
+            if not self.vertex_live[vertex] or (self.in_degrees[vertex] == 0 and self.out_degrees[vertex] == 0):
+                continue
+
+            root: int = vertex
+            while parents[root] != root:
+                parents[root] = parents[parents[root]]
+                root = parents[root]
+            components.setdefault(root, []).append(vertex)
+
+        return list(components.values())
+
+
+    def add_occurrence(self, edge: int, read_id: int, position: int) -> None:
+        """Ghi nhận một read đi qua cạnh ở một vị trí
+
+        Args:
+            edge (int): Id cạnh
+            read_id (int): Id của read
+            position (int): Vị trí của cạnh trên đường đi của read
+        """
+
+        self.counts[edge] += 1
+        # Trước lần dựng chỉ mục đầu tiên vị trí chỉ cần nằm trong đường đi của read
+        if self.indexed:
+            self.occurrence_extra.setdefault(edge, []).append((read_id, position))
+
+
+    def remove_occurrence(self, edge: int) -> None:
+        """Ghi nhận một vị trí của read không còn đi qua cạnh, cặp (read_id, vị trí) cũ được lọc khi đọc
+
+        Args:
+            edge (int): Id cạnh
+        """
+
+        self.counts[edge] -= 1
+
+
+    def occurrences(self, edge: int) -> List[Tuple[int, int]]:
+        """Các cặp (read_id, vị trí) đã được ghi nhận cho cạnh, có thể gồm các cặp không còn đúng
+
+        Args:
+            edge (int): Id cạnh
+
+        Returns:
+            List[Tuple[int, int]]: Các cặp theo thứ tự read, rồi tới các cặp được thêm sau lần dựng chỉ mục gần nhất
+        """
+
+        pairs: List[Tuple[int, int]] = []
+        if edge + 1 < len(self.occurrence_offsets):
+            start: int = self.occurrence_offsets[edge]
+            end: int = self.occurrence_offsets[edge + 1]
+            pairs = list(zip(self.occurrence_reads[start:end], self.occurrence_positions[start:end]))
+        if edge in self.occurrence_extra:
+            pairs += self.occurrence_extra[edge]
+
+        return pairs
+
+
+    def adjacency(self, ends: array) -> Tuple[array, array]:
+        """Dựng CSR của một danh sách kề từ các cạnh còn gắn với đỉnh, các cạnh của mỗi đỉnh theo thứ tự id
+
+        Args:
+            ends (array): Cột đỉnh vào (danh sách cạnh ra) hoặc đỉnh ra (danh sách cạnh vào) của các cạnh
+
+        Returns:
+            Tuple[array, array]: Mảng offset và mảng id cạnh
+        """
+
+        counts: array = array("q", bytes(8 * len(self.vertex_codes)))
+        for edge, vertex in enumerate(ends):
+            if self.attached[edge]:
+                counts[vertex] += 1
+
+        offsets: array = offsets_of(counts)
+        cursors: array = array("q", offsets)
+        items: array = array(ID_TYPE, bytes(items_size(offsets)))
+        for edge, vertex in enumerate(ends):
+            if self.attached[edge]:
+                items[cursors[vertex]] = edge
+                cursors[vertex] += 1
+
+        return offsets, items
+
+
+    def compact(self, paths: Optional[List[array]] = None) -> None:
+        """Dựng lại CSR của danh sách kề từ các cạnh còn gắn với đỉnh và (nếu có) chỉ mục ngược từ đường đi của các read,
+        các bảng phụ được xóa. Thời gian tuyến tính theo số cạnh và tổng độ dài các đường đi, ngoài kết quả chỉ cần thêm một mảng đếm
+
+        Args:
+            paths (Optional[List[array]], optional): Id các cạnh trên đường đi của từng read theo read_id, -1 ở các vị trí trống.
+                Defaults to None (giữ nguyên chỉ mục ngược).
+        """
+
+        self.out_offsets, self.out_items = self.adjacency(ends=self.sources)
+        self.in_offsets, self.in_items = self.adjacency(ends=self.targets)
+        self.out_extra = {}
+        self.in_extra = {}
+        self.cursors = self.out_offsets[:-1]
+        self.compacted = True
+
+        if paths is None:
+            return
+
+        # Mỗi vị trí trên đường đi là một phần tử có khóa là id cạnh, duyệt hai lần: đếm rồi điền
+        counts: array = array("q", bytes(8 * len(self.edge_codes)))
+        for path in paths:
+            for edge in path:
+                if edge >= 0:
+                    counts[edge] += 1
+
+        offsets: array = offsets_of(counts)
+        cursors: array = array("q", offsets)
+        reads: array = array(ID_TYPE, bytes(items_size(offsets)))
+        positions: array = array(ID_TYPE, bytes(items_size(offsets)))
+        for read_id, path in enumerate(paths):
+            for position, edge in enumerate(path):
+                if edge >= 0:
+                    cursor: int = cursors[edge]
+                    reads[cursor] = read_id
+                    positions[cursor] = position
+                    cursors[edge] = cursor + 1
+
+        self.occurrence_offsets = offsets
+        self.occurrence_reads = reads
+        self.occurrence_positions = positions
+        self.occurrence_extra = {}
+        self.indexed = True
+
+
+    def index_bytes(self) -> int:
+        """Ước tính bộ nhớ của danh sách kề và chỉ mục ngược
+
+        Returns:
+            int: Số byte
+        """
+
+        total: int = 0
+        for column in (self.out_offsets, self.out_items, self.in_offsets, self.in_items,
+                       self.occurrence_offsets, self.occurrence_reads, self.occurrence_positions):
+            total += sys.getsizeof(column)
+        for extra in (self.out_extra, self.in_extra, self.occurrence_extra):
+            total += sys.getsizeof(extra) + sum(sys.getsizeof(items) for items in extra.values())
+
+        return total
@@ -0,0 +1,202 @@
+import time
+import heapq
+from typing import Any, List, Dict, Set, Tuple, Optional
+
+from graph import Graph, Edge, Read, CompactionReport
+from snapshot import save_graph
+
+
+CHECKPOINT_INTERVAL: float = 60.0 # Số giây tối thiểu giữa hai lần ghi checkpoint
+
+
+class SuperpathEngine(object):
+    """
+    Gộp các cạnh thành superpath bằng một hàng đợi các bộ ba (p, x, y) liền nhau trên các read.
+    Mỗi bộ ba được đánh khóa (read_id, vị trí của x trong read.edge_ids), vị trí không đổi khi gộp nên
+    lấy khóa nhỏ nhất luôn cho đúng bộ ba mà cách duyệt lại từ read đầu tiên sau mỗi lần gộp sẽ gặp đầu tiên.
+    Sau mỗi lần gộp chỉ các bộ ba có thể thay đổi kết quả is_mergeable được đưa lại vào hàng đợi
+    """
+
+    def __init__(self, graph: Graph, checkpoint: Optional[str] = None, interval: float = CHECKPOINT_INTERVAL) -> None:
+        """
+
+        Args:
+            graph (Graph): Đồ thị cần gộp cạnh
+            checkpoint (Optional[str], optional): File snapshot được ghi định kỳ trong khi gộp, None để không ghi. Defaults to None.
+            interval (float, optional): Số giây tối thiểu giữa hai lần ghi checkpoint. Defaults to CHECKPOINT_INTERVAL.
+        """
+
+        self.graph: Graph = graph
+        self.merges: int = 0 # Số lần gộp thành công
+        self.checks: int = 0 # Số bộ ba đã được kiểm tra
+        self.elapsed: float = 0.0 # Thời gian chạy (giây)
+        self.compaction: Optional[CompactionReport] = None # Kết quả dọn đồ thị ở cuối
+        self.queue: List[Tuple[int, int]] = [] # Hàng đợi ưu tiên các khóa (read_id, vị trí)
+        self.pending: Set[Tuple[int, int]] = set() # Các khóa đang có trong hàng đợi
+        self.started: bool = False # True khi hàng đợi đã được tạo (hoặc được khôi phục từ checkpoint)
+        self.finished: bool = False # True khi đã gộp xong và dọn đồ thị
+        self.checkpoint: Optional[str] = checkpoint
+        self.interval: float = interval
+        self.checkpoints: int = 0 # Số lần đã ghi checkpoint
+        self.context: Dict[str, Any] = {} # Các thông tin khác được ghi cùng checkpoint (ví dụ của Assembler)
+
+
+    def push(self, read: Read, position: int) -> None:
+        """Đưa bộ ba có x ở một vị trí của read vào hàng đợi nếu chưa có
+
+        Args:
+            read (Read): Read chứa bộ ba
+            position (int): Vị trí của x trong read.edge_ids
+        """
+
+        key: Tuple[int, int] = (read.read_id, position)
+        if key not in self.pending:
+            self.pending.add(key)
+            heapq.heappush(self.queue, key)
+
+
+    def triple(self, read: Read, position: int) -> Optional[Tuple[Optional[Edge], Edge, Edge]]:
+        """Lấy bộ ba (p, x, y) hiện tại với x ở một vị trí của read
+
+        Args:
+            read (Read): Read chứa bộ ba
+            position (int): Vị trí của x trong read.edge_ids
+
+        Returns:
+            Optional[Tuple[Optional[Edge], Edge, Edge]]: Bộ ba, None nếu vị trí đã bị gộp hoặc x là cạnh cuối
+        """
+
+        x: Optional[Edge] = read.edge(position)
+        next_position: int = read.next_positions[position]
+        if x is None or next_position >= len(read.edge_ids):
+            return None
+
+        p: Optional[Edge] = read.edge(read.prev_positions[position]) if position > 0 else None
+
+        return p, x, read.edge(next_position)
+
+
+    def requeue(self, z: Edge, x: Edge, y: Edge) -> None:
+        """Đưa lại vào hàng đợi các bộ ba bị ảnh hưởng bởi lần gộp x, y thành z:
+        các bộ ba có x hoặc y là x, y, z hoặc một cạnh kề z trên các read đi qua z, hoặc cạnh đầu của các read đó
+        (cạnh đầu so sánh với cạnh cuối của read trong is_mergeable)
+
+        Args:
+            z (Edge): Cạnh mới
+            x (Edge): Cạnh liền trước đã bị gộp
+            y (Edge): Cạnh liền sau đã bị gộp
+        """
+
+        # x.reads, y.reads và z.reads thay đổi nên is_spanned của các bộ ba có y là một trong ba cạnh này cũng có thể thay đổi
+        changed: List[Edge] = [x, y, z]
+        neighbours: List[Edge] = []
+        for read, positions in z.reads.items():
+            for position in positions:
+                previous: int = read.prev_positions[position]
+                following: int = read.next_positions[position]
+                if previous >= 0:
+                    neighbours.append(read.edge(previous))
+                if following < len(read.edge_ids):
+                    neighbours.append(read.edge(following))
+            neighbours.append(read.edge(0))
+
+        changed_ids: Set[int] = {edge.id for edge in changed}
+        seen: Set[int] = set()
+        for edge in changed + neighbours:
+            if edge.id in seen:
+                continue
+            seen.add(edge.id)
+
+            for read, positions in edge.reads.items():
+                for position in positions:
+                    self.push(read=read, position=position)
+                    if edge.id in changed_ids and position > 0:
+                        self.push(read=read, position=read.prev_positions[position])
+
+
+    def run(self) -> int:
+        """Gộp các cạnh tới khi không còn bộ ba nào gộp được, sau đó dọn đồ thị một lần
+
+        Returns:
+            int: Số lần gộp thành công
+        """
+
+        start: float = time.perf_counter()
+
+        # Tất cả các cặp cạnh liền nhau, theo thứ tự read và vị trí
+        if not self.started:
+            for read in self.graph.read_list:
+                for position, edge in enumerate(read.edge_ids):
+                    if edge >= 0 and read.next_positions[position] < len(read.edge_ids):
+                        self.pending.add((read.read_id, position))
+            self.queue = sorted(self.pending)
+            self.started = True
+
+        saved: float = time.perf_counter()
+        while self.queue:
+            # Checkpoint chỉ được ghi giữa hai bộ ba, khi đồ thị và hàng đợi khớp với nhau
+            if self.checkpoint and time.perf_counter() - saved >= self.interval:
+                self.save(filename=self.checkpoint)
+                saved = time.perf_counter()
+
+            key: Tuple[int, int] = heapq.heappop(self.queue)
+            self.pending.discard(key)
+            read_id, position = key
+
+            # Bộ ba có thể đã bị thay đổi bởi các lần gộp trước
+            triple: Optional[Tuple[Optional[Edge], Edge, Edge]] = self.triple(read=self.graph.read_list[read_id], position=position)
+            if triple is None:
+                continue
+
+            p, x, y = triple
+            self.checks += 1
+            if self.graph.is_mergeable(p=p, x=x, y=y):
+                z: Optional[Edge] = self.graph.merge(x=x, y=y)
+                if z:
+                    self.merges += 1
+                    self.requeue(z=z, x=x, y=y)
+
+        # Chỉ dọn đồ thị một lần ở cuối
+        self.compaction = self.graph.clean()
+        self.finished = True
+        self.elapsed += time.perf_counter() - start
+
+        return self.merges
+
+
+    def state(self) -> Dict[str, Any]:
+        """
+
+        Returns:
+            Dict[str, Any]: Các bộ đếm cần để tiếp tục chạy, ghi được bằng JSON
+        """
+
+        return {"merges": self.merges, "checks": self.checks, "elapsed": self.elapsed}
+
+
+    def save(self, filename: str) -> None:
+        """Ghi đồ thị cùng hàng đợi hiện tại ra một file snapshot để có thể tiếp tục bằng restore
+
+        Args:
+            filename (str): File snapshot
+        """
+
+        save_graph(graph=self.graph, filename=filename, state=dict(self.context, superpath=self.state()), queue=self.queue)
+        self.checkpoints += 1
+
+
+    def restore(self, state: Dict[str, Any], queue: List[Tuple[int, int]]) -> None:
+        """Khôi phục hàng đợi và các bộ đếm từ một checkpoint, run sẽ chạy tiếp từ bộ ba đầu tiên trong hàng đợi
+
+        Args:
+            state (Dict[str, Any]): Các bộ đếm đã ghi bởi state
+            queue (List[Tuple[int, int]]): Hàng đợi đã ghi, vẫn là một heap
+        """
+
+        self.merges = state["merges"]
+        self.checks = state["checks"]
+        self.elapsed = state["elapsed"]
+        self.queue = queue
+        self.pending = set(queue)
+        self.started = True
+        self.finished = False
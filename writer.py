@@ -0,0 +1,85 @@
+from typing import List, Iterable, TextIO
+
+from loader import BUFFER_SIZE
+
+
+LINE_WIDTH: int = 60 # Số ký tự của chuỗi trên mỗi dòng FASTA
+
+
+class FastaWriter(object):
+    """
+    Ghi các contig ra file FASTA theo từng đoạn, không cần ghép cả contig thành một chuỗi.
+    Các dòng được gom vào bộ đệm và chỉ được ghi ra file khi bộ đệm đầy hoặc khi flush
+    """
+    
+    def __init__(self, handle: TextIO, width: int = LINE_WIDTH, buffer_size: int = BUFFER_SIZE) -> None:
+        """
+
+        Args:
+            handle (TextIO): File (hoặc sys.stdout) để ghi
+            width (int, optional): Số ký tự trên mỗi dòng. Defaults to LINE_WIDTH.
+            buffer_size (int, optional): Số ký tự tối đa giữ trong bộ đệm trước khi ghi. Defaults to BUFFER_SIZE.
+        """
+        
+        if width <= 0:
+            raise ValueError("Số ký tự trên mỗi dòng phải lớn hơn 0")
+        
+        self.handle: TextIO = handle
+        self.width: int = width
+        self.buffer_size: int = buffer_size
+        self.buffer: List[str] = [] # Các dòng chưa được ghi
+        self.buffered: int = 0 # Tổng số ký tự trong bộ đệm
+    
+    
+    def write(self, text: str) -> None:
+        """Thêm một đoạn vào bộ đệm, ghi ra file nếu bộ đệm đầy
+
+        Args:
+            text (str): Đoạn cần ghi
+        """
+        
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+    
+    
+    def write_record(self, name: str, chunks: Iterable[str]) -> int:
+        """Ghi một bản ghi FASTA từ các đoạn của chuỗi, ngắt dòng theo self.width.
+        Ngoài bộ đệm chỉ giữ một đoạn và phần dòng chưa đủ độ dài
+
+        Args:
+            name (str): Tên bản ghi (không gồm ">")
+            chunks (Iterable[str]): Các đoạn của chuỗi theo thứ tự
+
+        Returns:
+            int: Độ dài chuỗi đã ghi
+        """
+        
+        self.write(">" + name + "\n")
+        
+        length: int = 0
+        line: str = "" # Phần cuối chưa đủ một dòng, luôn ngắn hơn self.width
+        for chunk in chunks:
+            length += len(chunk)
+            line += chunk
+            full: int = len(line) - len(line) % self.width
+            for start in range(0, full, self.width):
+                self.write(line[start:start+self.width] + "\n")
+            line = line[full:]
+        
+        if line:
+            self.write(line + "\n")
+        
+        return length
+    
+    
+    def flush(self) -> None:
+        """Ghi toàn bộ bộ đệm ra file
+        """
+        
+        if self.buffer:
+            self.handle.write("".join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+        self.handle.flush()